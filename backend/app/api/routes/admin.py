@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.core.monitoring import loop_monitor
+from app.services.response_cache import response_cache
+from app.services.websocket_manager import websocket_manager
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+CONNECTION_SORT_FIELDS = ("id", "connected_seconds", "queue_depth", "bytes_sent", "dropped", "last_lag_ms", "max_lag_ms")
+
+@router.get("/connections")
+async def get_connections(
+    sort: str = Query("id", description=f"Sort by: {', '.join(CONNECTION_SORT_FIELDS)}"),
+    limit: Optional[int] = Query(None, ge=1, description="Return only the first N connections after sorting"),
+    topic: Optional[str] = Query(None, description="Only connections subscribed to this topic, e.g. prices:EUR/USD")
+):
+    """List live WebSocket connections with subscriptions, bytes sent and send lag"""
+    if sort not in CONNECTION_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort field: {sort}")
+    try:
+        connections = websocket_manager.get_connection_stats()
+        if topic:
+            connections = [connection for connection in connections if topic in connection["topics"]]
+        # Worst offenders first for everything but the id
+        connections.sort(key=lambda connection: connection[sort], reverse=sort != "id")
+        return {
+            "summary": websocket_manager.get_stats(),
+            "connections": connections[:limit] if limit else connections
+        }
+    except Exception as e:
+        logger.error(f"Error listing connections: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/connections/{connection_id}")
+async def close_connection(connection_id: int):
+    """Disconnect a single WebSocket client"""
+    connection = websocket_manager.get_connection(connection_id)
+    if connection is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    await websocket_manager.close_connection(connection.websocket, code=1008)
+    return {"message": "Connection closed", "id": connection_id}
+
+@router.get("/event-loop")
+async def get_event_loop_metrics(
+    recent: int = Query(50, ge=0, le=200, description="Number of recent slow callbacks to include")
+):
+    """Event-loop lag and the routes/tasks whose callbacks blocked the loop longest"""
+    return loop_monitor.get_metrics(recent=recent)
+
+@router.get("/cache")
+async def get_cache_metrics():
+    """Response cache hits, misses and invalidations, overall and per cached route"""
+    return response_cache.get_metrics()
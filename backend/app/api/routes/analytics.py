@@ -1,166 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import asyncio
 import logging
 
-from app.core.database import get_db, Trade
+from app.core.config import settings
+from app.core.database import get_async_db, Trade
 from app.services.ml_service import MLService
+from app.services.monte_carlo import run_simulation
+from app.services.performance_engine import BUCKETS, compute_performance, load_closed_trades
+from app.services.response_cache import response_cache
+from app.services.trade_aggregates import performance_by, timeframe_cutoff, trade_summary
+from app.services.trade_journal import keyset_page
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/trade-summary")
+@response_cache.cached("trades")
 async def get_trade_summary(
     timeframe: str = Query("all", description="Timeframe: 1d, 7d, 30d, 90d, all"),
     pair: Optional[str] = Query(None, description="Currency pair filter"),
     strategy: Optional[str] = Query(None, description="Strategy filter"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get comprehensive trade analytics summary"""
     try:
-        # Build base query
-        query = db.query(Trade)
-        
-        # Apply timeframe filter
-        if timeframe != "all":
-            timeframe_hours = {
-                "1d": 24,
-                "7d": 7 * 24,
-                "30d": 30 * 24,
-                "90d": 90 * 24
-            }
-            if timeframe in timeframe_hours:
-                cutoff_time = datetime.utcnow() - timedelta(hours=timeframe_hours[timeframe])
-                query = query.filter(Trade.created_at >= cutoff_time)
-        
-        # Apply filters
-        if pair:
-            query = query.filter(Trade.pair == pair)
-        if strategy:
-            query = query.filter(Trade.strategy == strategy)
-        
-        trades = query.all()
-        
-        if not trades:
-            return {
-                "total_trades": 0,
-                "winning_trades": 0,
-                "losing_trades": 0,
-                "win_rate": 0,
-                "total_profit": 0,
-                "total_pips": 0,
-                "avg_profit": 0,
-                "avg_win": 0,
-                "avg_loss": 0,
-                "profit_factor": 0,
-                "best_trade": 0,
-                "worst_trade": 0,
-                "avg_duration": 0
-            }
-        
-        # Calculate metrics
-        total_trades = len(trades)
-        winning_trades = [t for t in trades if t.profit and t.profit > 0]
-        losing_trades = [t for t in trades if t.profit and t.profit < 0]
-        
-        total_profit = sum(t.profit for t in trades if t.profit)
-        total_pips = sum(t.pips for t in trades if t.pips)
-        
-        win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
-        avg_profit = total_profit / total_trades if total_trades > 0 else 0
-        
-        avg_win = sum(t.profit for t in winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = sum(t.profit for t in losing_trades) / len(losing_trades) if losing_trades else 0
-        
-        profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else 0
-        
-        best_trade = max(t.profit for t in trades if t.profit) if trades else 0
-        worst_trade = min(t.profit for t in trades if t.profit) if trades else 0
-        
-        avg_duration = sum(t.duration_minutes for t in trades if t.duration_minutes) / len([t for t in trades if t.duration_minutes]) if trades else 0
-        
-        return {
-            "total_trades": total_trades,
-            "winning_trades": len(winning_trades),
-            "losing_trades": len(losing_trades),
-            "win_rate": round(win_rate, 1),
-            "total_profit": round(total_profit, 2),
-            "total_pips": round(total_pips, 1),
-            "avg_profit": round(avg_profit, 2),
-            "avg_win": round(avg_win, 2),
-            "avg_loss": round(avg_loss, 2),
-            "profit_factor": round(profit_factor, 2),
-            "best_trade": round(best_trade, 2),
-            "worst_trade": round(worst_trade, 2),
-            "avg_duration": round(avg_duration, 0)
-        }
+        return await db.run_sync(trade_summary, timeframe_cutoff(timeframe), pair=pair, strategy=strategy)
         
     except Exception as e:
         logger.error(f"Error getting trade summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/strategy-performance")
+@response_cache.cached("trades")
 async def get_strategy_performance(
     timeframe: str = Query("all"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get performance breakdown by trading strategy"""
     try:
-        query = db.query(Trade)
+        return await db.run_sync(performance_by, "strategy", timeframe_cutoff(timeframe))
         
-        # Apply timeframe filter
-        if timeframe != "all":
-            timeframe_hours = {"1d": 24, "7d": 168, "30d": 720, "90d": 2160}
-            if timeframe in timeframe_hours:
-                cutoff_time = datetime.utcnow() - timedelta(hours=timeframe_hours[timeframe])
-                query = query.filter(Trade.created_at >= cutoff_time)
-        
-        trades = query.all()
-        
-        # Group by strategy
-        strategy_stats = {}
-        for trade in trades:
-            strategy = trade.strategy
-            if strategy not in strategy_stats:
-                strategy_stats[strategy] = {
-                    "trades": 0,
-                    "wins": 0,
-                    "profit": 0,
-                    "pips": 0
-                }
-            
-            strategy_stats[strategy]["trades"] += 1
-            if trade.profit and trade.profit > 0:
-                strategy_stats[strategy]["wins"] += 1
-            if trade.profit:
-                strategy_stats[strategy]["profit"] += trade.profit
-            if trade.pips:
-                strategy_stats[strategy]["pips"] += trade.pips
-        
-        # Calculate win rates and averages
-        result = []
-        for strategy, stats in strategy_stats.items():
-            win_rate = (stats["wins"] / stats["trades"] * 100) if stats["trades"] > 0 else 0
-            avg_profit = stats["profit"] / stats["trades"] if stats["trades"] > 0 else 0
-            
-            result.append({
-                "strategy": strategy,
-                "trades": stats["trades"],
-                "win_rate": round(win_rate, 1),
-                "total_profit": round(stats["profit"], 2),
-                "avg_profit": round(avg_profit, 2),
-                "total_pips": round(stats["pips"], 1)
-            })
-        
-        # Sort by total profit
-        result.sort(key=lambda x: x["total_profit"], reverse=True)
+    except Exception as e:
+        logger.error(f"Error getting strategy performance: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _performance(
+    db: AsyncSession,
+    timeframe: str,
+    pair: Optional[str],
+    strategy: Optional[str],
+    initial_balance: Optional[float],
+    bucket: str,
+    window: Optional[int]
+) -> Dict[str, Any]:
+    trades = await load_closed_trades(db, timeframe_cutoff(timeframe), pair=pair, strategy=strategy)
+    # NumPy releases the GIL for most of the pass, so a thread keeps the loop responsive
+    return await asyncio.to_thread(
+        compute_performance,
+        trades,
+        settings.ANALYTICS_INITIAL_BALANCE if initial_balance is None else initial_balance,
+        bucket,
+        window or settings.ANALYTICS_ROLLING_WINDOW
+    )
+
+@router.get("/performance-metrics")
+@response_cache.cached("trades")
+async def get_performance_metrics(
+    timeframe: str = Query("all", description="Timeframe: 1d, 7d, 30d, 90d, all"),
+    pair: Optional[str] = Query(None, description="Currency pair filter"),
+    strategy: Optional[str] = Query(None, description="Strategy filter"),
+    initial_balance: Optional[float] = Query(None, gt=0, description="Starting balance for the equity curve"),
+    window: Optional[int] = Query(None, ge=1, le=10000, description="Trades per rolling window"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get drawdown, Sharpe/Sortino, expectancy and streak metrics over closed trades"""
+    try:
+        result = await _performance(db, timeframe, pair, strategy, initial_balance, "1d", window)
+        return {key: value for key, value in result.items() if key != "series"}
         
-        return result
+    except Exception as e:
+        logger.error(f"Error getting performance metrics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/equity-curve")
+@response_cache.cached("trades")
+async def get_equity_curve(
+    timeframe: str = Query("all", description="Timeframe: 1d, 7d, 30d, 90d, all"),
+    bucket: str = Query("1d", description=f"Bucket: {', '.join(BUCKETS)}"),
+    pair: Optional[str] = Query(None, description="Currency pair filter"),
+    strategy: Optional[str] = Query(None, description="Strategy filter"),
+    initial_balance: Optional[float] = Query(None, gt=0, description="Starting balance for the equity curve"),
+    window: Optional[int] = Query(None, ge=1, le=10000, description="Trades per rolling window"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the equity curve, drawdown and rolling metrics bucketed by close time"""
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported bucket: {bucket}. Use one of {', '.join(BUCKETS)}")
+    try:
+        result = await _performance(db, timeframe, pair, strategy, initial_balance, bucket, window)
+        return {"summary": result["summary"], "drawdown": result["drawdown"], "series": result["series"]}
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error getting strategy performance: {e}")
+        logger.error(f"Error getting equity curve: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/monte-carlo")
+@response_cache.cached("trades")
+async def get_monte_carlo(
+    timeframe: str = Query("all", description="Timeframe: 1d, 7d, 30d, 90d, all"),
+    pair: Optional[str] = Query(None, description="Currency pair filter"),
+    strategy: Optional[str] = Query(None, description="Strategy filter"),
+    risk_percentage: float = Query(settings.DEFAULT_RISK_PERCENTAGE, gt=0, le=100, description="Equity risked per trade, in percent"),
+    paths: int = Query(settings.MONTE_CARLO_PATHS, ge=100, le=settings.MONTE_CARLO_MAX_PATHS, description="Simulated trade sequences"),
+    horizon: Optional[int] = Query(None, ge=1, le=settings.MONTE_CARLO_MAX_HORIZON, description="Trades per sequence"),
+    initial_balance: Optional[float] = Query(None, gt=0, description="Starting balance"),
+    ruin_pct: float = Query(settings.MONTE_CARLO_RUIN_PCT, gt=0, le=100, description="Drawdown from the starting balance that counts as ruin"),
+    seed: Optional[int] = Query(None, ge=0, description="Random seed, for reproducible runs"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get risk of ruin, drawdown and return distributions from bootstrapped closed-trade sequences"""
+    try:
+        trades = await load_closed_trades(db, timeframe_cutoff(timeframe), pair=pair, strategy=strategy)
+        return await run_simulation(
+            trades["profit"],
+            risk_percentage,
+            paths,
+            horizon=horizon,
+            initial_balance=settings.ANALYTICS_INITIAL_BALANCE if initial_balance is None else initial_balance,
+            ruin_pct=ruin_pct,
+            seed=seed,
+            workers=settings.MONTE_CARLO_WORKERS
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo simulation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/ml-learning-progress")
@@ -215,62 +195,14 @@ async def get_ml_learning_progress():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/pair-performance")
+@response_cache.cached("trades")
 async def get_pair_performance(
     timeframe: str = Query("all"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get performance breakdown by currency pair"""
     try:
-        query = db.query(Trade)
-        
-        # Apply timeframe filter
-        if timeframe != "all":
-            timeframe_hours = {"1d": 24, "7d": 168, "30d": 720, "90d": 2160}
-            if timeframe in timeframe_hours:
-                cutoff_time = datetime.utcnow() - timedelta(hours=timeframe_hours[timeframe])
-                query = query.filter(Trade.created_at >= cutoff_time)
-        
-        trades = query.all()
-        
-        # Group by pair
-        pair_stats = {}
-        for trade in trades:
-            pair = trade.pair
-            if pair not in pair_stats:
-                pair_stats[pair] = {
-                    "trades": 0,
-                    "wins": 0,
-                    "profit": 0,
-                    "pips": 0
-                }
-            
-            pair_stats[pair]["trades"] += 1
-            if trade.profit and trade.profit > 0:
-                pair_stats[pair]["wins"] += 1
-            if trade.profit:
-                pair_stats[pair]["profit"] += trade.profit
-            if trade.pips:
-                pair_stats[pair]["pips"] += trade.pips
-        
-        # Calculate metrics
-        result = []
-        for pair, stats in pair_stats.items():
-            win_rate = (stats["wins"] / stats["trades"] * 100) if stats["trades"] > 0 else 0
-            avg_profit = stats["profit"] / stats["trades"] if stats["trades"] > 0 else 0
-            
-            result.append({
-                "pair": pair,
-                "trades": stats["trades"],
-                "win_rate": round(win_rate, 1),
-                "total_profit": round(stats["profit"], 2),
-                "avg_profit": round(avg_profit, 2),
-                "total_pips": round(stats["pips"], 1)
-            })
-        
-        # Sort by total profit
-        result.sort(key=lambda x: x["total_profit"], reverse=True)
-        
-        return result
+        return await db.run_sync(performance_by, "pair", timeframe_cutoff(timeframe))
         
     except Exception as e:
         logger.error(f"Error getting pair performance: {e}")
@@ -278,12 +210,16 @@ async def get_pair_performance(
 
 @router.get("/recent-trades")
 async def get_recent_trades(
+    response: Response,
     limit: int = Query(20, description="Number of recent trades"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get recent trades with ML features"""
     try:
-        trades = db.query(Trade).order_by(Trade.created_at.desc()).limit(limit).all()
+        trades, next_cursor = await keyset_page(db, select(Trade), limit, cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         result = []
         for trade in trades:
@@ -325,6 +261,8 @@ async def get_recent_trades(
         
         return result
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting recent trades: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.services.market_data import market_data_service
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/bars")
+async def get_bars(
+    pair: str = Query(..., description="Currency pair, e.g. EUR/USD"),
+    timeframe: str = Query("1h", description="Timeframe: 1m, 5m, 15m, 30m, 1h, 4h, 1d"),
+    start: Optional[int] = Query(None, description="Range start, epoch seconds (inclusive)"),
+    end: Optional[int] = Query(None, description="Range end, epoch seconds (exclusive)"),
+    limit: Optional[int] = Query(None, ge=1, description="Keep only the most recent N bars of the range")
+):
+    """Get closed OHLCV bars for a time range as columnar arrays"""
+    try:
+        bars = market_data_service.get_bars(pair, timeframe, start=start, end=end, limit=limit)
+        return {**bars, "partial": market_data_service.get_partial_bar(pair, timeframe)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Pair not found")
+    except Exception as e:
+        logger.error(f"Error getting bars: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/bars/since")
+async def get_bars_since(
+    pair: str = Query(..., description="Currency pair, e.g. EUR/USD"),
+    timeframe: str = Query("1h", description="Timeframe: 1m, 5m, 15m, 30m, 1h, 4h, 1d"),
+    since: int = Query(..., description="Open time of the newest bar the client already has, epoch seconds")
+):
+    """Get only the bars closed after a client's last known bar"""
+    try:
+        bars = market_data_service.get_bars_since(pair, timeframe, since)
+        return {**bars, "partial": market_data_service.get_partial_bar(pair, timeframe)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Pair not found")
+    except Exception as e:
+        logger.error(f"Error getting bars since {since}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/downsample")
+async def get_downsampled_bars(
+    pair: str = Query(..., description="Currency pair, e.g. EUR/USD"),
+    timeframe: str = Query("1m", description="Timeframe: 1m, 5m, 15m, 30m, 1h, 4h, 1d"),
+    start: Optional[int] = Query(None, description="Range start, epoch seconds (inclusive)"),
+    end: Optional[int] = Query(None, description="Range end, epoch seconds (exclusive)"),
+    width: int = Query(1000, ge=3, le=10000, description="Target number of points, e.g. chart width in pixels"),
+    method: str = Query("lttb", description="lttb (line chart) or ohlc (candles)")
+):
+    """Get a long bar range reduced to a fixed number of chart points"""
+    try:
+        return market_data_service.get_downsampled_bars(
+            pair, timeframe, start=start, end=end, width=width, method=method
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Pair not found")
+    except Exception as e:
+        logger.error(f"Error downsampling bars: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Get hit/miss counts for the bar range cache"""
+    return market_data_service.cache_stats
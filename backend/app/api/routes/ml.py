@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
 import logging
 
-from app.core.database import get_db, Trade
+from app.core.database import get_async_db, Trade
 from app.services.ml_service import MLService
 from app.schemas.ml_schemas import TrainingRequest, MLMetricsResponse, SignalRequest
 
@@ -36,12 +37,12 @@ async def get_ml_metrics() -> MLMetricsResponse:
 @router.post("/train")
 async def train_models(
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Train ML models on historical trade data"""
     try:
         # Get recent trades for training
-        recent_trades = db.query(Trade).limit(1000).all()
+        recent_trades = (await db.execute(select(Trade).limit(1000))).scalars().all()
         
         if not recent_trades:
             raise HTTPException(status_code=400, detail="No trade data available for training")
@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 
-from app.core.database import get_db, TradingSignal
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db, TradingSignal
 from app.services.ml_service import MLService
+from app.services.response_cache import response_cache
 from app.services.market_data import MarketDataService
+from app.services.signal_feed import signal_feed
+from app.services.signal_store import expire_signals, signal_row, store_signals
+from app.services.trade_aggregates import signal_performance
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -14,20 +20,20 @@ logger = logging.getLogger(__name__)
 @router.get("/active")
 async def get_active_signals(
     pair: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get active trading signals"""
     try:
-        query = db.query(TradingSignal).filter(TradingSignal.status == "active")
+        statement = select(TradingSignal).where(TradingSignal.status == "active")
         
         if pair:
-            query = query.filter(TradingSignal.pair == pair)
+            statement = statement.where(TradingSignal.pair == pair)
         
         # Filter out expired signals
         current_time = datetime.utcnow()
-        query = query.filter(TradingSignal.expires_at > current_time)
+        statement = statement.where(TradingSignal.expires_at > current_time)
         
-        signals = query.order_by(TradingSignal.created_at.desc()).all()
+        signals = (await db.execute(statement.order_by(TradingSignal.created_at.desc()))).scalars().all()
         
         result = []
         for signal in signals:
@@ -93,39 +99,17 @@ async def generate_new_signals(
 async def _store_signals_in_db(signals: List[Dict]):
     """Store generated signals in database"""
     try:
-        from app.core.database import SessionLocal
-        
-        db = SessionLocal()
-        
-        for signal_data in signals:
-            if not signal_data:  # Skip None signals
-                continue
-                
-            # Create expiration time (30 minutes from now)
-            expires_at = datetime.utcnow() + timedelta(minutes=30)
-            
-            signal = TradingSignal(
-                pair=signal_data["pair"],
-                type=signal_data["type"],
-                entry_price=signal_data["entry_price"],
-                stop_loss=signal_data["stop_loss"],
-                take_profit=signal_data["take_profit"],
-                confidence=signal_data["confidence"],
-                strategy=signal_data["strategy"],
-                reasoning=signal_data["reasoning"],
-                expires_at=expires_at,
-                mcts_simulations=signal_data["mcts_data"]["simulations"],
-                policy_score=signal_data["mcts_data"]["policy_score"],
-                value_score=signal_data["mcts_data"]["value_estimate"],
-                exploration_rate=signal_data["mcts_data"]["exploration_rate"]
-            )
-            
-            db.add(signal)
-        
-        db.commit()
-        db.close()
-        
-        logger.info(f"Stored {len(signals)} signals in database")
+        created_at = datetime.utcnow()
+        expires_at = created_at + timedelta(minutes=settings.SIGNAL_EXPIRY_MINUTES)
+        # Skip None signals
+        rows = [signal_row(signal_data, created_at, expires_at) for signal_data in signals if signal_data]
+        
+        async with AsyncSessionLocal() as db:
+            stored = await store_signals(db, rows)
+            await db.commit()
+        await response_cache.invalidate("signals")
+        
+        logger.info(f"Stored {stored} signals in database")
         
     except Exception as e:
         logger.error(f"Error storing signals in database: {e}")
@@ -134,11 +118,11 @@ async def _store_signals_in_db(signals: List[Dict]):
 async def execute_signal(
     signal_id: str,
     lot_size: float,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Execute a trading signal"""
     try:
-        signal = db.query(TradingSignal).filter(TradingSignal.id == signal_id).first()
+        signal = (await db.execute(select(TradingSignal).where(TradingSignal.id == signal_id))).scalars().first()
         if not signal:
             raise HTTPException(status_code=404, detail="Signal not found")
         
@@ -151,7 +135,9 @@ async def execute_signal(
         # Here you would integrate with broker API to execute the trade
         # For now, we'll simulate the execution
         
-        db.commit()
+        await db.commit()
+        await response_cache.invalidate("signals")
+        await signal_feed.mark_status(signal_id, "executed")
         
         return {
             "status": "success",
@@ -169,41 +155,34 @@ async def execute_signal(
         
     except Exception as e:
         logger.error(f"Error executing signal: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/expire-old")
-async def expire_old_signals(db: Session = Depends(get_db)):
+async def expire_old_signals(db: AsyncSession = Depends(get_async_db)):
     """Expire old signals that have passed their expiration time"""
     try:
-        current_time = datetime.utcnow()
-        
-        expired_signals = db.query(TradingSignal).filter(
-            and_(
-                TradingSignal.status == "active",
-                TradingSignal.expires_at <= current_time
-            )
-        ).all()
-        
-        for signal in expired_signals:
-            signal.status = "expired"
-        
-        db.commit()
+        expired_ids = await expire_signals(db)
+        await db.commit()
+        if expired_ids:
+            await response_cache.invalidate("signals")
+        await signal_feed.mark_statuses(expired_ids, "expired")
         
         return {
             "status": "success",
-            "expired_signals": len(expired_signals)
+            "expired_signals": len(expired_ids)
         }
         
     except Exception as e:
         logger.error(f"Error expiring old signals: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/performance")
+@response_cache.cached("signals")
 async def get_signal_performance(
     timeframe: str = "7d",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get trading signal performance metrics"""
     try:
@@ -212,39 +191,19 @@ async def get_signal_performance(
         hours = timeframe_hours.get(timeframe, 168)
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
-        # Get signals from timeframe
-        signals = db.query(TradingSignal).filter(
-            TradingSignal.created_at >= cutoff_time
-        ).all()
-        
-        total_signals = len(signals)
-        executed_signals = len([s for s in signals if s.status == "executed"])
-        expired_signals = len([s for s in signals if s.status == "expired"])
-        active_signals = len([s for s in signals if s.status == "active"])
-        
-        # Calculate average confidence
-        avg_confidence = sum(s.confidence for s in signals) / total_signals if total_signals > 0 else 0
-        
-        # Group by strategy
-        strategy_performance = {}
-        for signal in signals:
-            strategy = signal.strategy
-            if strategy not in strategy_performance:
-                strategy_performance[strategy] = {"total": 0, "executed": 0}
-            
-            strategy_performance[strategy]["total"] += 1
-            if signal.status == "executed":
-                strategy_performance[strategy]["executed"] += 1
+        performance = await db.run_sync(signal_performance, cutoff_time)
+        total_signals = performance["total_signals"]
+        executed_signals = performance["executed_signals"]
         
         return {
             "timeframe": timeframe,
             "total_signals": total_signals,
             "executed_signals": executed_signals,
-            "expired_signals": expired_signals,
-            "active_signals": active_signals,
+            "expired_signals": performance["expired_signals"],
+            "active_signals": performance["active_signals"],
             "execution_rate": (executed_signals / total_signals * 100) if total_signals > 0 else 0,
-            "average_confidence": round(avg_confidence, 1),
-            "strategy_performance": strategy_performance
+            "average_confidence": round(performance["average_confidence"], 1),
+            "strategy_performance": performance["strategy_performance"]
         }
         
     except Exception as e:
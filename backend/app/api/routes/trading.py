@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import uuid
 import logging
 
-from app.core.database import get_db, Trade, TradingSignal
-from app.schemas.trading_schemas import TradeCreate, TradeResponse, SignalResponse
+from app.core.database import get_async_db, Trade, TradingSignal
+from app.schemas.trading_schemas import TradeCreate, TradeIngestResponse, TradeResponse, SignalResponse
 from app.services.ml_service import MLService
+from app.services.response_cache import response_cache
+from app.services.trade_ingest import NDJSON_CONTENT_TYPES, ingest_trades, ndjson_lines, trade_values
+from app.services.trade_journal import EXPORT_FORMATS, export_trades, keyset_page
+from app.services.trade_rollups import add_trade, remove_trade
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -15,36 +21,19 @@ logger = logging.getLogger(__name__)
 @router.post("/execute-trade", response_model=TradeResponse)
 async def execute_trade(
     trade_data: TradeCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Execute a new trade and store in database"""
     try:
         # Create new trade record
-        new_trade = Trade(
-            pair=trade_data.pair,
-            type=trade_data.type,
-            entry_price=trade_data.entry_price,
-            lot_size=trade_data.lot_size,
-            strategy=trade_data.strategy,
-            confidence=trade_data.confidence,
-            source=trade_data.source,
-            volatility=trade_data.market_conditions.volatility if trade_data.market_conditions else None,
-            trend=trade_data.market_conditions.trend if trade_data.market_conditions else None,
-            volume=trade_data.market_conditions.volume if trade_data.market_conditions else None,
-            news_impact=trade_data.market_conditions.news_impact if trade_data.market_conditions else None,
-            rsi_entry=trade_data.ml_features.rsi_entry if trade_data.ml_features else None,
-            macd_entry=trade_data.ml_features.macd_entry if trade_data.ml_features else None,
-            ema_alignment=trade_data.ml_features.ema_alignment if trade_data.ml_features else None,
-            smart_money_confirmation=trade_data.ml_features.smart_money_confirmation if trade_data.ml_features else None,
-            liquidity_level=trade_data.ml_features.liquidity_level if trade_data.ml_features else None,
-            mcts_simulations=trade_data.mcts_data.simulations if trade_data.mcts_data else None,
-            policy_confidence=trade_data.mcts_data.policy_confidence if trade_data.mcts_data else None,
-            value_estimate=trade_data.mcts_data.value_estimate if trade_data.mcts_data else None
-        )
+        new_trade = Trade(**trade_values(trade_data))
         
         db.add(new_trade)
-        db.commit()
-        db.refresh(new_trade)
+        await db.flush()
+        await db.run_sync(add_trade, new_trade)
+        await db.commit()
+        await response_cache.invalidate("trades")
+        await db.refresh(new_trade)
         
         logger.info(f"Trade executed: {new_trade.id} - {new_trade.type} {new_trade.pair}")
         
@@ -63,18 +52,46 @@ async def execute_trade(
         
     except Exception as e:
         logger.error(f"Error executing trade: {e}")
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/trades/bulk", response_model=TradeIngestResponse)
+async def ingest_trade_batch(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Insert many trades from a JSON array or an NDJSON stream of TradeCreate records.
+    
+    Rows are written in chunked transactions (COPY on Postgres) and each
+    record gets its own status; invalid records do not stop the rest.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_CONTENT_TYPES:
+        records = ndjson_lines(request.stream())
+    else:
+        try:
+            records = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON of trades")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON of trades")
+    try:
+        result = await ingest_trades(db, records)
+        if result["inserted"]:
+            await response_cache.invalidate("trades")
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error ingesting trades: {e}")
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/close-trade/{trade_id}")
 async def close_trade(
     trade_id: str,
     exit_price: float,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Close an existing trade"""
     try:
-        trade = db.query(Trade).filter(Trade.id == trade_id).first()
+        trade = (await db.execute(select(Trade).where(Trade.id == trade_id))).scalars().first()
         if not trade:
             raise HTTPException(status_code=404, detail="Trade not found")
         
@@ -89,15 +106,18 @@ async def close_trade(
         # Calculate duration
         duration_minutes = int((datetime.utcnow() - trade.created_at).total_seconds() / 60)
         
-        # Update trade
+        # Update trade, moving its rollup contribution in the same transaction
+        await db.run_sync(remove_trade, trade)
         trade.exit_price = exit_price
         trade.pips = pips
         trade.profit = profit
         trade.duration_minutes = duration_minutes
         trade.status = "closed"
         trade.updated_at = datetime.utcnow()
+        await db.run_sync(add_trade, trade)
         
-        db.commit()
+        await db.commit()
+        await response_cache.invalidate("trades")
         
         logger.info(f"Trade closed: {trade_id} - Profit: {profit}")
         
@@ -111,27 +131,42 @@ async def close_trade(
         
     except Exception as e:
         logger.error(f"Error closing trade: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/trades", response_model=List[TradeResponse])
 async def get_trades(
+    response: Response,
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
     pair: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get trades with optional filtering"""
+    """Get trades newest first with optional filtering.
+    
+    Pages are cursor based: pass the X-Next-Cursor header of one page as
+    ``cursor`` to get the next. ``offset`` still works but gets slower
+    the deeper it goes.
+    """
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
     try:
-        query = db.query(Trade)
+        statement = select(Trade)
         
         if pair:
-            query = query.filter(Trade.pair == pair)
+            statement = statement.where(Trade.pair == pair)
         if status:
-            query = query.filter(Trade.status == status)
+            statement = statement.where(Trade.status == status)
         
-        trades = query.order_by(Trade.created_at.desc()).offset(offset).limit(limit).all()
+        if offset:
+            statement = statement.order_by(Trade.created_at.desc(), Trade.id.desc()).offset(offset).limit(limit)
+            trades = (await db.execute(statement)).scalars().all()
+        else:
+            trades, next_cursor = await keyset_page(db, statement, limit, cursor)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
         
         return [
             TradeResponse(
@@ -153,15 +188,34 @@ async def get_trades(
             for trade in trades
         ]
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting trades: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/trades/export")
+async def export_trade_journal(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    pair: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Only trades created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only trades created before this time")
+):
+    """Stream the full trade journal, oldest first, with constant server memory"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    return StreamingResponse(
+        export_trades(format, pair=pair, status=status, since=since, until=until),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="trades.{format}"'}
+    )
+
 @router.get("/trade/{trade_id}")
-async def get_trade(trade_id: str, db: Session = Depends(get_db)):
+async def get_trade(trade_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get specific trade details"""
     try:
-        trade = db.query(Trade).filter(Trade.id == trade_id).first()
+        trade = (await db.execute(select(Trade).where(Trade.id == trade_id))).scalars().first()
         if not trade:
             raise HTTPException(status_code=404, detail="Trade not found")
         
@@ -207,28 +261,33 @@ async def get_trade(trade_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/trade/{trade_id}")
-async def delete_trade(trade_id: str, db: Session = Depends(get_db)):
+async def delete_trade(trade_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete a trade"""
     try:
-        trade = db.query(Trade).filter(Trade.id == trade_id).first()
+        trade = (await db.execute(select(Trade).where(Trade.id == trade_id))).scalars().first()
         if not trade:
             raise HTTPException(status_code=404, detail="Trade not found")
         
-        db.delete(trade)
-        db.commit()
+        await db.run_sync(remove_trade, trade)
+        await db.delete(trade)
+        await db.commit()
+        await response_cache.invalidate("trades")
         
         return {"status": "success", "message": "Trade deleted"}
         
     except Exception as e:
         logger.error(f"Error deleting trade: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/open-trades")
-async def get_open_trades(db: Session = Depends(get_db)):
+async def get_open_trades(db: AsyncSession = Depends(get_async_db)):
     """Get all open trades"""
     try:
-        open_trades = db.query(Trade).filter(Trade.status == "open").all()
+        # Only the columns in ix_trades_open, so the index alone answers the query
+        open_trades = (await db.execute(select(
+            Trade.id, Trade.pair, Trade.type, Trade.entry_price, Trade.lot_size, Trade.strategy, Trade.created_at
+        ).where(Trade.status == "open"))).all()
         
         return [
             {
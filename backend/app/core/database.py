@@ -1,16 +1,74 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, Index, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
+import logging
 from datetime import datetime
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+# Async driver for each sync URL scheme the app is configured with
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite"
+}
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one, e.g. postgresql+asyncpg://"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def _engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "postgresql":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS
+        )
+        if is_async:
+            options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+# Sync engine: migrations, CLI tools, benchmarks and thread-pool work
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_unavailable(*args, **kwargs):
+    raise RuntimeError(
+        f"No async driver configured for {make_url(settings.DATABASE_URL).get_backend_name()} databases; "
+        f"request handlers need one of: {', '.join(ASYNC_DRIVERS)}"
+    )
+
+
+# Async engine: request handlers and background tasks on the event loop. Other
+# databases still import and keep the sync engine; async sessions fail on use.
+try:
+    ASYNC_DATABASE_URL: Optional[str] = async_database_url(settings.DATABASE_URL)
+except ValueError as e:
+    ASYNC_DATABASE_URL = None
+    logger.error(f"{e}; async sessions are unavailable")
+
+if ASYNC_DATABASE_URL is not None:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(settings.DATABASE_URL, is_async=True))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = _async_unavailable
+
 Base = declarative_base()
 
 # Database Models
@@ -52,6 +110,45 @@ class Trade(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Timeframe windows and (created_at, id) keyset pages of the trade history
+        Index("ix_trades_created_at_id", "created_at", "id"),
+        Index("ix_trades_pair_created_at_id", "pair", "created_at", "id"),
+        Index("ix_trades_strategy_created_at", "strategy", "created_at"),
+        Index("ix_trades_status_created_at_id", "status", "created_at", "id"),
+        # Covers /open-trades so Postgres answers it with an index-only scan
+        Index(
+            "ix_trades_open",
+            "created_at",
+            postgresql_include=["id", "pair", "type", "entry_price", "lot_size", "strategy"],
+            postgresql_where=text("status = 'open'"),
+            sqlite_where=text("status = 'open'")
+        ),
+    )
+
+class TradeRollup(Base):
+    """Per-day trade totals, kept in step with the trades table by app.services.trade_rollups"""
+    __tablename__ = "trade_rollups"
+    
+    day = Column(Date, primary_key=True)  # UTC date of Trade.created_at
+    pair = Column(String, primary_key=True)
+    strategy = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
+    
+    trades = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    profit = Column(Float, nullable=False, default=0.0)
+    win_profit = Column(Float, nullable=False, default=0.0)  # gross win
+    loss_profit = Column(Float, nullable=False, default=0.0)  # gross loss
+    pips = Column(Float, nullable=False, default=0.0)
+    duration_minutes = Column(Integer, nullable=False, default=0)
+    timed_trades = Column(Integer, nullable=False, default=0)
+    best_trade = Column(Float)  # extremes of non-zero profits
+    worst_trade = Column(Float)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class MLModel(Base):
     __tablename__ = "ml_models"
@@ -89,6 +186,24 @@ class TradingSignal(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_trading_signals_created_at", "created_at"),
+        Index("ix_trading_signals_status_expires_at", "status", "expires_at"),
+        # Covers /signals/active; the partial index only holds the few active rows
+        Index(
+            "ix_trading_signals_active",
+            "pair",
+            "expires_at",
+            postgresql_include=[
+                "id", "type", "entry_price", "stop_loss", "take_profit", "confidence", "strategy",
+                "reasoning", "status", "mcts_simulations", "policy_score", "value_score",
+                "exploration_rate", "created_at"
+            ],
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'")
+        ),
+    )
 
 class MarketData(Base):
     __tablename__ = "market_data"
@@ -122,4 +237,9 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async DB session; queries await instead of blocking the event loop
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
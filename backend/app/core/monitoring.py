@@ -0,0 +1,175 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+import logging
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Route or stream being served; set by the HTTP middleware and WebSocket endpoints
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+# Aggregate for slow callbacks from sources first seen once ``max_sources`` are tracked
+OTHER_SOURCE = "(other)"
+
+
+def _suspension_point(coro: Any) -> Optional[str]:
+    """Innermost non-asyncio frame a task awaits in, i.e. just past the code that blocked"""
+    location = None
+    owner = coro
+    while owner is not None:
+        frame = getattr(owner, "cr_frame", None) or getattr(owner, "gi_frame", None)
+        if frame is None:
+            break
+        code = frame.f_code
+        if not code.co_filename.startswith(_ASYNCIO_DIR):
+            location = f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        owner = getattr(owner, "cr_await", None) or getattr(owner, "gi_yieldfrom", None)
+    return location
+
+
+class LoopMonitor:
+    """Continuous event-loop lag sampling and slow-callback attribution.
+
+    A sampler task measures how late ``asyncio.sleep`` wakes up, which is
+    the delay every coroutine (WebSocket sends included) currently sees.
+    Every loop callback is timed by wrapping ``asyncio.Handle._run``; one
+    that runs longer than the threshold blocked the loop for that long and
+    is attributed to its task's coroutine, the frame it suspended in and
+    the route whose context it ran in, then logged.
+    """
+
+    def __init__(self, sample_interval: float = 0.1, slow_threshold: float = 0.1,
+                 window: int = 600, max_events: int = 200, max_sources: int = 200):
+        self.sample_interval = sample_interval
+        self.slow_threshold = slow_threshold
+        self.lag_samples: Deque[float] = deque(maxlen=window)
+        self.slow_callbacks: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.by_source: Dict[str, Dict[str, Any]] = {}
+        self.max_sources = max_sources
+        self.slow_callbacks_total = 0
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._original_run = None
+
+    def start(self):
+        self._install()
+        self._task = asyncio.create_task(self._sample(), name="loop-monitor")
+        logger.info(f"Event loop monitor started (slow callback threshold {self.slow_threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._original_run is not None:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+
+    async def _sample(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.sample_interval)
+            lag_ms = max(0.0, time.perf_counter() - started - self.sample_interval) * 1000
+            self.lag_samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def _install(self):
+        if self._original_run is not None:
+            return
+        if not isinstance(asyncio.get_running_loop(), asyncio.BaseEventLoop):
+            # e.g. uvloop, whose handles are not Python objects; lag sampling still works
+            logger.warning("Slow callback attribution needs the default asyncio event loop")
+            return
+
+        original_run = asyncio.events.Handle._run
+        monitor = self
+
+        def _timed_run(handle):
+            started = time.perf_counter()
+            original_run(handle)
+            duration = time.perf_counter() - started
+            if duration >= monitor.slow_threshold:
+                monitor._record(handle, duration)
+
+        asyncio.events.Handle._run = _timed_run
+        self._original_run = original_run
+
+    def _record(self, handle: asyncio.Handle, duration: float):
+        try:
+            callback = handle._callback
+            task = getattr(callback, "__self__", None)
+            if isinstance(task, asyncio.Task):
+                coro = task.get_coro()
+                coroutine = getattr(coro, "__qualname__", repr(coro))
+                task_name = task.get_name()
+                location = _suspension_point(coro)
+            else:
+                coroutine = getattr(callback, "__qualname__", repr(callback))
+                task_name = None
+                location = None
+            context = handle._context
+            route = context.get(current_route) if context is not None else None
+        except Exception as e:
+            logger.debug(f"Could not attribute slow callback: {e}")
+            return
+
+        duration_ms = duration * 1000
+        source = route or task_name or coroutine
+        self.slow_callbacks_total += 1
+        self.slow_callbacks.append({
+            "timestamp": datetime.utcnow().isoformat(),
+            "duration_ms": duration_ms,
+            "route": route,
+            "task": task_name,
+            "coroutine": coroutine,
+            "location": location
+        })
+        if source not in self.by_source and len(self.by_source) >= self.max_sources:
+            source = OTHER_SOURCE
+        aggregate = self.by_source.setdefault(source, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "location": None})
+        aggregate["count"] += 1
+        aggregate["total_ms"] += duration_ms
+        if duration_ms >= aggregate["max_ms"]:
+            aggregate["max_ms"] = duration_ms
+            aggregate["location"] = location
+        logger.warning(
+            f"Event loop blocked for {duration_ms:.0f} ms by {coroutine}"
+            f" ({route or task_name}) at {location}"
+        )
+
+    def get_metrics(self, recent: int = 50) -> Dict[str, Any]:
+        samples = np.asarray(self.lag_samples)
+        lag = {
+            "current": float(samples[-1]) if samples.size else 0.0,
+            "mean": float(samples.mean()) if samples.size else 0.0,
+            "p50": float(np.percentile(samples, 50)) if samples.size else 0.0,
+            "p99": float(np.percentile(samples, 99)) if samples.size else 0.0,
+            "window_max": float(samples.max()) if samples.size else 0.0,
+            "max": self.max_lag_ms
+        }
+        top_sources = sorted(self.by_source.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        return {
+            "lag_ms": lag,
+            "sample_interval_ms": self.sample_interval * 1000,
+            "samples": int(samples.size),
+            "attribution_enabled": self._original_run is not None,
+            "slow_callback_threshold_ms": self.slow_threshold * 1000,
+            "slow_callbacks_total": self.slow_callbacks_total,
+            "top_sources": [{"source": source, **aggregate} for source, aggregate in top_sources[:20]],
+            "recent_slow_callbacks": list(self.slow_callbacks)[-recent:]
+        }
+
+
+loop_monitor = LoopMonitor(
+    sample_interval=settings.LOOP_LAG_SAMPLE_INTERVAL_MS / 1000,
+    slow_threshold=settings.SLOW_CALLBACK_THRESHOLD_MS / 1000
+)
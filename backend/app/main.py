@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.requests import HTTPConnection
 import uvicorn
 import asyncio
 from typing import List, Dict, Any
@@ -8,12 +9,21 @@ import json
 from datetime import datetime, timedelta
 import logging
 
-from app.api.routes import trading, ml, analytics, signals
+from app.api.routes import trading, ml, analytics, signals, market_data, admin
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.services.websocket_manager import WebSocketManager
-from app.services.market_data import MarketDataService
+from app.core.database import engine, Base, SessionLocal
+from app.core.monitoring import current_route, loop_monitor
+from app.services.websocket_manager import websocket_manager
+from app.services.market_data import market_data_service
 from app.services.ml_service import MLService
+from app.services.broadcaster import TopicBroadcaster
+from app.services.stream_protocol import StreamProtocol
+from app.services.pubsub import stream_bus
+from app.services.signal_feed import signal_feed
+from app.services.signal_store import signal_expiry_sweeper
+from app.services.response_cache import response_cache
+from app.services.monte_carlo import shutdown_process_pool
+from app.services.trade_rollups import ensure_rollups
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,10 +32,18 @@ logger = logging.getLogger(__name__)
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Tag each request's context with its route template (not the raw path, which
+# would make every id a new source) so slow event-loop callbacks can be traced to a route
+async def track_route(connection: HTTPConnection):
+    route = connection.scope.get("route")
+    if route is not None:
+        current_route.set(f"{connection.scope.get('method', 'WS')} {route.path}")
+
 app = FastAPI(
     title="Forex Analysis Pro API",
     description="Advanced AI-Powered Forex Trading Analysis Backend",
-    version="1.0.0"
+    version="1.0.0",
+    dependencies=[Depends(track_route)]
 )
 
 # CORS middleware
@@ -35,23 +53,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset pagination of trade listings
 )
 
 # Security
 security = HTTPBearer()
 
-# WebSocket manager
-websocket_manager = WebSocketManager()
-
 # Services
-market_data_service = MarketDataService()
 ml_service = MLService()
 
+async def _signal_topic_payloads() -> Dict[str, Any]:
+    """Current signal feed grouped into per-pair topics"""
+    return await signal_feed.get_topic_payloads(list(market_data_service.current_prices))
+
+# One producer per stream across all workers; each topic is encoded once per worker
+market_data_broadcaster = TopicBroadcaster(
+    "market-data", ("prices", "indicators", "smart-money"),
+    market_data_service.get_topic_payloads, websocket_manager, interval=1,
+    snapshot_interval=settings.WS_SNAPSHOT_INTERVAL_SECONDS, bus=stream_bus
+)
+signal_broadcaster = TopicBroadcaster(
+    "trading-signals", ("signals",),
+    _signal_topic_payloads, websocket_manager, interval=settings.SIGNAL_CHECK_INTERVAL_SECONDS,
+    snapshot_interval=None, bus=stream_bus,
+    min_interval=settings.SIGNAL_CONFLATION_SECONDS
+)
+stream_protocol = StreamProtocol(
+    websocket_manager,
+    [market_data_broadcaster, signal_broadcaster],
+    pairs=lambda: list(market_data_service.current_prices)
+)
+
 # Include API routes
 app.include_router(trading.router, prefix="/api/v1/trading", tags=["trading"])
 app.include_router(ml.router, prefix="/api/v1/ml", tags=["machine-learning"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
 app.include_router(signals.router, prefix="/api/v1/signals", tags=["signals"])
+app.include_router(market_data.router, prefix="/api/v1/market-data", tags=["market-data"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
 
 @app.get("/")
 async def root():
@@ -71,55 +110,74 @@ async def health_check():
             "database": "connected",
             "ml_models": "loaded",
             "market_data": "active"
-        }
+        },
+        "market_data_feed": market_data_service.get_replay_status(),
+        "broadcasters": [market_data_broadcaster.get_stats(), signal_broadcaster.get_stats()],
+        "signal_feed": signal_feed.get_stats(),
+        "signal_expiry": signal_expiry_sweeper.get_stats(),
+        "websockets": websocket_manager.get_stats(),
+        "event_loop_lag_ms": loop_monitor.get_metrics(recent=0)["lag_ms"]
     }
 
 @app.websocket("/ws/market-data")
 async def websocket_market_data(websocket: WebSocket):
-    await websocket_manager.connect(websocket)
-    try:
-        while True:
-            # Send real-time market data
-            market_data = await market_data_service.get_real_time_data()
-            await websocket_manager.send_personal_message(
-                json.dumps(market_data), websocket
-            )
-            await asyncio.sleep(1)  # Send updates every second
-    except WebSocketDisconnect:
-        websocket_manager.disconnect(websocket)
+    # Prices for every pair unless the client asks for something else
+    await stream_protocol.serve(websocket, default_channels=("prices",))
 
 @app.websocket("/ws/trading-signals")
 async def websocket_trading_signals(websocket: WebSocket):
-    await websocket_manager.connect(websocket)
+    await stream_protocol.serve(websocket, default_channels=("signals",))
+
+def _check_rollups():
+    """Backfill trade_rollups when it was created after trades were stored, so analytics do not read it empty"""
+    db = SessionLocal()
     try:
-        while True:
-            # Generate and send trading signals
-            signals = await ml_service.generate_trading_signals()
-            await websocket_manager.send_personal_message(
-                json.dumps(signals), websocket
-            )
-            await asyncio.sleep(15)  # Send signals every 15 seconds
-    except WebSocketDisconnect:
-        websocket_manager.disconnect(websocket)
+        rows = ensure_rollups(db)
+        if rows is not None:
+            logger.warning(f"Rebuilt {rows} trade rollup rows")
+    except Exception as e:
+        logger.error(f"Error checking trade rollups: {e}")
+    finally:
+        db.close()
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Forex Analysis Pro API...")
     
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    
+    await asyncio.to_thread(_check_rollups)
+    
     # Initialize ML models
     await ml_service.initialize_models()
     
     # Start background tasks
-    asyncio.create_task(market_data_service.start_data_collection())
-    asyncio.create_task(ml_service.start_continuous_learning())
+    await stream_bus.start()
+    await response_cache.start(stream_bus)
+    # Signal status changes push immediately instead of waiting for the next check
+    await signal_feed.start(ml_service.generate_trading_signals, on_change=signal_broadcaster.notify)
+    # Named so the loop monitor can attribute blocking work to them
+    asyncio.create_task(market_data_service.start_data_collection(), name="market-data-collection")
+    asyncio.create_task(ml_service.start_continuous_learning(), name="continuous-learning")
+    asyncio.create_task(market_data_broadcaster.start(), name="market-data-broadcaster")
+    asyncio.create_task(signal_broadcaster.start(), name="signal-broadcaster")
+    asyncio.create_task(signal_expiry_sweeper.start(on_expired=signal_feed.mark_expired), name="signal-expiry-sweeper")
     
     logger.info("API startup complete")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Forex Analysis Pro API...")
+    market_data_broadcaster.stop()
+    signal_broadcaster.stop()
+    signal_expiry_sweeper.stop()
+    await stream_bus.close()
+    await response_cache.close()
+    shutdown_process_pool()
     await ml_service.cleanup()
     await market_data_service.cleanup()
+    loop_monitor.stop()
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class MarketConditions(BaseModel):
@@ -48,6 +48,24 @@ class TradeResponse(BaseModel):
     created_at: datetime
     duration_minutes: Optional[int] = None
 
+class TradeIngestRow(BaseModel):
+    index: int  # position in the JSON array, or among non-empty NDJSON lines
+    status: str  # inserted/invalid/failed
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class TradeIngestResponse(BaseModel):
+    received: int
+    inserted: int
+    invalid: int
+    failed: int
+    truncated: bool
+    chunks: int
+    method: str  # copy/insert
+    elapsed_seconds: float
+    rows_per_second: float
+    rows: List[TradeIngestRow]
+
 class SignalResponse(BaseModel):
     id: str
     pair: str
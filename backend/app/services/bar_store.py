@@ -0,0 +1,173 @@
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400
+}
+
+BAR_FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+
+def to_epoch_seconds(timestamp: datetime) -> float:
+    """Convert a naive UTC datetime to epoch seconds"""
+    return timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+class BarBuffer:
+    """Columnar OHLCV store of closed bars for one pair and timeframe.
+
+    Bars live in preallocated NumPy arrays that double when full, so
+    appending is amortized O(1) and readers get zero-copy views. Once
+    ``max_bars`` is exceeded the oldest half is discarded; ``offset``
+    counts discarded bars so consumers can keep absolute bar indices.
+    """
+
+    def __init__(self, timeframe_seconds: int = 60, capacity: int = 1024, max_bars: Optional[int] = None):
+        self.timeframe_seconds = timeframe_seconds
+        self.max_bars = max_bars
+        self.size = 0
+        self.offset = 0
+        self._time = np.zeros(capacity, dtype=np.int64)
+        self._ohlcv = np.zeros((5, capacity), dtype=np.float64)
+        # Bar currently forming: [bucket, open, high, low, close, volume]
+        self._current: Optional[list] = None
+
+    @property
+    def time(self) -> np.ndarray:
+        return self._time[:self.size]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._ohlcv[0, :self.size]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._ohlcv[1, :self.size]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._ohlcv[2, :self.size]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._ohlcv[3, :self.size]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._ohlcv[4, :self.size]
+
+    @property
+    def total_bars(self) -> int:
+        """Number of bars ever closed, including discarded ones"""
+        return self.offset + self.size
+
+    @property
+    def current_bar(self) -> Optional[Dict[str, float]]:
+        if self._current is None:
+            return None
+        return dict(zip(BAR_FIELDS, self._current))
+
+    def update(self, timestamp: datetime, price: float, volume: float = 0.0) -> bool:
+        """Add a tick to the forming bar; returns True when a bar closed"""
+        bucket = int(to_epoch_seconds(timestamp)) // self.timeframe_seconds * self.timeframe_seconds
+        current = self._current
+
+        if current is not None and bucket <= current[0]:
+            current[2] = max(current[2], price)
+            current[3] = min(current[3], price)
+            current[4] = price
+            current[5] += volume
+            return False
+
+        closed = current is not None
+        if closed:
+            self._append(*current)
+        self._current = [bucket, price, price, price, price, volume]
+        return closed
+
+    def extend(self, times: np.ndarray, opens: np.ndarray, highs: np.ndarray,
+               lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray):
+        """Bulk-append closed bars, e.g. when backfilling history"""
+        count = len(times)
+        self._reserve(self.size + count)
+        end = self.size + count
+        self._time[self.size:end] = times
+        self._ohlcv[:, self.size:end] = np.vstack([opens, highs, lows, closes, volumes])
+        self.size = end
+        self._trim()
+
+    def _append(self, bucket: int, open_: float, high: float, low: float, close: float, volume: float):
+        self._reserve(self.size + 1)
+        self._time[self.size] = bucket
+        self._ohlcv[:, self.size] = (open_, high, low, close, volume)
+        self.size += 1
+        self._trim()
+
+    def _reserve(self, required: int):
+        capacity = len(self._time)
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        time = np.zeros(capacity, dtype=np.int64)
+        ohlcv = np.zeros((5, capacity), dtype=np.float64)
+        time[:self.size] = self._time[:self.size]
+        ohlcv[:, :self.size] = self._ohlcv[:, :self.size]
+        self._time = time
+        self._ohlcv = ohlcv
+
+    def _trim(self):
+        if not self.max_bars or self.size <= self.max_bars:
+            return
+        drop = self.size - self.max_bars // 2
+        keep = self.size - drop
+        self._time[:keep] = self._time[drop:self.size]
+        self._ohlcv[:, :keep] = self._ohlcv[:, drop:self.size]
+        self.size = keep
+        self.offset += drop
+
+
+def resample(bars: BarBuffer, timeframe_seconds: int) -> Dict[str, np.ndarray]:
+    """Aggregate closed base bars into a coarser timeframe.
+
+    The last bucket may still be filling; ``complete`` reports whether it
+    has closed, based on the newest closed or forming base bar.
+    """
+    if bars.size == 0:
+        empty = {field: np.empty(0) for field in BAR_FIELDS}
+        empty["time"] = np.empty(0, dtype=np.int64)
+        return {**empty, "complete": True}
+
+    if timeframe_seconds == bars.timeframe_seconds:
+        return {
+            "time": bars.time, "open": bars.open, "high": bars.high,
+            "low": bars.low, "close": bars.close, "volume": bars.volume,
+            "complete": True
+        }
+
+    buckets = bars.time // timeframe_seconds * timeframe_seconds
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    ends = np.append(starts[1:], bars.size) - 1
+    last_bar_end = int(bars.time[-1]) + bars.timeframe_seconds
+    if bars.current_bar is not None:
+        last_bar_end = max(last_bar_end, int(bars.current_bar["time"]))
+
+    return {
+        "time": buckets[starts],
+        "open": bars.open[starts],
+        "high": np.maximum.reduceat(bars.high, starts),
+        "low": np.minimum.reduceat(bars.low, starts),
+        "close": bars.close[ends],
+        "volume": np.add.reduceat(bars.volume, starts),
+        "complete": int(buckets[-1]) + timeframe_seconds <= last_bar_end
+    }
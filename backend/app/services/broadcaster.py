@@ -0,0 +1,282 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+from app.services.websocket_manager import WebSocketManager
+from app.services.wire_format import OutboundMessage
+from app.services.pubsub import InMemoryBus, PubSubBus
+
+logger = logging.getLogger(__name__)
+
+# Stream channels a client can subscribe to, per currency pair
+CHANNELS = ("prices", "indicators", "smart-money", "signals")
+
+
+def make_topic(channel: str, pair: str) -> str:
+    return f"{channel}:{pair}"
+
+
+def split_topic(topic: str) -> Tuple[str, str]:
+    channel, _, pair = topic.partition(":")
+    return channel, pair
+
+
+def diff_payload(previous: Any, current: Any) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+    """Changed and removed top-level keys, or None if the payloads are not both dicts"""
+    if not isinstance(previous, dict) or not isinstance(current, dict):
+        return None
+    missing = object()
+    changed = {key: value for key, value in current.items() if previous.get(key, missing) != value}
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+class TopicState:
+    """Latest full payload and sequence number of one topic"""
+
+    __slots__ = ("topic", "seq", "timestamp", "data", "complete", "_snapshot")
+
+    def __init__(self, topic: str):
+        self.topic = topic
+        self.seq = 0
+        # False while a mirror has missed messages and awaits a snapshot
+        self.complete = True
+        self.timestamp: Optional[str] = None
+        self.data: Any = None
+        self._snapshot: Optional[OutboundMessage] = None
+
+    def update(self, data: Any, timestamp: str):
+        self.seq += 1
+        self.data = data
+        self.timestamp = timestamp
+        self._snapshot = None
+
+    def apply(self, payload: Dict[str, Any]) -> OutboundMessage:
+        """Mirror a snapshot or delta produced elsewhere; returns it for delivery"""
+        if payload["type"] == "snapshot":
+            self.data = payload["data"]
+            self.complete = True
+        else:
+            if payload["seq"] != self.seq + 1:
+                self.complete = False
+            data = dict(self.data or {})
+            data.update(payload["data"])
+            for key in payload.get("removed", ()):
+                data.pop(key, None)
+            self.data = data
+        self.seq = payload["seq"]
+        self.timestamp = payload["timestamp"]
+        message = OutboundMessage(payload)
+        self._snapshot = message if payload["type"] == "snapshot" else None
+        return message
+
+    def copy(self) -> "TopicState":
+        state = TopicState(self.topic)
+        state.seq, state.timestamp, state.data = self.seq, self.timestamp, self.data
+        return state
+
+    def snapshot_payload(self) -> Dict[str, Any]:
+        return {
+            "type": "snapshot",
+            "topic": self.topic,
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "data": self.data
+        }
+
+    def snapshot(self) -> OutboundMessage:
+        """Full state message, built once per sequence number"""
+        if self._snapshot is None:
+            self._snapshot = OutboundMessage(self.snapshot_payload())
+        return self._snapshot
+
+
+class TopicBroadcaster:
+    """One producer per stream, fanned out by topic as sequenced deltas.
+
+    Each interval the worker holding the producer lease on the pub/sub bus
+    calls ``produce`` for the full payload per topic and publishes one batch
+    with only the changed top-level fields of each topic, as ``delta``
+    messages carrying the topic's next sequence number; unchanged topics
+    send nothing and every ``snapshot_interval`` seconds all topics are sent
+    whole. Event-driven streams pass ``snapshot_interval=None`` to stay silent
+    until something changes; their clients recover from gaps with ``resync``.
+
+    Every worker, the producer included, relays batches from the bus: it
+    mirrors each topic's state (for subscribe snapshots and resyncs) and
+    hands messages to its own ``WebSocketManager``. Event-driven streams
+    call ``notify`` to tick early; ``min_interval`` is the conflation window
+    that bounds how often that can happen. Each message is encoded
+    once per wire format in use, so serialization cost depends on the
+    number of topics rather than the number of clients.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        channels: Tuple[str, ...],
+        produce: Callable[[], Awaitable[Dict[str, Any]]],
+        manager: WebSocketManager,
+        interval: float,
+        snapshot_interval: Optional[float] = 30.0,
+        bus: Optional[PubSubBus] = None,
+        min_interval: float = 0.0
+    ):
+        self.name = name
+        self.channels = channels
+        self.produce = produce
+        self.manager = manager
+        self.interval = interval
+        self.min_interval = min_interval
+        self.snapshot_interval = snapshot_interval
+        self.bus = bus or InMemoryBus()
+        self.bus_channel = f"stream:{name}"
+        # Lease held long enough to survive a couple of slow ticks
+        self.lease_ttl = max(5.0, interval * 3)
+        self.is_running = False
+        self.is_producer = False
+        self._wake = asyncio.Event()
+        # Monotonic time the next full refresh is due; timed so notify() ticks don't shift it
+        self._next_snapshot = 0.0
+        # Producer-side state used for diffing, and the relayed mirror
+        self._produced: Dict[str, TopicState] = {}
+        self.topics: Dict[str, TopicState] = {}
+        self.stats = {
+            "broadcasts": 0,
+            "relayed_batches": 0,
+            "deltas": 0,
+            "snapshots": 0,
+            "last_serialize_ms": 0.0,
+            "last_payload_bytes": 0,
+            "last_binary_bytes": 0
+        }
+
+    def has_subscribers(self) -> bool:
+        return any(split_topic(topic)[0] in self.channels for topic in self.manager.topics)
+
+    async def start(self):
+        self.is_running = True
+        await self.bus.subscribe(self.bus_channel, self.relay)
+        logger.info(f"{self.name} broadcaster started (every {self.interval}s)")
+
+        while self.is_running:
+            started = time.perf_counter()
+            self._wake.clear()
+            try:
+                # Other workers' subscribers are invisible here, so only a
+                # single-process bus can skip ticks nobody is listening to
+                if await self._hold_lease() and (self.bus.distributed or self.has_subscribers()):
+                    await self.broadcast_once()
+            except Exception as e:
+                logger.error(f"Error in {self.name} broadcaster: {e}")
+            # Keep a steady cadence regardless of how long the tick took, but
+            # run early on notify() once the conflation window has passed
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(max(0.0, self.min_interval - elapsed))
+            remaining = self.interval - (time.perf_counter() - started)
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    def notify(self):
+        """Ask for a tick as soon as the conflation window allows"""
+        self._wake.set()
+
+    async def _hold_lease(self) -> bool:
+        is_producer = await self.bus.acquire_leadership(f"producer:{self.name}", self.lease_ttl)
+        if is_producer and not self.is_producer:
+            # Continue sequence numbers from what this worker has relayed
+            self._produced = {topic: state.copy() for topic, state in self.topics.items()}
+            self._next_snapshot = 0.0
+            logger.info(f"{self.name} broadcaster is now the producer")
+        elif self.is_producer and not is_producer:
+            logger.info(f"{self.name} broadcaster lost the producer lease")
+        self.is_producer = is_producer
+        return is_producer
+
+    def latest_message(self, topic: str) -> Optional[OutboundMessage]:
+        """Snapshot of a topic's current state, if one has been produced"""
+        state = self.topics.get(topic)
+        return state.snapshot() if state is not None and state.seq and state.complete else None
+
+    async def broadcast_once(self):
+        """Produce one tick and publish its changes as a single bus message"""
+        payloads = await self.produce()
+        timestamp = datetime.utcnow().isoformat()
+        now = time.monotonic()
+        send_snapshots = self.snapshot_interval is not None and now >= self._next_snapshot
+        if send_snapshots:
+            self._next_snapshot = now + self.snapshot_interval
+
+        batch = []
+        for topic, data in payloads.items():
+            state = self._produced.get(topic)
+            if state is None:
+                state = self._produced[topic] = TopicState(topic)
+
+            diff = None if send_snapshots else diff_payload(state.data, data)
+            if diff is None:
+                if not send_snapshots and state.seq and state.data == data:
+                    continue
+                state.update(data, timestamp)
+                batch.append(state.snapshot_payload())
+                self.stats["snapshots"] += 1
+            else:
+                changed, removed = diff
+                if not changed and not removed:
+                    continue
+                state.update(data, timestamp)
+                delta = {"type": "delta", "topic": topic, "seq": state.seq, "timestamp": timestamp, "data": changed}
+                if removed:
+                    delta["removed"] = removed
+                batch.append(delta)
+                self.stats["deltas"] += 1
+
+        self.stats["broadcasts"] += 1
+        if batch:
+            await self.bus.publish(self.bus_channel, batch)
+
+    async def relay(self, batch: List[Dict[str, Any]]):
+        """Mirror a produced batch and deliver it to this worker's subscribers"""
+        wire_formats = self.manager.wire_formats_in_use()
+        serialize_ms = 0.0
+        payload_bytes = {"json": 0, "binary": 0}
+
+        for payload in batch:
+            topic = payload["topic"]
+            state = self.topics.get(topic)
+            if state is None:
+                state = self.topics[topic] = TopicState(topic)
+            message = state.apply(payload)
+
+            if not self.manager.has_subscribers(topic):
+                continue
+            serialize_start = time.perf_counter()
+            # Encode up front for the formats subscribers use, once per message
+            for wire_format in wire_formats:
+                payload_bytes[wire_format] += len(message.encode(wire_format))
+            serialize_ms += (time.perf_counter() - serialize_start) * 1000
+
+            await self.manager.publish(topic, message)
+
+        self.stats["relayed_batches"] += 1
+        self.stats["last_serialize_ms"] = serialize_ms
+        self.stats["last_payload_bytes"] = payload_bytes["json"]
+        self.stats["last_binary_bytes"] = payload_bytes["binary"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "channels": list(self.channels),
+            "topics": len(self.topics),
+            "is_producer": self.is_producer,
+            **self.stats
+        }
+
+    def stop(self):
+        self.is_running = False
@@ -0,0 +1,64 @@
+import numpy as np
+from typing import Dict
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets; returns the indices of the kept points.
+
+    Bucket edges and the per-bucket averages are computed with vectorized
+    cumulative sums. The selection itself is inherently sequential (each
+    bucket's winner depends on the previous one), so the loop runs once
+    per output point with a vectorized triangle-area pass inside it.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    buckets = threshold - 2
+    # Inner points 1..n-2 split into ``buckets`` contiguous, non-empty ranges
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+
+    csum_x = np.concatenate(([0.0], np.cumsum(x)))
+    csum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = edges[1:] - edges[:-1]
+    avg_x = (csum_x[edges[1:]] - csum_x[edges[:-1]]) / sizes
+    avg_y = (csum_y[edges[1:]] - csum_y[edges[:-1]]) / sizes
+    # Third vertex for bucket i is the next bucket's average, or the last point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor = 0
+    for i in range(buckets):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        anchor = lo + int(area.argmax())
+        selected[i + 1] = anchor
+    return selected
+
+
+def ohlc_buckets(series: Dict[str, np.ndarray], width: int) -> Dict[str, np.ndarray]:
+    """Merge consecutive bars into ``width`` buckets, preserving extremes.
+
+    Each output bar opens at its first input bar, closes at its last and
+    keeps the true high/low, so wicks survive any level of reduction.
+    """
+    n = len(series["time"])
+    if width >= n:
+        return {field: series[field] for field in ("time", "open", "high", "low", "close", "volume")}
+
+    starts = np.unique(np.linspace(0, n, width + 1).astype(np.int64)[:-1])
+    ends = np.append(starts[1:], n) - 1
+    return {
+        "time": series["time"][starts],
+        "open": series["open"][starts],
+        "high": np.maximum.reduceat(series["high"], starts),
+        "low": np.minimum.reduceat(series["low"], starts),
+        "close": series["close"][ends],
+        "volume": np.add.reduceat(series["volume"], starts)
+    }
@@ -2,12 +2,26 @@ import asyncio
 import random
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from app.core.config import settings
+from app.services.tick_replay import TickReplayProvider
+from app.services.bar_store import BarBuffer, BAR_FIELDS, TIMEFRAME_SECONDS, resample, to_epoch_seconds
+from app.services.smart_money import SmartMoneyDetector
+from app.services.volume_profile import VolumeProfileIndex
+from app.services.downsampling import lttb, ohlc_buckets
+from app.services.broadcaster import make_topic
+
 logger = logging.getLogger(__name__)
 
 class MarketDataService:
+    # Cached range queries kept per pair between bar closes
+    MAX_CACHED_RANGES = 64
+    
+    # Indicator fields published on the smart-money stream channel
+    SMART_MONEY_FIELDS = ("order_blocks", "liquidity_zones", "fair_value_gaps", "volume_profile")
+    
     def __init__(self):
         self.current_prices = {
             "EUR/USD": 1.0850,
@@ -19,12 +33,34 @@ class MarketDataService:
         }
         
         self.technical_indicators = {}
+        self.last_volumes: Dict[str, float] = {}
+        self.market_time: Optional[datetime] = None
         self.is_running = False
+        self.replay_provider: Optional[TickReplayProvider] = None
+        self._rng = random.Random()
+        
+        # 1-minute bar buffers, volume profiles and smart-money state per pair
+        self.bars: Dict[str, BarBuffer] = {}
+        self.volume_profiles: Dict[str, VolumeProfileIndex] = {}
+        self.volume_profile_summary: Dict[str, Dict[str, Any]] = {}
+        self.smart_money: Dict[str, SmartMoneyDetector] = {}
+        
+        # Per-pair caches of resampled series and range query results,
+        # dropped whenever a new bar closes for that pair
+        self._series_cache: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._range_cache: Dict[str, Dict[Tuple, Any]] = {}
+        self.cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
         
     async def start_data_collection(self):
         """Start collecting market data"""
         self.is_running = True
-        logger.info("Market data collection started")
+        logger.info(f"Market data collection started (provider: {settings.MARKET_DATA_PROVIDER})")
+        
+        if settings.MARKET_DATA_PROVIDER == "replay":
+            await self._run_replay()
+            return
+        
+        self._seed_history(settings.MOCK_HISTORY_DAYS)
         
         while self.is_running:
             try:
@@ -34,77 +70,139 @@ class MarketDataService:
                 logger.error(f"Error in market data collection: {e}")
                 await asyncio.sleep(5)
     
+    async def _run_replay(self):
+        """Drive the service from recorded ticks instead of the random walk"""
+        # Seeded so indicator simulation is reproducible across replays
+        self._rng.seed(settings.REPLAY_SEED)
+        self.replay_provider = TickReplayProvider(
+            settings.REPLAY_DATA_PATH,
+            speed=settings.REPLAY_SPEED,
+            loop=settings.REPLAY_LOOP
+        )
+        try:
+            await self.replay_provider.stream(self._apply_tick)
+        except Exception as e:
+            logger.error(f"Error in tick replay: {e}")
+        self.is_running = False
+    
     async def _update_market_data(self):
         """Update market data with simulated values"""
-        for pair in self.current_prices:
+        now = datetime.utcnow()
+        for pair in list(self.current_prices):
             # Simulate price movement
             volatility = 0.0001  # 1 pip volatility
-            change = (random.random() - 0.5) * volatility
-            self.current_prices[pair] += change
+            change = (self._rng.random() - 0.5) * volatility
+            volume = self._rng.randint(500000, 2000000)
+            await self._apply_tick(pair, self.current_prices[pair] + change, volume, now)
+    
+    def _seed_history(self, days: int):
+        """Backfill simulated 1-minute bars so the bar buffers start warm"""
+        if days <= 0:
+            return
+        rng = np.random.default_rng(self._rng.randrange(2 ** 32))
+        count = days * 24 * 60
+        end = int(to_epoch_seconds(datetime.utcnow())) // 60 * 60
+        times = np.arange(end - count * 60, end, 60, dtype=np.int64)
+        
+        for pair, price in self.current_prices.items():
+            # Fat-tailed returns so displacement candles actually occur
+            returns = rng.standard_t(3, count) * price * 0.0002
+            closes = price + np.cumsum(returns) - returns.sum()
+            opens = np.concatenate(([closes[0] - returns[0]], closes[:-1]))
+            wicks = np.abs(rng.normal(0, price * 0.0001, (2, count)))
+            highs = np.maximum(opens, closes) + wicks[0]
+            lows = np.minimum(opens, closes) - wicks[1]
+            volumes = rng.integers(500000, 2000000, count) * 60.0
             
-            # Update technical indicators
-            await self._calculate_technical_indicators(pair)
+            bars = self._get_bar_buffer(pair)
+            bars.extend(times, opens, highs, lows, closes, volumes)
+            self.volume_profiles[pair].add_bars(times, highs, lows, closes, volumes)
+            self._on_bar_close(pair)
+        
+        logger.info(f"Seeded {count} simulated 1m bars per pair")
+    
+    def _get_bar_buffer(self, pair: str) -> BarBuffer:
+        bars = self.bars.get(pair)
+        if bars is None:
+            bars = self.bars[pair] = BarBuffer(60, max_bars=settings.BAR_HISTORY_MAX_BARS)
+            pip = 0.01 if "JPY" in pair else 0.0001
+            profile = self.volume_profiles[pair] = VolumeProfileIndex(
+                pip * settings.VOLUME_PROFILE_PIPS_PER_BIN,
+                bucket_seconds=settings.VOLUME_PROFILE_BUCKET_SECONDS,
+                max_buckets=settings.VOLUME_PROFILE_MAX_BUCKETS
+            )
+            self.smart_money[pair] = SmartMoneyDetector(profile)
+        return bars
+    
+    async def _apply_tick(self, pair: str, price: float, volume: float, timestamp: datetime):
+        """Apply a single tick from any provider to the market state"""
+        self.current_prices[pair] = price
+        self.last_volumes[pair] = volume
+        self.market_time = timestamp
+        
+        bars = self._get_bar_buffer(pair)
+        self.volume_profiles[pair].add(timestamp, price, volume)
+        if bars.update(timestamp, price, volume):
+            self._on_bar_close(pair)
+        
+        # Update technical indicators
+        await self._calculate_technical_indicators(pair)
+    
+    def _on_bar_close(self, pair: str):
+        """Run bar-driven analytics once per closed bar"""
+        bars = self.bars[pair]
+        self._invalidate_bar_cache(pair)
+        self.smart_money[pair].update(bars)
+        
+        session_start = float(bars.time[-1]) - settings.VOLUME_PROFILE_SESSION_SECONDS
+        self.volume_profile_summary[pair] = self.volume_profiles[pair].summary(start=session_start)
     
     async def _calculate_technical_indicators(self, pair: str):
         """Calculate technical indicators for a currency pair"""
         price = self.current_prices[pair]
+        smart_money = self.smart_money[pair]
+        flow_start = to_epoch_seconds(self.market_time) - settings.INSTITUTIONAL_FLOW_WINDOW_SECONDS
         
         # Simulate technical indicators
         self.technical_indicators[pair] = {
-            "rsi": 30 + random.random() * 40,  # RSI between 30-70
-            "macd": (random.random() - 0.5) * 0.002,
-            "macd_signal": (random.random() - 0.5) * 0.0015,
-            "ema_20": price + (random.random() - 0.5) * 0.001,
-            "ema_50": price + (random.random() - 0.5) * 0.002,
+            "rsi": 30 + self._rng.random() * 40,  # RSI between 30-70
+            "macd": (self._rng.random() - 0.5) * 0.002,
+            "macd_signal": (self._rng.random() - 0.5) * 0.0015,
+            "ema_20": price + (self._rng.random() - 0.5) * 0.001,
+            "ema_50": price + (self._rng.random() - 0.5) * 0.002,
             "bollinger_upper": price + 0.002,
             "bollinger_lower": price - 0.002,
-            "volatility": random.random() * 100,
-            "volume": random.randint(500000, 2000000),
-            "institutional_flow": (random.random() - 0.5) * 100,
-            "order_blocks": self._generate_order_blocks(price),
-            "liquidity_zones": self._generate_liquidity_zones(price)
+            "volatility": self._rng.random() * 100,
+            "volume": self.last_volumes.get(pair, 0),
+            "institutional_flow": self.volume_profiles[pair].flow(start=flow_start),
+            "volume_profile": self.volume_profile_summary.get(pair, {}),
+            "order_blocks": smart_money.order_blocks,
+            "liquidity_zones": smart_money.liquidity_zones,
+            "fair_value_gaps": smart_money.fair_value_gaps
         }
     
-    def _generate_order_blocks(self, price: float) -> List[Dict]:
-        """Generate simulated order blocks"""
-        return [
-            {
-                "price": price + 0.0025,
-                "type": "bullish",
-                "strength": random.choice(["high", "medium", "low"]),
-                "time": datetime.utcnow().isoformat()
-            },
-            {
-                "price": price - 0.0025,
-                "type": "bearish", 
-                "strength": random.choice(["high", "medium", "low"]),
-                "time": datetime.utcnow().isoformat()
-            }
-        ]
-    
-    def _generate_liquidity_zones(self, price: float) -> List[Dict]:
-        """Generate simulated liquidity zones"""
-        return [
-            {
-                "price": price + 0.004,
-                "type": "buy",
-                "volume": random.choice(["high", "medium", "low"])
-            },
-            {
-                "price": price - 0.004,
-                "type": "sell",
-                "volume": random.choice(["high", "medium", "low"])
-            }
-        ]
-    
     async def get_real_time_data(self) -> Dict[str, Any]:
         """Get current real-time market data"""
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": (self.market_time or datetime.utcnow()).isoformat(),
             "prices": self.current_prices.copy(),
             "technical_indicators": self.technical_indicators.copy()
         }
     
+    async def get_topic_payloads(self) -> Dict[str, Any]:
+        """Current market data split into per-pair stream topics"""
+        payloads = {}
+        for pair, price in self.current_prices.items():
+            indicators = self.technical_indicators.get(pair, {})
+            payloads[make_topic("prices", pair)] = {"price": price}
+            payloads[make_topic("indicators", pair)] = {
+                key: value for key, value in indicators.items() if key not in self.SMART_MONEY_FIELDS
+            }
+            payloads[make_topic("smart-money", pair)] = {
+                key: indicators.get(key) for key in self.SMART_MONEY_FIELDS
+            }
+        return payloads
+    
     async def get_current_market_state(self) -> Dict[str, Dict]:
         """Get current market state for ML processing"""
         market_state = {}
@@ -124,42 +222,198 @@ class MarketDataService:
                 "volatility": indicators.get("volatility", 50),
                 "volume": indicators.get("volume", 1000000),
                 "institutional_flow": indicators.get("institutional_flow", 0),
+                "volume_profile": indicators.get("volume_profile", {}),
                 "order_blocks": indicators.get("order_blocks", []),
-                "liquidity_zones": indicators.get("liquidity_zones", [])
+                "liquidity_zones": indicators.get("liquidity_zones", []),
+                "fair_value_gaps": indicators.get("fair_value_gaps", [])
             }
         
         return market_state
     
+    def _invalidate_bar_cache(self, pair: str):
+        self._series_cache.pop(pair, None)
+        if self._range_cache.pop(pair, None):
+            self.cache_stats["invalidations"] += 1
+    
+    def _get_series(self, pair: str, timeframe: str) -> Dict[str, Any]:
+        series_by_timeframe = self._series_cache.setdefault(pair, {})
+        series = series_by_timeframe.get(timeframe)
+        if series is None:
+            series = series_by_timeframe[timeframe] = resample(self.bars[pair], TIMEFRAME_SECONDS[timeframe])
+        return series
+    
+    def _cached(self, pair: str, key: Tuple, build):
+        cache = self._range_cache.setdefault(pair, {})
+        result = cache.get(key)
+        if result is not None:
+            self.cache_stats["hits"] += 1
+            return result
+        
+        self.cache_stats["misses"] += 1
+        result = build()
+        if len(cache) >= self.MAX_CACHED_RANGES:
+            cache.pop(next(iter(cache)))
+        cache[key] = result
+        return result
+    
+    def _check_bar_query(self, pair: str, timeframe: str):
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        if pair not in self.bars:
+            raise KeyError(f"No bar history for {pair}")
+    
+    def _slice_series(
+        self,
+        pair: str,
+        timeframe: str,
+        start: Optional[int],
+        end: Optional[int],
+        limit: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], int, int]:
+        """Closed-bar index range [lo, hi) of the cached series for [start, end)"""
+        series = self._get_series(pair, timeframe)
+        times = series["time"]
+        closed = len(times) if series["complete"] else len(times) - 1
+        lo = 0 if start is None else int(np.searchsorted(times[:closed], start, side="left"))
+        hi = closed if end is None else int(np.searchsorted(times[:closed], end, side="left"))
+        hi = max(lo, hi)
+        if limit:
+            lo = max(lo, hi - limit)
+        return series, lo, hi
+    
+    def get_bars(
+        self,
+        pair: str,
+        timeframe: str = "1h",
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Closed bars opening in [start, end) as columnar arrays.
+        
+        ``start``/``end`` are epoch seconds; ``limit`` keeps the most recent
+        bars of the range. Results are cached until the pair's next bar
+        close, so callers must treat them as read-only.
+        """
+        self._check_bar_query(pair, timeframe)
+        
+        def build():
+            series, lo, hi = self._slice_series(pair, timeframe, start, end, limit)
+            return {
+                "pair": pair,
+                "timeframe": timeframe,
+                "count": hi - lo,
+                **{field: series[field][lo:hi].tolist() for field in BAR_FIELDS}
+            }
+        
+        return self._cached(pair, ("bars", timeframe, start, end, limit), build)
+    
+    def get_downsampled_bars(
+        self,
+        pair: str,
+        timeframe: str = "1m",
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        width: int = 1000,
+        method: str = "lttb"
+    ) -> Dict[str, Any]:
+        """Closed bars in [start, end) reduced to about ``width`` points for charting.
+        
+        ``lttb`` keeps the visually significant close prices; ``ohlc`` merges
+        bars into ``width`` candles that keep their true highs and lows.
+        """
+        self._check_bar_query(pair, timeframe)
+        if method not in ("lttb", "ohlc"):
+            raise ValueError(f"Unsupported downsampling method: {method}")
+        
+        def build():
+            series, lo, hi = self._slice_series(pair, timeframe, start, end)
+            window = {field: series[field][lo:hi] for field in BAR_FIELDS}
+            if method == "lttb":
+                keep = lttb(window["time"], window["close"], width)
+                columns = {"time": window["time"][keep], "close": window["close"][keep]}
+            else:
+                columns = ohlc_buckets(window, width)
+            return {
+                "pair": pair,
+                "timeframe": timeframe,
+                "method": method,
+                "source_count": hi - lo,
+                "count": len(columns["time"]),
+                **{field: values.tolist() for field, values in columns.items()}
+            }
+        
+        return self._cached(pair, ("downsampled", timeframe, start, end, width, method), build)
+    
+    def get_bars_since(self, pair: str, timeframe: str, since: float) -> Dict[str, Any]:
+        """Closed bars opening after ``since`` - the delta for a client holding bars up to T"""
+        return self.get_bars(pair, timeframe, start=int(since) + 1)
+    
+    def get_partial_bar(self, pair: str, timeframe: str) -> Optional[Dict[str, float]]:
+        """The still-forming bar of the timeframe, including the live 1m bar"""
+        self._check_bar_query(pair, timeframe)
+        timeframe_seconds = TIMEFRAME_SECONDS[timeframe]
+        series = self._get_series(pair, timeframe)
+        forming = self.bars[pair].current_bar
+        
+        partial = None
+        if not series["complete"]:
+            partial = {field: series[field][-1].item() for field in BAR_FIELDS}
+        if forming is None:
+            return partial
+        if partial is None:
+            return {**forming, "time": int(forming["time"]) // timeframe_seconds * timeframe_seconds}
+        
+        partial["high"] = max(partial["high"], forming["high"])
+        partial["low"] = min(partial["low"], forming["low"])
+        partial["close"] = forming["close"]
+        partial["volume"] += forming["volume"]
+        return partial
+    
     async def get_historical_data(self, pair: str, timeframe: str = "1h", limit: int = 100) -> List[Dict]:
         """Get historical market data"""
-        # Simulate historical data
-        data = []
-        current_time = datetime.utcnow()
-        current_price = self.current_prices.get(pair, 1.0850)
+        if pair not in self.bars:
+            return []
         
-        for i in range(limit):
-            timestamp = current_time - timedelta(hours=i)
-            
-            # Simulate OHLC data
-            open_price = current_price + (random.random() - 0.5) * 0.01
-            high_price = open_price + random.random() * 0.005
-            low_price = open_price - random.random() * 0.005
-            close_price = open_price + (random.random() - 0.5) * 0.003
-            
-            data.append({
-                "timestamp": timestamp.isoformat(),
-                "open": open_price,
-                "high": high_price,
-                "low": low_price,
-                "close": close_price,
-                "volume": random.randint(500000, 2000000)
-            })
-            
-            current_price = close_price
+        def build():
+            bars = self.get_bars(pair, timeframe, limit=limit)
+            return [
+                {
+                    "timestamp": datetime.utcfromtimestamp(t).isoformat(),
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "volume": v
+                }
+                for t, o, h, l, c, v in zip(
+                    bars["time"], bars["open"], bars["high"], bars["low"], bars["close"], bars["volume"]
+                )
+            ]
         
-        return list(reversed(data))  # Return chronological order
+        return self._cached(pair, ("records", timeframe, limit), build)
+    
+    def get_replay_status(self) -> Dict[str, Any]:
+        """Get progress and throughput of the tick replay, if one is running"""
+        if not self.replay_provider:
+            return {"provider": settings.MARKET_DATA_PROVIDER, "replay": None}
+        return {
+            "provider": settings.MARKET_DATA_PROVIDER,
+            "replay": {
+                "running": self.replay_provider.is_running,
+                "speed": self.replay_provider.speed,
+                **self.replay_provider.stats
+            }
+        }
     
     async def cleanup(self):
         """Cleanup market data service"""
         self.is_running = False
-        logger.info("Market data service stopped")
\ No newline at end of file
+        if self.replay_provider:
+            self.replay_provider.stop()
+        logger.info("Market data service stopped")
+
+
+# Shared instance: the collector started by the API server is the one that
+# routes and signal generation read from
+market_data_service = MarketDataService()
@@ -6,17 +6,19 @@ import torch.nn as nn
 import torch.optim as optim
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
+from sqlalchemy import select
 import asyncio
 import json
 import logging
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime, timedelta
 import pickle
+import uuid
 
-from app.core.database import get_db, Trade, TradingSignal, MarketData
+from app.core.database import AsyncSessionLocal, Trade, TradingSignal, MarketData
 from app.models.mcts import MCTSNode, MCTSTrader
 from app.models.neural_networks import PolicyNetwork, ValueNetwork
-from app.services.market_data import MarketDataService
+from app.services.market_data import market_data_service
 
 logger = logging.getLogger(__name__)
 
@@ -80,7 +82,6 @@ class MLService:
     async def generate_trading_signals(self) -> List[Dict[str, Any]]:
         """Generate trading signals using MCTS and neural networks"""
         try:
-            market_data_service = MarketDataService()
             current_data = await market_data_service.get_current_market_state()
             
             signals = []
@@ -118,6 +119,7 @@ class MLService:
             market_data.get("bollinger_upper", 0),
             market_data.get("bollinger_lower", 0),
             market_data.get("institutional_flow", 0),
+            *self._volume_profile_features(market_data),
             # Add more features as needed
         ]
         
@@ -127,6 +129,20 @@ class MLService:
         
         return np.array(features[:20], dtype=np.float32)
     
+    def _volume_profile_features(self, market_data: Dict) -> List[float]:
+        """Price location relative to the session point of control and value area"""
+        profile = market_data.get("volume_profile") or {}
+        price = market_data.get("close_price", 0)
+        poc = profile.get("poc")
+        high = profile.get("value_area_high")
+        low = profile.get("value_area_low")
+        if not price or poc is None or high is None or low is None or high <= low:
+            return [0.0, 0.0]
+        
+        poc_distance = (price - poc) / price * 10000  # in basis points
+        value_area_position = (price - low) / (high - low) * 2 - 1  # -1..1 inside the value area
+        return [poc_distance, value_area_position]
+    
     async def _run_mcts_analysis(self, market_state: np.ndarray) -> Tuple[int, float, float]:
         """Run MCTS analysis to determine best trading action"""
         try:
@@ -162,7 +178,7 @@ class MLService:
     ) -> Dict[str, Any]:
         """Create a trading signal from MCTS analysis"""
         
-        current_price = market_state[0]
+        current_price = float(market_state[0])  # plain float so signals stay JSON serializable
         
         # Determine signal type
         signal_type = "buy" if action == 0 else "sell" if action == 1 else "hold"
@@ -195,7 +211,7 @@ class MLService:
         reasoning = self._generate_signal_reasoning(market_state, action, confidence)
         
         return {
-            "id": f"signal_{datetime.utcnow().timestamp()}",
+            "id": str(uuid.uuid4()),
             "type": signal_type,
             "pair": pair,
             "entry_price": entry_price,
@@ -374,10 +390,10 @@ class MLService:
         while True:
             try:
                 # Get recent trades from database
-                db = next(get_db())
-                recent_trades = db.query(Trade).filter(
-                    Trade.created_at > datetime.utcnow() - timedelta(hours=1)
-                ).all()
+                async with AsyncSessionLocal() as db:
+                    recent_trades = (await db.execute(select(Trade).where(
+                        Trade.created_at > datetime.utcnow() - timedelta(hours=1)
+                    ))).scalars().all()
                 
                 if recent_trades:
                     trade_data = [
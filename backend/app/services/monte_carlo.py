@@ -0,0 +1,218 @@
+import asyncio
+import multiprocessing
+import secrets
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Position sizes simulated around the requested risk per trade
+SENSITIVITY_MULTIPLIERS = (0.25, 0.5, 1.0, 1.5, 2.0, 3.0)
+
+DRAWDOWN_PERCENTILES = (5, 25, 50, 75, 95, 99)
+RETURN_PERCENTILES = (5, 25, 50, 75, 95)
+
+MIN_TRADES = 20
+
+# Equity a wipeout is clipped to, so its log stays finite
+WIPEOUT_EQUITY = 1e-12
+# Equity at or below this fraction of the start is wiped out, whatever ruin_pct is; a clipped
+# wipeout stays under it unless the path had first grown a millionfold
+RUIN_FLOOR = 1e-6
+
+# Paths per chunk are sized so a chunk's (paths x horizon) matrix holds about this many cells
+CHUNK_CELLS = 2_000_000
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def r_multiples(profit: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Trade P&L in units of the average loss, which stands in for 1R as trades store no initial risk"""
+    losses = profit[profit < 0]
+    if len(losses) == 0:
+        raise ValueError("At least one losing trade is needed to size risk per trade")
+    unit = float(-losses.mean())
+    return profit / unit, unit
+
+
+def _simulate_chunk(
+    returns: np.ndarray,
+    risk_fractions: np.ndarray,
+    paths: int,
+    horizon: int,
+    seed: np.random.SeedSequence
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bootstrap ``paths`` sequences of ``horizon`` trades and compound them at each risk fraction.
+
+    Works in log equity, so compounding is a running sum. The draws are one
+    (horizon x paths) matrix; equity, peak, worst drawdown and low are
+    advanced a trade at a time across all paths, which keeps every step a
+    contiguous vector operation and never materializes the equity matrix.
+    Returns (levels x paths) arrays of the worst log drawdown, the lowest
+    log equity and the final log equity relative to the starting balance.
+    """
+    draws = np.random.default_rng(seed).integers(len(returns), size=(horizon, paths), dtype=np.int32)
+    # A loss of more than 100% of equity wipes the account rather than going negative;
+    # float32 halves the memory traffic and keeps ample precision for percentiles
+    growth_tables = np.log(np.clip(1.0 + np.outer(risk_fractions, returns), WIPEOUT_EQUITY, None)).astype(np.float32)
+
+    worst_drawdown = np.empty((len(risk_fractions), paths))
+    lowest = np.empty((len(risk_fractions), paths))
+    final = np.empty((len(risk_fractions), paths))
+    step = np.empty(paths, dtype=np.float32)
+    for level, growth in enumerate(growth_tables):
+        # The starting balance is the first peak and the first low
+        equity = np.zeros(paths, dtype=np.float32)
+        peak = np.zeros(paths, dtype=np.float32)
+        worst = np.zeros(paths, dtype=np.float32)
+        low = np.zeros(paths, dtype=np.float32)
+        for trades in draws:
+            np.take(growth, trades, out=step)
+            np.add(equity, step, out=equity)
+            np.maximum(peak, equity, out=peak)
+            np.subtract(peak, equity, out=step)
+            np.maximum(worst, step, out=worst)
+            np.minimum(low, equity, out=low)
+        worst_drawdown[level] = worst
+        lowest[level] = low
+        final[level] = equity
+    return worst_drawdown, lowest, final
+
+
+def _chunks(paths: int, horizon: int, seed: Optional[int]) -> List[Tuple[int, np.random.SeedSequence]]:
+    """Path counts with their own seeds; fixed by ``seed`` however the chunks are spread over workers"""
+    size = max(1, CHUNK_CELLS // horizon)
+    counts = [min(size, paths - start) for start in range(0, paths, size)]
+    return list(zip(counts, np.random.SeedSequence(seed).spawn(len(counts))))
+
+
+def _percentiles(values: np.ndarray, percentiles: Sequence[int]) -> Dict[str, float]:
+    return {f"p{p}": round(float(value), 2) for p, value in zip(percentiles, np.percentile(values, percentiles))}
+
+
+def summarize(
+    results: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    risk_percentages: Sequence[float],
+    initial_balance: float,
+    ruin_pct: float
+) -> List[Dict[str, Any]]:
+    """Drawdown and return distributions and risk of ruin per risk level across all chunks"""
+    worst_drawdown, lowest, final = (np.concatenate(arrays, axis=1) for arrays in zip(*results))
+    ruin_level = np.log(max(1.0 - ruin_pct / 100, RUIN_FLOOR))
+    levels = []
+    for level, risk_percentage in enumerate(risk_percentages):
+        drawdown_pct = -np.expm1(-worst_drawdown[level]) * 100
+        return_pct = np.expm1(final[level]) * 100
+        levels.append({
+            "risk_percentage": risk_percentage,
+            "risk_amount": round(initial_balance * risk_percentage / 100, 2),
+            "risk_of_ruin": round(float(np.mean(lowest[level] <= ruin_level)), 5),
+            "probability_of_profit": round(float(np.mean(final[level] > 0)), 5),
+            "max_drawdown_pct": {"mean": round(float(drawdown_pct.mean()), 2), **_percentiles(drawdown_pct, DRAWDOWN_PERCENTILES)},
+            "return_pct": {"mean": round(float(return_pct.mean()), 2), **_percentiles(return_pct, RETURN_PERCENTILES)},
+            "median_final_equity": round(float(initial_balance * np.exp(np.median(final[level]))), 2)
+        })
+    return levels
+
+
+def simulate(
+    returns: np.ndarray,
+    risk_percentages: Sequence[float],
+    paths: int,
+    horizon: int,
+    initial_balance: float,
+    ruin_pct: float,
+    seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Run every chunk in this process; see ``run_simulation`` for the sharded version"""
+    risk_fractions = np.asarray(risk_percentages) / 100
+    results = [
+        _simulate_chunk(returns, risk_fractions, count, horizon, chunk_seed)
+        for count, chunk_seed in _chunks(paths, horizon, seed)
+    ]
+    return summarize(results, risk_percentages, initial_balance, ruin_pct)
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Spawned rather than forked: the server process runs an event loop and threads
+        _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"Monte Carlo process pool started with {workers} workers")
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+async def run_simulation(
+    profit: np.ndarray,
+    risk_percentage: float,
+    paths: int,
+    horizon: Optional[int] = None,
+    initial_balance: float = 10000.0,
+    ruin_pct: float = 50.0,
+    seed: Optional[int] = None,
+    workers: int = 0
+) -> Dict[str, Any]:
+    """Monte Carlo risk of ruin, drawdown and return distributions for a history of closed-trade profits.
+
+    Trades are resampled with replacement as R-multiples and compounded
+    with fixed-fractional sizing at ``risk_percentage`` and the
+    ``SENSITIVITY_MULTIPLIERS`` around it. ``horizon`` defaults to the
+    history's length. With ``workers`` the chunks are spread over a shared
+    process pool; otherwise they run on a worker thread.
+    """
+    if len(profit) < MIN_TRADES:
+        raise ValueError(f"At least {MIN_TRADES} closed trades are needed, found {len(profit)}")
+    returns, unit = r_multiples(profit)
+    horizon = horizon or min(len(profit), settings.MONTE_CARLO_MAX_HORIZON)
+    risk_percentages = sorted({round(risk_percentage * multiplier, 4) for multiplier in SENSITIVITY_MULTIPLIERS})
+    # Reported back, so any run can be reproduced
+    seed = secrets.randbits(32) if seed is None else seed
+
+    if workers:
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool(workers)
+        risk_fractions = np.asarray(risk_percentages) / 100
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, _simulate_chunk, returns, risk_fractions, count, horizon, chunk_seed)
+            for count, chunk_seed in _chunks(paths, horizon, seed)
+        ))
+        levels = await asyncio.to_thread(summarize, results, risk_percentages, initial_balance, ruin_pct)
+    else:
+        levels = await asyncio.to_thread(
+            simulate, returns, risk_percentages, paths, horizon, initial_balance, ruin_pct, seed
+        )
+
+    win_rate = float(np.mean(returns > 0))
+    loss_rate = float(np.mean(returns < 0))
+    avg_win = float(returns[returns > 0].mean()) if win_rate else 0.0
+    return {
+        "model": {
+            "trades": len(profit),
+            "risk_unit": round(unit, 2),
+            "win_rate": round(win_rate * 100, 1),
+            "expectancy_r": round(float(returns.mean()), 3),
+            "payoff_ratio": round(avg_win, 3),
+            # Full Kelly in R terms; the average loss is 1R by construction
+            "kelly_risk_percentage": round(max(win_rate - loss_rate / avg_win, 0.0) * 100, 2) if avg_win else 0.0,
+            "paths": paths,
+            "horizon": horizon,
+            "initial_balance": initial_balance,
+            "ruin_pct": ruin_pct,
+            "seed": seed,
+            "workers": workers
+        },
+        "risk_percentage": risk_percentage,
+        "result": next(level for level in levels if level["risk_percentage"] == round(risk_percentage, 4)),
+        "sensitivity": levels
+    }
@@ -0,0 +1,301 @@
+import numpy as np
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.core.database import Trade
+
+logger = logging.getLogger(__name__)
+
+# Fixed-width buckets in seconds; "1M" is calendar months
+BUCKET_SECONDS = {
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+    "1w": 604800
+}
+BUCKETS = (*BUCKET_SECONDS, "1M")
+
+MAX_BUCKETS = 10000
+
+LOAD_BATCH_SIZE = 50000
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Epoch day 4 (1970-01-05) was a Monday; weeks are aligned to it
+MONDAY_OFFSET_SECONDS = 4 * 86400
+
+SECONDS_PER_DAY = 86400
+
+
+def _empty_trades() -> Dict[str, np.ndarray]:
+    return {"time": np.empty(0, dtype=np.int64), "profit": np.empty(0), "pips": np.empty(0)}
+
+
+async def load_closed_trades(
+    db: AsyncSession,
+    cutoff: Optional[datetime] = None,
+    pair: Optional[str] = None,
+    strategy: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    """Closed trades as columnar arrays in close order: epoch-second close time, profit and pips.
+
+    Rows stream in ``LOAD_BATCH_SIZE`` partitions straight into arrays, so
+    no ORM objects are built and the event loop gets a turn per batch.
+    """
+    closed_at = func.coalesce(Trade.updated_at, Trade.created_at)
+    statement = select(closed_at, Trade.profit, Trade.pips).where(
+        Trade.status == "closed",
+        Trade.profit.isnot(None)
+    )
+    if cutoff is not None:
+        statement = statement.where(closed_at >= cutoff)
+    if pair:
+        statement = statement.where(Trade.pair == pair)
+    if strategy:
+        statement = statement.where(Trade.strategy == strategy)
+    statement = statement.order_by(closed_at, Trade.id).execution_options(yield_per=LOAD_BATCH_SIZE)
+
+    times: List[np.ndarray] = []
+    profits: List[np.ndarray] = []
+    pips: List[np.ndarray] = []
+    result = await db.stream(statement)
+    async for batch in result.partitions():
+        columns = list(zip(*batch))
+        times.append(np.array(columns[0], dtype="datetime64[s]").astype(np.int64))
+        profits.append(np.array(columns[1], dtype=np.float64))
+        pips.append(np.array([value or 0.0 for value in columns[2]], dtype=np.float64))
+    if not times:
+        return _empty_trades()
+    return {"time": np.concatenate(times), "profit": np.concatenate(profits), "pips": np.concatenate(pips)}
+
+
+def bucket_starts(times: np.ndarray, bucket: str) -> np.ndarray:
+    """Epoch-second start of the ``bucket`` each time falls in (UTC, weeks start Monday)"""
+    if bucket == "1M":
+        return times.astype("datetime64[s]").astype("datetime64[M]").astype("datetime64[s]").astype(np.int64)
+    if bucket not in BUCKET_SECONDS:
+        raise ValueError(f"Unsupported bucket: {bucket}. Use one of {', '.join(BUCKETS)}")
+    seconds = BUCKET_SECONDS[bucket]
+    offset = MONDAY_OFFSET_SECONDS if bucket == "1w" else 0
+    return (times - offset) // seconds * seconds + offset
+
+
+def _finite(value: float, digits: int = 2) -> Optional[float]:
+    # + 0.0 turns -0.0 into 0.0
+    return round(float(value), digits) + 0.0 if np.isfinite(value) else None
+
+
+def _column(values: np.ndarray, digits: int = 2) -> List[Optional[float]]:
+    """JSON-safe list: rounded, with NaN and infinities as null and -0.0 as 0.0"""
+    rounded = np.round(values.astype(np.float64), digits) + 0.0
+    return [value if np.isfinite(value) else None for value in rounded.tolist()]
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, numerator / denominator, np.nan)
+
+
+def _drawdown(times: np.ndarray, curve: np.ndarray) -> Dict[str, Any]:
+    """Deepest and longest drawdowns of an equity curve whose point i follows trade i"""
+    points = np.arange(len(curve))
+    peak = np.maximum.accumulate(curve)
+    drawdown = curve - peak
+    at_peak = drawdown == 0
+    last_peak = np.maximum.accumulate(np.where(at_peak, points, 0))
+    # First new high at or after each point; len(curve) while still underwater
+    next_peak = np.minimum.accumulate(np.where(at_peak, points, len(curve))[::-1])[::-1]
+
+    trough = int(np.argmin(drawdown))
+    start = int(last_peak[trough])
+    recovery = int(next_peak[trough])
+    depth = float(-drawdown[trough])
+
+    # Underwater stretches run from their peak to the recovery, or to the last trade
+    end_points = np.minimum(next_peak, len(curve) - 1)
+    durations = np.where(at_peak, 0, times[end_points] - times[last_peak])
+    longest = int(np.argmax(durations))
+    longest_recovered = bool(next_peak[longest] < len(curve))
+
+    return {
+        "max_drawdown": _finite(depth),
+        "max_drawdown_pct": _finite(depth / peak[trough] * 100) if peak[trough] > 0 else None,
+        "max_drawdown_start": int(times[start]),
+        "max_drawdown_trough": int(times[trough]),
+        "max_drawdown_recovery": int(times[recovery]) if recovery < len(curve) else None,
+        "max_drawdown_trades": trough - start,
+        "longest_drawdown_seconds": int(durations[longest]),
+        "longest_drawdown_days": _finite(durations[longest] / SECONDS_PER_DAY),
+        "longest_drawdown_start": int(times[last_peak[longest]]) if durations[longest] else None,
+        "longest_drawdown_recovered": longest_recovered if durations[longest] else None,
+        "current_drawdown": _finite(-drawdown[-1]),
+        "current_drawdown_pct": _finite(-drawdown[-1] / peak[-1] * 100) if peak[-1] > 0 else None,
+        "drawdown": drawdown,
+        "peak": peak
+    }
+
+
+def _daily_risk(times: np.ndarray, profit: np.ndarray, initial_balance: float) -> Dict[str, Any]:
+    """Annualized Sharpe and Sortino of daily returns on starting equity.
+
+    Every weekday between the first and last close counts, with a zero
+    return when nothing closed; weekend days only count if a trade closed.
+    """
+    days = times // SECONDS_PER_DAY
+    first_day = int(days[0])
+    daily_pnl = np.bincount(days - first_day, weights=profit)
+    day_numbers = np.arange(first_day, first_day + len(daily_pnl))
+    weekday = (day_numbers - 4) % 7 < 5
+    keep = weekday | (daily_pnl != 0)
+
+    opening_equity = initial_balance + np.concatenate(([0.0], np.cumsum(daily_pnl)[:-1]))
+    returns = _ratio(daily_pnl, np.where(opening_equity > 0, opening_equity, 0))[keep]
+    returns = returns[np.isfinite(returns)]
+    if len(returns) < 2:
+        return {"sharpe_ratio": None, "sortino_ratio": None, "daily_volatility_pct": None, "days": len(returns)}
+
+    mean = returns.mean()
+    volatility = returns.std(ddof=1)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+    annualize = np.sqrt(TRADING_DAYS_PER_YEAR)
+    return {
+        "sharpe_ratio": _finite(mean / volatility * annualize, 3) if volatility > 0 else None,
+        "sortino_ratio": _finite(mean / downside * annualize, 3) if downside > 0 else None,
+        "daily_volatility_pct": _finite(volatility * 100, 3),
+        "days": len(returns)
+    }
+
+
+def _streaks(profit: np.ndarray) -> Dict[str, Any]:
+    """Longest and current runs of consecutive wins and losses; breakeven trades end a run"""
+    outcome = np.sign(profit).astype(np.int8)
+    starts = np.concatenate(([0], np.flatnonzero(outcome[1:] != outcome[:-1]) + 1))
+    lengths = np.diff(np.append(starts, len(outcome)))
+    run_outcome = outcome[starts]
+    current = {1: "win", -1: "loss", 0: "breakeven"}[int(run_outcome[-1])]
+    return {
+        "max_win_streak": int(lengths[run_outcome > 0].max(initial=0)),
+        "max_loss_streak": int(lengths[run_outcome < 0].max(initial=0)),
+        "current_streak": {"type": current, "length": int(lengths[-1])}
+    }
+
+
+def _rolling(profit: np.ndarray, window: int, points: np.ndarray) -> Dict[str, np.ndarray]:
+    """Expectancy, win rate, profit factor and per-trade Sharpe over the ``window`` trades up to each of ``points``"""
+    ends = points + 1
+    starts = np.maximum(ends - window, 0)
+
+    def window_sum(values: np.ndarray) -> np.ndarray:
+        totals = np.concatenate(([0.0], np.cumsum(values)))
+        return totals[ends] - totals[starts]
+
+    count = ends - starts
+    mean = window_sum(profit) / count
+    variance = (window_sum(profit ** 2) - count * mean ** 2) / np.maximum(count - 1, 1)
+    std = np.sqrt(np.clip(variance, 0, None))
+    return {
+        "rolling_trades": count,
+        "rolling_expectancy": mean,
+        "rolling_win_rate": window_sum((profit > 0).astype(np.float64)) / count * 100,
+        "rolling_profit_factor": _ratio(window_sum(np.where(profit > 0, profit, 0)), -window_sum(np.where(profit < 0, profit, 0))),
+        "rolling_sharpe": np.where(count > 1, _ratio(mean, std), np.nan)
+    }
+
+
+def compute_performance(
+    trades: Dict[str, np.ndarray],
+    initial_balance: float = 10000.0,
+    bucket: str = "1d",
+    window: int = 50
+) -> Dict[str, Any]:
+    """Equity curve, drawdowns, risk ratios, expectancy, streaks and rolling metrics in one pass.
+
+    ``trades`` are the columnar arrays from ``load_closed_trades``. The
+    series is bucketed by close time and reports each non-empty bucket's
+    closing equity, drawdown and rolling metrics.
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    times = trades["time"]
+    profit = trades["profit"]
+    count = len(profit)
+    buckets = bucket_starts(times, bucket)
+    if count == 0:
+        return {
+            "summary": {"trades": 0, "initial_balance": initial_balance, "final_equity": initial_balance},
+            "drawdown": None,
+            "risk": None,
+            "streaks": None,
+            "series": {"bucket": bucket, "window": window, "count": 0}
+        }
+
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    if len(starts) > MAX_BUCKETS:
+        raise ValueError(f"{len(starts)} {bucket} buckets exceed the limit of {MAX_BUCKETS}; use a coarser bucket")
+    ends = np.append(starts[1:], count) - 1
+
+    equity = initial_balance + np.cumsum(profit)
+    # Point 0 is the starting balance, timed at the first close
+    curve = np.concatenate(([initial_balance], equity))
+    drawdown = _drawdown(np.concatenate((times[:1], times)), curve)
+    trade_drawdown = drawdown.pop("drawdown")[1:]
+    trade_peak = drawdown.pop("peak")[1:]
+
+    wins = profit > 0
+    losses = profit < 0
+    gross_win = float(profit[wins].sum())
+    gross_loss = float(profit[losses].sum())
+    win_count = int(wins.sum())
+    loss_count = int(losses.sum())
+    avg_win = gross_win / win_count if win_count else 0.0
+    avg_loss = gross_loss / loss_count if loss_count else 0.0
+    net_profit = float(equity[-1] - initial_balance)
+
+    rolling = _rolling(profit, window, ends)
+
+    return {
+        "summary": {
+            "trades": count,
+            "first_close": int(times[0]),
+            "last_close": int(times[-1]),
+            "initial_balance": initial_balance,
+            "final_equity": round(float(equity[-1]), 2),
+            "net_profit": round(net_profit, 2),
+            "return_pct": round(net_profit / initial_balance * 100, 2) if initial_balance else None,
+            "total_pips": round(float(trades["pips"].sum()), 1),
+            "win_rate": round(win_count / count * 100, 1),
+            "avg_win": round(avg_win, 2),
+            "avg_loss": round(avg_loss, 2),
+            "payoff_ratio": round(avg_win / -avg_loss, 3) if avg_loss else None,
+            "profit_factor": round(gross_win / -gross_loss, 3) if gross_loss else None,
+            "expectancy": round(net_profit / count, 2),
+            "best_trade": round(float(profit.max()), 2),
+            "worst_trade": round(float(profit.min()), 2)
+        },
+        "drawdown": drawdown,
+        "risk": _daily_risk(times, profit, initial_balance),
+        "streaks": _streaks(profit),
+        "series": {
+            "bucket": bucket,
+            "window": window,
+            "count": len(starts),
+            "time": buckets[starts].tolist(),
+            "trades": np.diff(np.append(starts, count)).tolist(),
+            "profit": _column(np.add.reduceat(profit, starts)),
+            "pips": _column(np.add.reduceat(trades["pips"], starts), 1),
+            "win_rate": _column(np.add.reduceat(wins.astype(np.float64), starts) / np.diff(np.append(starts, count)) * 100, 1),
+            "equity": _column(equity[ends]),
+            "equity_high": _column(np.maximum.reduceat(equity, starts)),
+            "equity_low": _column(np.minimum.reduceat(equity, starts)),
+            "drawdown": _column(-trade_drawdown[ends]),
+            "drawdown_pct": _column(_ratio(-trade_drawdown[ends] * 100, trade_peak[ends])),
+            "max_drawdown": _column(-np.minimum.reduceat(trade_drawdown, starts)),
+            **{
+                name: _column(values, 3) if name != "rolling_trades" else values.tolist()
+                for name, values in rolling.items()
+            }
+        }
+    }
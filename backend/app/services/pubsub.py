@@ -0,0 +1,173 @@
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any], Awaitable[None]]
+
+
+class PubSubBus(ABC):
+    """Fan-out bus between the single stream producer and every worker.
+
+    One worker holds leadership per producer and publishes each tick once;
+    all workers, the leader included, subscribe and relay to their own
+    WebSocket connections.
+    """
+
+    # True when other processes may be listening, so producers cannot rely
+    # on local subscriber counts to skip work
+    distributed = False
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Any):
+        pass
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: Handler):
+        pass
+
+    @abstractmethod
+    async def acquire_leadership(self, name: str, ttl: float) -> bool:
+        """Take or renew the named lease; True while this process holds it"""
+
+
+class InMemoryBus(PubSubBus):
+    """Single-process bus; messages are handed to handlers without serialization"""
+
+    def __init__(self):
+        self.handlers: Dict[str, List[Handler]] = {}
+
+    async def publish(self, channel: str, message: Any):
+        for handler in list(self.handlers.get(channel, ())):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"Error handling {channel} message: {e}")
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers.setdefault(channel, []).append(handler)
+
+    async def acquire_leadership(self, name: str, ttl: float) -> bool:
+        return True
+
+
+# Extend the lease only if this process still owns it
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBus(PubSubBus):
+    """Redis pub/sub bus with SET NX leases for producer election"""
+
+    distributed = True
+
+    def __init__(self, url: str, prefix: str = "forex:", reconnect_delay: float = 1.0):
+        self.url = url
+        self.prefix = prefix
+        self.reconnect_delay = reconnect_delay
+        # Identifies this worker as a lease holder
+        self.token = uuid.uuid4().hex
+        self.handlers: Dict[str, List[Handler]] = {}
+        self.leases: Dict[str, bool] = {}
+        self.client = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.client = redis.from_url(self.url, decode_responses=True)
+        self._pubsub = self.client.pubsub()
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"Redis pub/sub bus connected to {self.url}")
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+        if self.client is None:
+            return
+        for name, held in self.leases.items():
+            if held:
+                try:
+                    await self.client.eval(_RELEASE_SCRIPT, 1, self.prefix + name, self.token)
+                except Exception as e:
+                    logger.error(f"Error releasing lease {name}: {e}")
+        await self._pubsub.close()
+        await self.client.close()
+
+    async def publish(self, channel: str, message: Any):
+        await self.client.publish(self.prefix + channel, json.dumps(message))
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers.setdefault(self.prefix + channel, []).append(handler)
+        await self._pubsub.subscribe(self.prefix + channel)
+
+    async def acquire_leadership(self, name: str, ttl: float) -> bool:
+        key = self.prefix + name
+        ttl_ms = int(ttl * 1000)
+        try:
+            held = bool(await self.client.eval(_RENEW_SCRIPT, 1, key, self.token, ttl_ms))
+            if not held:
+                held = bool(await self.client.set(key, self.token, nx=True, px=ttl_ms))
+        except Exception as e:
+            logger.error(f"Error acquiring lease {name}: {e}")
+            held = False
+        self.leases[name] = held
+        return held
+
+    async def _listen(self):
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(self.reconnect_delay)
+                    continue
+                async for item in self._pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    message = json.loads(item["data"])
+                    for handler in list(self.handlers.get(item["channel"], ())):
+                        try:
+                            await handler(message)
+                        except Exception as e:
+                            logger.error(f"Error handling {item['channel']} message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis pub/sub listener error: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+
+def create_bus() -> PubSubBus:
+    """Bus selected by PUBSUB_BACKEND"""
+    if settings.PUBSUB_BACKEND == "redis":
+        return RedisBus(settings.REDIS_URL, prefix=settings.PUBSUB_CHANNEL_PREFIX)
+    if settings.PUBSUB_BACKEND == "memory":
+        return InMemoryBus()
+    raise ValueError(f"Unknown pub/sub backend: {settings.PUBSUB_BACKEND}")
+
+
+# Carries stream ticks and signal events from the producing worker to every worker
+stream_bus = create_bus()
@@ -0,0 +1,262 @@
+import functools
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+import logging
+
+import redis.asyncio as redis
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.services.pubsub import PubSubBus
+
+logger = logging.getLogger(__name__)
+
+# Lets workers with an in-process cache hear about writes made on other workers
+INVALIDATION_CHANNEL = "cache-invalidate"
+
+# Route arguments that are injected rather than part of the query
+DEPENDENCY_PARAMS = ("db", "response", "request", "background_tasks")
+
+
+def cache_key(name: str, params: Dict[str, Any]) -> str:
+    """``name?query`` with parameters sorted and unset ones dropped, so equal queries share a key"""
+    query = urlencode(sorted((key, str(value)) for key, value in params.items() if value is not None))
+    return f"{name}?{query}"
+
+
+class CacheBackend(ABC):
+    """Stores response bodies stamped with the generations of the namespaces they read.
+
+    Writing to a namespace bumps its generation, which retires every entry
+    stamped with the old one without having to find and delete them.
+    """
+
+    name = "base"
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def lookup(self, key: str, namespaces: Tuple[str, ...]) -> Tuple[Optional[str], str]:
+        """The body cached under ``key`` if it is still current, and the namespaces' current stamp"""
+
+    @abstractmethod
+    async def store(self, key: str, body: str, stamp: str, ttl: float):
+        pass
+
+    @abstractmethod
+    async def bump(self, namespaces: Iterable[str]):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU of at most ``max_entries`` bodies"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self.generations: Dict[str, int] = {}
+        self.evictions = 0
+
+    def _stamp(self, namespaces: Tuple[str, ...]) -> str:
+        return ",".join(str(self.generations.get(namespace, 0)) for namespace in namespaces)
+
+    async def lookup(self, key: str, namespaces: Tuple[str, ...]) -> Tuple[Optional[str], str]:
+        stamp = self._stamp(namespaces)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None, stamp
+        expires_at, entry_stamp, body = entry
+        if expires_at <= time.monotonic() or entry_stamp != stamp:
+            del self.entries[key]
+            return None, stamp
+        self.entries.move_to_end(key)
+        return body, stamp
+
+    async def store(self, key: str, body: str, stamp: str, ttl: float):
+        self.entries[key] = (time.monotonic() + ttl, stamp, body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def bump(self, namespaces: Iterable[str]):
+        for namespace in namespaces:
+            self.generations[namespace] = self.generations.get(namespace, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "generations": dict(self.generations)
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every worker; generations are Redis counters, entries expire by TTL"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "forex:cache:"):
+        self.url = url
+        self.prefix = prefix
+        self.client = None
+
+    async def start(self):
+        self.client = redis.from_url(self.url, decode_responses=True)
+        logger.info(f"Redis response cache connected to {self.url}")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+
+    def _generation_keys(self, namespaces: Iterable[str]) -> List[str]:
+        return [f"{self.prefix}generation:{namespace}" for namespace in namespaces]
+
+    async def lookup(self, key: str, namespaces: Tuple[str, ...]) -> Tuple[Optional[str], str]:
+        # Entry and generations in one round trip
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(self.prefix + key)
+            pipe.mget(self._generation_keys(namespaces))
+            entry, generations = await pipe.execute()
+        stamp = ",".join(generation or "0" for generation in generations)
+        if entry is None:
+            return None, stamp
+        entry_stamp, _, body = entry.partition("\n")
+        return (body if entry_stamp == stamp else None), stamp
+
+    async def store(self, key: str, body: str, stamp: str, ttl: float):
+        await self.client.set(self.prefix + key, f"{stamp}\n{body}", px=int(ttl * 1000))
+
+    async def bump(self, namespaces: Iterable[str]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for generation_key in self._generation_keys(namespaces):
+                pipe.incr(generation_key)
+            await pipe.execute()
+
+
+class ResponseCache:
+    """TTL cache for JSON route responses, invalidated by namespace when data is written.
+
+    Routes opt in with ``@response_cache.cached("trades")``; code that
+    commits trades or signals calls ``invalidate``. Backend errors are
+    logged and treated as misses so the cache can never fail a request.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.bus: Optional[PubSubBus] = None
+        self.routes: Dict[str, Dict[str, int]] = {}
+        self.invalidations: Dict[str, int] = {}
+        self.errors = 0
+
+    async def start(self, bus: Optional[PubSubBus] = None):
+        if self.backend is None:
+            return
+        await self.backend.start()
+        # A shared backend already sees every worker's generation bumps
+        if bus is not None and bus.distributed and isinstance(self.backend, MemoryCacheBackend):
+            self.bus = bus
+            await bus.subscribe(INVALIDATION_CHANNEL, self._on_invalidation)
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+    def cached(self, *namespaces: str, ttl: Optional[float] = None) -> Callable:
+        """Serve the route from the cache until ``ttl`` passes or one of ``namespaces`` is written"""
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            name = func.__name__
+            stats = self.routes.setdefault(name, {"hits": 0, "misses": 0, "errors": 0})
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return await func(*args, **kwargs)
+                key = cache_key(name, {k: v for k, v in kwargs.items() if k not in DEPENDENCY_PARAMS})
+
+                stamp = None
+                try:
+                    body, stamp = await self.backend.lookup(key, namespaces)
+                except Exception as e:
+                    body = None
+                    stats["errors"] += 1
+                    logger.error(f"Response cache lookup failed for {key}: {e}")
+                if body is not None:
+                    stats["hits"] += 1
+                    return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+                stats["misses"] += 1
+                body = json.dumps(jsonable_encoder(await func(*args, **kwargs)))
+                if stamp is not None:
+                    try:
+                        await self.backend.store(key, body, stamp, ttl or self.ttl)
+                    except Exception as e:
+                        stats["errors"] += 1
+                        logger.error(f"Response cache store failed for {key}: {e}")
+                return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+            return wrapper
+        return decorator
+
+    async def invalidate(self, *namespaces: str):
+        """Retire every cached response that read one of ``namespaces``; call after the commit"""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.invalidations[namespace] = self.invalidations.get(namespace, 0) + 1
+        try:
+            await self.backend.bump(namespaces)
+            if self.bus is not None:
+                await self.bus.publish(INVALIDATION_CHANNEL, {"namespaces": list(namespaces)})
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Response cache invalidation failed for {namespaces}: {e}")
+
+    async def _on_invalidation(self, message: Dict[str, Any]):
+        await self.backend.bump(message["namespaces"])
+
+    def get_metrics(self) -> Dict[str, Any]:
+        hits = sum(stats["hits"] for stats in self.routes.values())
+        misses = sum(stats["misses"] for stats in self.routes.values())
+        return {
+            "enabled": self.backend is not None,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "errors": self.errors + sum(stats["errors"] for stats in self.routes.values()),
+            "invalidations": dict(self.invalidations),
+            "routes": {name: dict(stats) for name, stats in self.routes.items()},
+            **(self.backend.get_stats() if self.backend is not None else {"backend": "none"})
+        }
+
+
+def create_cache_backend() -> Optional[CacheBackend]:
+    """Backend selected by RESPONSE_CACHE_BACKEND; None disables caching"""
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.REDIS_URL, prefix=settings.RESPONSE_CACHE_PREFIX)
+    if settings.RESPONSE_CACHE_BACKEND == "none":
+        return None
+    raise ValueError(f"Unknown response cache backend: {settings.RESPONSE_CACHE_BACKEND}")
+
+
+response_cache = ResponseCache(create_cache_backend(), ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.broadcaster import make_topic
+from app.services.pubsub import PubSubBus, stream_bus
+from app.services.response_cache import response_cache
+from app.services.signal_store import signal_row, store_signals
+
+logger = logging.getLogger(__name__)
+
+# Status changes travel over the bus so any worker's REST call reaches the producer
+STATUS_EVENTS_CHANNEL = "signal-status"
+
+CLOSED_STATUSES = ("executed", "expired")
+
+# Ids per status event when a sweep closes many signals at once
+STATUS_EVENT_BATCH_SIZE = 1000
+
+
+class SignalFeed:
+    """Live set of trading signals behind the ``signals`` stream channel.
+
+    New signals are generated every ``generation_interval`` seconds but only
+    enter the feed when no active signal of the same pair and direction
+    exists, so an unchanged market produces no new messages. Executed and
+    expired signals stay in the feed with their new status for
+    ``retention_seconds`` before they are dropped. Status changes arrive
+    from REST calls on any worker, outside the broadcaster's schedule, so
+    they call ``on_change`` to have it push right away instead of waiting
+    for its next interval.
+
+    Topic payloads map signal id to signal, so the delta protocol sends
+    just the signals that were added or changed.
+    """
+
+    def __init__(
+        self,
+        bus: PubSubBus,
+        generation_interval: float = 15.0,
+        expiry_minutes: float = 30.0,
+        retention_seconds: float = 300.0
+    ):
+        self.bus = bus
+        self.generation_interval = generation_interval
+        self.expiry = timedelta(minutes=expiry_minutes)
+        self.retention_seconds = retention_seconds
+        self.signals: Dict[str, Dict[str, Any]] = {}
+        self._closed_at: Dict[str, float] = {}
+        self._next_generation = 0.0
+        self._generate: Optional[Callable[[], Awaitable[List[Optional[Dict[str, Any]]]]]] = None
+        self._on_change: Optional[Callable[[], None]] = None
+        self.stats = {"generated": 0, "added": 0, "duplicates": 0, "status_changes": 0}
+
+    async def start(
+        self,
+        generate: Callable[[], Awaitable[List[Optional[Dict[str, Any]]]]],
+        on_change: Optional[Callable[[], None]] = None
+    ):
+        self._generate = generate
+        self._on_change = on_change
+        await self.bus.subscribe(STATUS_EVENTS_CHANNEL, self._on_status_event)
+
+    async def get_topic_payloads(self, pairs: List[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Refresh the feed if due and group it into per-pair topics"""
+        now = time.time()
+        if self._generate is not None and now >= self._next_generation:
+            self._next_generation = now + self.generation_interval
+            await self._add_generated(await self._generate())
+        self._expire(datetime.utcnow(), now)
+
+        payloads = {make_topic("signals", pair): {} for pair in pairs}
+        for signal_id, signal in self.signals.items():
+            payloads.setdefault(make_topic("signals", signal["pair"]), {})[signal_id] = signal
+        return payloads
+
+    async def mark_status(self, signal_id: str, status: str):
+        """Record an executed/expired signal on every worker's feed"""
+        await self.bus.publish(STATUS_EVENTS_CHANNEL, {"id": signal_id, "status": status})
+
+    async def mark_statuses(self, signal_ids: List[str], status: str):
+        """``mark_status`` for many signals, batched into a few bus messages"""
+        for start in range(0, len(signal_ids), STATUS_EVENT_BATCH_SIZE):
+            await self.bus.publish(
+                STATUS_EVENTS_CHANNEL,
+                {"ids": signal_ids[start:start + STATUS_EVENT_BATCH_SIZE], "status": status}
+            )
+
+    async def mark_expired(self, signal_ids: List[str]):
+        await self.mark_statuses(signal_ids, "expired")
+
+    async def _on_status_event(self, event: Dict[str, Any]):
+        now = time.time()
+        changed = False
+        for signal_id in event.get("ids") or [event["id"]]:
+            changed = self._set_status(signal_id, event["status"], now) or changed
+        if changed:
+            self._changed()
+
+    async def _add_generated(self, generated: List[Optional[Dict[str, Any]]]):
+        active = {
+            (signal["pair"], signal["type"])
+            for signal in self.signals.values() if signal["status"] == "active"
+        }
+        added = []
+        for signal in generated:
+            if not signal:
+                continue
+            self.stats["generated"] += 1
+            key = (signal["pair"], signal["type"])
+            if key in active:
+                self.stats["duplicates"] += 1
+                continue
+            active.add(key)
+            created_at = datetime.fromisoformat(signal["timestamp"])
+            signal = {**signal, "expires_at": (created_at + self.expiry).isoformat()}
+            self.signals[signal["id"]] = signal
+            added.append(signal)
+
+        if added:
+            self.stats["added"] += len(added)
+            # Persist so the execute endpoint can find streamed signals by id
+            await self._store(added)
+
+    async def _store(self, signals: List[Dict[str, Any]]):
+        rows = [
+            signal_row(
+                signal,
+                datetime.fromisoformat(signal["timestamp"]),
+                datetime.fromisoformat(signal["expires_at"])
+            )
+            for signal in signals
+        ]
+        async with AsyncSessionLocal() as db:
+            try:
+                await store_signals(db, rows)
+                await db.commit()
+                await response_cache.invalidate("signals")
+            except Exception as e:
+                logger.error(f"Error storing streamed signals: {e}")
+                await db.rollback()
+
+    def _set_status(self, signal_id: str, status: str, now: float) -> bool:
+        signal = self.signals.get(signal_id)
+        if signal is None or signal["status"] == status:
+            return False
+        # Replace rather than mutate: the broadcaster diffs against the old dict
+        self.signals[signal_id] = {**signal, "status": status}
+        if status in CLOSED_STATUSES:
+            self._closed_at[signal_id] = now
+        self.stats["status_changes"] += 1
+        return True
+
+    def _expire(self, utc_now: datetime, now: float):
+        expiry_cutoff = utc_now.isoformat()
+        for signal_id, signal in list(self.signals.items()):
+            if signal["status"] == "active" and signal["expires_at"] <= expiry_cutoff:
+                self._set_status(signal_id, "expired", now)
+
+        retention_cutoff = now - self.retention_seconds
+        for signal_id, closed_at in list(self._closed_at.items()):
+            if closed_at <= retention_cutoff:
+                del self._closed_at[signal_id]
+                self.signals.pop(signal_id, None)
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "signals": len(self.signals),
+            "active": sum(1 for signal in self.signals.values() if signal["status"] == "active"),
+            **self.stats
+        }
+
+
+signal_feed = SignalFeed(
+    stream_bus,
+    generation_interval=settings.SIGNAL_GENERATION_INTERVAL_SECONDS,
+    expiry_minutes=settings.SIGNAL_EXPIRY_MINUTES
+)
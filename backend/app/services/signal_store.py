@@ -0,0 +1,117 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+import logging
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, TradingSignal
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+
+def signal_row(signal: Dict[str, Any], created_at: datetime, expires_at: datetime) -> Dict[str, Any]:
+    """TradingSignal column values for a signal dict as the ML service generates it"""
+    mcts_data = signal["mcts_data"]
+    return {
+        "id": uuid.UUID(signal["id"]),
+        "pair": signal["pair"],
+        "type": signal["type"],
+        "entry_price": signal["entry_price"],
+        "stop_loss": signal["stop_loss"],
+        "take_profit": signal["take_profit"],
+        "confidence": signal["confidence"],
+        "strategy": signal["strategy"],
+        "reasoning": signal["reasoning"],
+        "status": "active",
+        "created_at": created_at,
+        "expires_at": expires_at,
+        "mcts_simulations": mcts_data["simulations"],
+        "policy_score": mcts_data["policy_score"],
+        "value_score": mcts_data["value_estimate"],
+        "exploration_rate": mcts_data["exploration_rate"]
+    }
+
+
+async def store_signals(db: AsyncSession, rows: Iterable[Dict[str, Any]]) -> int:
+    """Insert signal rows as one executemany batch; the caller commits"""
+    rows = list(rows)
+    if rows:
+        await db.execute(insert(TradingSignal), rows)
+    return len(rows)
+
+
+async def expire_signals(db: AsyncSession, now: Optional[datetime] = None) -> List[str]:
+    """Flip every active signal past its expiry to expired in one UPDATE; returns their ids.
+
+    The caller commits. Served by ix_trading_signals_status_expires_at, so a
+    sweep with nothing to expire is a single index probe.
+    """
+    statement = update(TradingSignal).where(
+        TradingSignal.status == "active",
+        TradingSignal.expires_at <= (now or datetime.utcnow())
+    ).values(
+        status="expired"
+    ).returning(
+        TradingSignal.id
+    ).execution_options(synchronize_session=False)
+    return [str(signal_id) for signal_id in (await db.execute(statement)).scalars().all()]
+
+
+class SignalExpirySweeper:
+    """Background task expiring overdue signals every ``interval`` seconds.
+
+    Every worker may run one: the UPDATE only matches still-active rows, so
+    concurrent sweeps expire each signal once. Expired ids are handed to
+    ``on_expired`` after the commit, e.g. to update the live signal feed.
+    """
+
+    def __init__(self, interval: float = 60.0):
+        self.interval = interval
+        self.is_running = False
+        self._on_expired: Optional[Callable[[List[str]], Awaitable[None]]] = None
+        self.stats = {"sweeps": 0, "expired": 0, "errors": 0, "last_sweep_ms": None, "last_sweep_at": None}
+
+    async def start(self, on_expired: Optional[Callable[[List[str]], Awaitable[None]]] = None):
+        self.is_running = True
+        self._on_expired = on_expired
+        logger.info(f"Signal expiry sweeper started (every {self.interval}s)")
+
+        while self.is_running:
+            try:
+                await self.sweep()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Error sweeping expired signals: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            expired_ids = await expire_signals(db)
+            await db.commit()
+        if expired_ids:
+            await response_cache.invalidate("signals")
+            if self._on_expired is not None:
+                await self._on_expired(expired_ids)
+
+        self.stats["sweeps"] += 1
+        self.stats["expired"] += len(expired_ids)
+        self.stats["last_sweep_ms"] = (time.perf_counter() - started) * 1000
+        self.stats["last_sweep_at"] = datetime.utcnow().isoformat()
+        if expired_ids:
+            logger.info(f"Expired {len(expired_ids)} signals")
+        return len(expired_ids)
+
+    def stop(self):
+        self.is_running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"interval_seconds": self.interval, **self.stats}
+
+
+signal_expiry_sweeper = SignalExpirySweeper(interval=settings.SIGNAL_EXPIRY_SWEEP_INTERVAL_SECONDS)
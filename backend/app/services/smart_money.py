@@ -0,0 +1,287 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from datetime import datetime
+from typing import Dict, List, Any
+import logging
+
+from app.services.bar_store import BarBuffer
+from app.services.volume_profile import VolumeProfileIndex
+
+logger = logging.getLogger(__name__)
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean; the first ``window - 1`` entries use an expanding mean"""
+    csum = np.cumsum(values)
+    out = csum / np.arange(1, len(values) + 1)
+    if len(values) > window:
+        out[window:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def _strength(ratio: float) -> str:
+    if ratio >= 3.0:
+        return "high"
+    if ratio >= 2.0:
+        return "medium"
+    return "low"
+
+
+def _iso(epoch_seconds: int) -> str:
+    return datetime.utcfromtimestamp(int(epoch_seconds)).isoformat()
+
+
+class SmartMoneyDetector:
+    """Incremental order-block, fair-value-gap and liquidity-zone detection.
+
+    ``update`` only evaluates bars closed since the previous call (plus the
+    lookback the rules need), using vectorized NumPy passes over the bar
+    buffer, so a multi-day backfill and a single new bar share one code
+    path. Output lists are rebuilt only when something changed; between
+    bar closes every reader shares the same objects.
+    """
+
+    def __init__(
+        self,
+        volume_profile: VolumeProfileIndex,
+        atr_period: int = 14,
+        displacement_factor: float = 1.5,
+        body_ratio: float = 0.6,
+        order_block_lookback: int = 5,
+        swing_window: int = 3,
+        fvg_min_atr: float = 0.1,
+        profile_lookback_seconds: int = 4 * 3600,
+        max_zones: int = 10
+    ):
+        self.atr_period = atr_period
+        self.displacement_factor = displacement_factor
+        self.body_ratio = body_ratio
+        self.order_block_lookback = order_block_lookback
+        self.swing_window = swing_window
+        self.fvg_min_atr = fvg_min_atr
+        self.volume_profile = volume_profile
+        self.profile_lookback_seconds = profile_lookback_seconds
+        self.max_zones = max_zones
+        self._lookback = max(atr_period + 1, order_block_lookback + 1, 2 * swing_window) + 2
+
+        self._next_index = 0
+        self._last_block_source = {True: -1, False: -1}
+        self._blocks: List[Dict[str, Any]] = []
+        self._gaps: List[Dict[str, Any]] = []
+        self._swings: List[Dict[str, Any]] = []
+
+        self.order_blocks: List[Dict[str, Any]] = []
+        self.fair_value_gaps: List[Dict[str, Any]] = []
+        self.liquidity_zones: List[Dict[str, Any]] = []
+
+    def update(self, bars: BarBuffer) -> bool:
+        """Process newly closed bars; returns True if any output changed"""
+        if bars.size == 0 or bars.total_bars <= self._next_index:
+            return False
+
+        start = max(self._next_index, bars.offset) - bars.offset
+        lo = max(0, start - self._lookback)
+        base = bars.offset + lo  # absolute index of window position 0
+        first = start - lo       # window position of the first new bar
+
+        t = bars.time[lo:]
+        o = bars.open[lo:]
+        h = bars.high[lo:]
+        l = bars.low[lo:]
+        c = bars.close[lo:]
+
+        atr = _rolling_mean(_true_range(h, l, c), self.atr_period)
+
+        new_blocks = self._detect_order_blocks(t, o, h, l, c, atr, base, first)
+        new_gaps = self._detect_fair_value_gaps(t, h, l, atr, base, first)
+        new_swings = self._detect_swings(t, h, l, base, first)
+
+        window_index = base + np.arange(len(c))
+        blocks = self._survivors(self._blocks + new_blocks, window_index, l, h, c, first)
+        gaps = self._survivors(self._gaps + new_gaps, window_index, l, h, c, first)
+        swings = self._survivors(self._swings + new_swings, window_index, l, h, c, first)
+
+        changed = (
+            len(blocks) != len(self._blocks) or len(gaps) != len(self._gaps)
+            or len(swings) != len(self._swings) or bool(new_blocks or new_gaps or new_swings)
+        )
+
+        self._blocks = blocks[-self.max_zones:]
+        self._gaps = gaps[-self.max_zones:]
+        self._swings = swings[-self.max_zones:]
+        self._next_index = bars.total_bars
+
+        if changed:
+            self._publish(bars)
+        return changed
+
+    def _detect_order_blocks(self, t, o, h, l, c, atr, base, first) -> List[Dict[str, Any]]:
+        """Last opposite candle before a displacement candle"""
+        n = len(c)
+        body = np.abs(c - o)
+        prev_atr = np.concatenate(([np.inf], atr[:-1]))
+        idx = np.arange(n)
+
+        displacement = (body > self.displacement_factor * prev_atr) & (body >= self.body_ratio * (h - l))
+        displacement &= (idx >= max(first, self.atr_period)) & (idx >= 1)
+
+        bullish = c > o
+        bearish = c < o
+        # Index of the most recent bearish/bullish candle at or before each bar
+        last_bearish = np.maximum.accumulate(np.where(bearish, idx, -1))
+        last_bullish = np.maximum.accumulate(np.where(bullish, idx, -1))
+
+        blocks = []
+        for is_bullish, candidates in ((True, last_bearish), (False, last_bullish)):
+            disp_idx = np.flatnonzero(displacement & (bullish if is_bullish else bearish))
+            if not len(disp_idx):
+                continue
+            source = candidates[disp_idx - 1]
+            valid = (source >= 0) & (disp_idx - source <= self.order_block_lookback)
+            # One block per source candle, even across incremental updates
+            valid &= base + source > self._last_block_source[is_bullish]
+            source, disp_idx = source[valid], disp_idx[valid]
+            source, first_pos = np.unique(source, return_index=True)
+            disp_idx = disp_idx[first_pos]
+            if len(source):
+                self._last_block_source[is_bullish] = base + int(source[-1])
+
+            for j, i in zip(source.tolist(), disp_idx.tolist()):
+                low, high = float(l[j]), float(h[j])
+                blocks.append({
+                    "price": (low + high) / 2,
+                    "high": high,
+                    "low": low,
+                    "type": "bullish" if is_bullish else "bearish",
+                    "strength": _strength(body[i] / prev_atr[i]),
+                    "time": _iso(t[j]),
+                    "_index": base + i,
+                    # Bullish blocks fail on a close below, bearish on a close above
+                    "_level": low if is_bullish else high,
+                    "_break": "close_below" if is_bullish else "close_above"
+                })
+        blocks.sort(key=lambda block: block["_index"])
+        return blocks
+
+    def _detect_fair_value_gaps(self, t, h, l, atr, base, first) -> List[Dict[str, Any]]:
+        """Three-candle imbalances between bar i-2 and bar i"""
+        n = len(h)
+        if n < 3:
+            return []
+        idx = np.arange(2, n)
+        in_range = idx >= first
+        min_gap = self.fvg_min_atr * atr[idx]
+
+        bull_gap = l[idx] - h[idx - 2]
+        bear_gap = l[idx - 2] - h[idx]
+
+        gaps = []
+        for i in idx[in_range & (bull_gap > min_gap)].tolist():
+            gaps.append({
+                "type": "bullish",
+                "top": float(l[i]),
+                "bottom": float(h[i - 2]),
+                "time": _iso(t[i - 1]),
+                "_index": base + i,
+                "_level": float(h[i - 2]),
+                "_break": "low_below"
+            })
+        for i in idx[in_range & (bear_gap > min_gap)].tolist():
+            gaps.append({
+                "type": "bearish",
+                "top": float(l[i - 2]),
+                "bottom": float(h[i]),
+                "time": _iso(t[i - 1]),
+                "_index": base + i,
+                "_level": float(l[i - 2]),
+                "_break": "high_above"
+            })
+        gaps.sort(key=lambda gap: gap["_index"])
+        return gaps
+
+    def _detect_swings(self, t, h, l, base, first) -> List[Dict[str, Any]]:
+        """Fractal swing highs/lows, confirmed ``swing_window`` bars later"""
+        w = self.swing_window
+        n = len(h)
+        if n < 2 * w + 1:
+            return []
+        # Centres k = w .. n-w-1; only those newly confirmed by the new bars
+        centres = np.arange(w, n - w)
+        in_range = centres >= first - w
+        rolling_high = sliding_window_view(h, 2 * w + 1).max(axis=1)
+        rolling_low = sliding_window_view(l, 2 * w + 1).min(axis=1)
+
+        swings = []
+        for k in centres[in_range & (h[centres] >= rolling_high)].tolist():
+            swings.append({
+                "price": float(h[k]),
+                "type": "buy",  # buy stops resting above swing highs
+                "time": _iso(t[k]),
+                "_index": base + k + w,
+                "_level": float(h[k]),
+                "_break": "high_above"
+            })
+        for k in centres[in_range & (l[centres] <= rolling_low)].tolist():
+            swings.append({
+                "price": float(l[k]),
+                "type": "sell",  # sell stops resting below swing lows
+                "time": _iso(t[k]),
+                "_index": base + k + w,
+                "_level": float(l[k]),
+                "_break": "low_below"
+            })
+        swings.sort(key=lambda swing: swing["_index"])
+        return swings
+
+    @staticmethod
+    def _survivors(records, window_index, l, h, c, first) -> List[Dict[str, Any]]:
+        """Drop zones that the new bars mitigated, filled or swept"""
+        if not records:
+            return records
+        bars = slice(first, None)
+        series = {
+            "close_below": (c[bars], np.less),
+            "close_above": (c[bars], np.greater),
+            "low_below": (l[bars], np.less),
+            "high_above": (h[bars], np.greater)
+        }
+        new_index = window_index[bars]
+        levels = np.array([record["_level"] for record in records])
+        created = np.array([record["_index"] for record in records])
+        alive = np.ones(len(records), dtype=bool)
+
+        for rule, (values, compare) in series.items():
+            rows = np.flatnonzero([record["_break"] == rule for record in records])
+            if not len(rows):
+                continue
+            after = new_index[None, :] > created[rows, None]
+            broken = compare(values[None, :], levels[rows, None]) & after
+            alive[rows[broken.any(axis=1)]] = False
+
+        return [record for record, keep in zip(records, alive) if keep]
+
+    def _volume_labels(self, bars: BarBuffer, prices: List[float]) -> List[str]:
+        """Rank price levels by the volume traded there over the recent window"""
+        if not prices:
+            return []
+        start = float(bars.time[-1]) - self.profile_lookback_seconds
+        ranks = self.volume_profile.volume_rank(prices, start=start)
+        return ["high" if r >= 2 / 3 else "medium" if r >= 1 / 3 else "low" for r in ranks]
+
+    def _publish(self, bars: BarBuffer):
+        def public(record):
+            return {key: value for key, value in record.items() if not key.startswith("_")}
+
+        self.order_blocks = [public(block) for block in self._blocks]
+        self.fair_value_gaps = [public(gap) for gap in self._gaps]
+
+        labels = self._volume_labels(bars, [swing["price"] for swing in self._swings])
+        self.liquidity_zones = [
+            {**public(swing), "volume": label}
+            for swing, label in zip(self._swings, labels)
+        ]
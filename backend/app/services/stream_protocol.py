@@ -0,0 +1,125 @@
+import json
+from fastapi import WebSocket, WebSocketDisconnect
+from typing import Callable, Iterable, List, Optional, Tuple
+import logging
+
+from app.core.monitoring import current_route
+from app.services.websocket_manager import WebSocketManager
+from app.services.broadcaster import CHANNELS, TopicBroadcaster, make_topic
+from app.services.wire_format import WIRE_FORMATS, topic_ids
+
+logger = logging.getLogger(__name__)
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+
+class StreamProtocol:
+    """Client side of the topic streams served on the WebSocket endpoints.
+
+    Clients pick pairs and channels with ``?pairs=`` / ``?channels=`` on
+    connect, and ``?format=binary`` for the compact binary encoding of
+    stream messages (control replies stay JSON text), then adjust at any time with JSON control messages::
+
+        {"action": "subscribe", "pairs": ["EUR/USD"], "channels": ["prices", "indicators"]}
+        {"action": "unsubscribe", "pairs": ["EUR/USD"], "channels": ["indicators"]}
+        {"action": "list"}
+        {"action": "resync", "topics": ["prices:EUR/USD"]}
+
+    Omitted ``pairs`` means every pair; omitted ``channels`` means the
+    endpoint's default channels. Each topic starts with a ``snapshot`` and
+    continues with ``delta`` messages; a client that sees a gap in a
+    topic's ``seq`` sends ``resync`` (omitted ``topics`` means all of its
+    subscriptions) to get fresh snapshots. Binary clients get the channel
+    and pair ids of newly subscribed topics in the ``subscribed`` reply.
+    """
+
+    def __init__(
+        self,
+        manager: WebSocketManager,
+        broadcasters: Iterable[TopicBroadcaster],
+        pairs: Callable[[], List[str]]
+    ):
+        self.manager = manager
+        self.broadcasters = list(broadcasters)
+        self.pairs = pairs
+
+    async def serve(self, websocket: WebSocket, default_channels: Tuple[str, ...]):
+        current_route.set(f"WS {websocket.url.path}")
+        params = websocket.query_params
+        wire_format = params.get("format", "json")
+        if wire_format not in WIRE_FORMATS:
+            await websocket.close(code=1003)
+            return
+
+        await self.manager.connect(websocket, wire_format)
+        try:
+            try:
+                await self._subscribe(
+                    websocket,
+                    _split(params.get("pairs")) or None,
+                    _split(params.get("channels")) or list(default_channels)
+                )
+            except ValueError as e:
+                # Reported like a bad subscribe message; the client can still subscribe over the socket
+                await self._send(websocket, {"type": "error", "message": str(e)})
+            while True:
+                text = await websocket.receive_text()
+                await self._handle_message(websocket, text, default_channels)
+        except (WebSocketDisconnect, RuntimeError):
+            # RuntimeError: the manager already closed a slow consumer
+            pass
+        finally:
+            self.manager.disconnect(websocket)
+
+    def _topics(self, pairs: Optional[List[str]], channels: List[str]) -> List[str]:
+        unknown = [channel for channel in channels if channel not in CHANNELS]
+        if unknown:
+            raise ValueError(f"Unknown channels: {', '.join(unknown)}")
+        return [make_topic(channel, pair) for pair in (pairs or self.pairs()) for channel in channels]
+
+    async def _subscribe(self, websocket: WebSocket, pairs: Optional[List[str]], channels: List[str]):
+        added = self.manager.subscribe(websocket, self._topics(pairs, channels))
+        reply = {"type": "subscribed", "topics": added}
+        if self.manager.wire_format(websocket) == "binary":
+            reply["ids"] = {topic: topic_ids(topic) for topic in added}
+        await self._send(websocket, reply)
+
+        # Bring new subscribers up to date without waiting for the next tick
+        await self._send_snapshots(websocket, added)
+
+    async def _send_snapshots(self, websocket: WebSocket, topics: List[str]):
+        for topic in topics:
+            for broadcaster in self.broadcasters:
+                message = broadcaster.latest_message(topic)
+                if message is not None:
+                    await self.manager.send_personal_message(message, websocket)
+                    break
+
+    async def _handle_message(self, websocket: WebSocket, text: str, default_channels: Tuple[str, ...]):
+        try:
+            request = json.loads(text)
+            action = request.get("action")
+            pairs = request.get("pairs")
+            channels = request.get("channels") or list(default_channels)
+
+            if action == "subscribe":
+                await self._subscribe(websocket, pairs, channels)
+            elif action == "unsubscribe":
+                removed = self.manager.unsubscribe(websocket, self._topics(pairs, channels))
+                await self._send(websocket, {"type": "unsubscribed", "topics": removed})
+            elif action == "list":
+                topics = sorted(self.manager.get_subscriptions(websocket))
+                await self._send(websocket, {"type": "subscriptions", "topics": topics})
+            elif action == "resync":
+                subscribed = self.manager.get_subscriptions(websocket)
+                requested = request.get("topics") or sorted(subscribed)
+                await self._send_snapshots(websocket, [topic for topic in requested if topic in subscribed])
+            else:
+                raise ValueError(f"Unknown action: {action}")
+        except (ValueError, AttributeError, TypeError) as e:
+            await self._send(websocket, {"type": "error", "message": str(e)})
+
+    async def _send(self, websocket: WebSocket, message: dict):
+        await self.manager.send_personal_message(json.dumps(message), websocket)
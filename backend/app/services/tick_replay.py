@@ -0,0 +1,145 @@
+import asyncio
+import csv
+import glob
+import gzip
+import heapq
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (timestamp, pair, price, volume)
+Tick = Tuple[datetime, str, float, float]
+
+
+def _normalize_pair(pair: str) -> str:
+    """Accept both EURUSD and EUR/USD spellings"""
+    pair = pair.strip().upper()
+    if "/" not in pair and len(pair) == 6:
+        return f"{pair[:3]}/{pair[3:]}"
+    return pair
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse ISO-8601 or epoch-seconds timestamps into naive UTC"""
+    value = value.strip()
+    try:
+        return datetime.utcfromtimestamp(float(value))
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+
+class TickReplayProvider:
+    """Stream recorded ticks from local CSV files.
+
+    Each file holds ``timestamp,pair,price[,volume]`` rows sorted by time;
+    multiple files are merged into a single time-ordered stream. ``speed``
+    is a multiplier on recorded time: 1.0 replays in real time, 10.0 ten
+    times faster, and 0 replays as fast as possible.
+    """
+
+    def __init__(self, data_path: str, speed: float = 1.0, loop: bool = False):
+        self.data_path = data_path
+        self.speed = speed
+        self.loop = loop
+        self.is_running = False
+        self.stats = {
+            "files": 0,
+            "ticks": 0,
+            "started_at": None,
+            "elapsed_seconds": 0.0,
+            "ticks_per_second": 0.0,
+            "max_lag_ms": 0.0
+        }
+
+    def _discover_files(self) -> List[str]:
+        if os.path.isfile(self.data_path):
+            return [self.data_path]
+        patterns = ["*.csv", "*.csv.gz"]
+        files = []
+        for pattern in patterns:
+            files.extend(glob.glob(os.path.join(self.data_path, pattern)))
+        return sorted(files)
+
+    def _read_file(self, path: str) -> Iterator[Tick]:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", newline="") as handle:
+            reader = csv.DictReader(handle)
+            for row in reader:
+                try:
+                    yield (
+                        _parse_timestamp(row["timestamp"]),
+                        _normalize_pair(row["pair"]),
+                        float(row["price"]),
+                        float(row.get("volume") or 0.0)
+                    )
+                except (KeyError, ValueError) as e:
+                    logger.warning(f"Skipping malformed tick in {path}: {e}")
+
+    def iter_ticks(self) -> Iterator[Tick]:
+        """Merge all tick files into one time-ordered iterator"""
+        files = self._discover_files()
+        self.stats["files"] = len(files)
+        if not files:
+            logger.warning(f"No tick files found at {self.data_path}")
+            return iter(())
+        return heapq.merge(*(self._read_file(path) for path in files), key=lambda tick: tick[0])
+
+    async def stream(self, on_tick) -> Dict[str, Any]:
+        """Feed every tick to ``on_tick`` while pacing to the replay speed"""
+        self.is_running = True
+        self.stats["started_at"] = datetime.utcnow().isoformat()
+        wall_start = time.perf_counter()
+        # Shift looped passes forward so market time stays monotonic
+        time_offset = timedelta(0)
+
+        while self.is_running:
+            first_tick_time: Optional[datetime] = None
+            last_tick_time: Optional[datetime] = None
+            pass_start = time.perf_counter()
+
+            for tick_time, pair, price, volume in self.iter_ticks():
+                if not self.is_running:
+                    break
+
+                if first_tick_time is None:
+                    first_tick_time = tick_time
+
+                if self.speed > 0:
+                    target = pass_start + (tick_time - first_tick_time).total_seconds() / self.speed
+                    delay = target - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], -delay * 1000)
+                elif self.stats["ticks"] % 1000 == 0:
+                    # Yield so websocket and API handlers are not starved
+                    await asyncio.sleep(0)
+
+                await on_tick(pair, price, volume, tick_time + time_offset)
+                self.stats["ticks"] += 1
+                last_tick_time = tick_time
+
+            if not self.loop or first_tick_time is None:
+                break
+            time_offset += (last_tick_time - first_tick_time) + timedelta(seconds=1)
+
+        elapsed = time.perf_counter() - wall_start
+        self.stats["elapsed_seconds"] = round(elapsed, 3)
+        self.stats["ticks_per_second"] = round(self.stats["ticks"] / elapsed, 1) if elapsed > 0 else 0.0
+        self.is_running = False
+
+        logger.info(
+            f"Tick replay finished: {self.stats['ticks']} ticks from {self.stats['files']} files "
+            f"in {self.stats['elapsed_seconds']}s ({self.stats['ticks_per_second']} ticks/s)"
+        )
+        return self.stats
+
+    def stop(self):
+        self.is_running = False
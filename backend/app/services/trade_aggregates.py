@@ -0,0 +1,208 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.core.database import Trade, TradeRollup, TradingSignal
+from app.services.trade_rollups import day_start
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_HOURS = {"1d": 24, "7d": 168, "30d": 720, "90d": 2160}
+
+SUM_FIELDS = (
+    "trades", "wins", "losses", "profit", "win_profit", "loss_profit",
+    "pips", "duration_minutes", "timed_trades"
+)
+
+
+def timeframe_cutoff(timeframe: str) -> Optional[datetime]:
+    """Start of a ``1d``/``7d``/``30d``/``90d`` window; None for ``all`` or unknown values"""
+    hours = TIMEFRAME_HOURS.get(timeframe)
+    if hours is None:
+        return None
+    return datetime.utcnow() - timedelta(hours=hours)
+
+
+def _raw_columns():
+    # NULL and 0 profits/durations are skipped, as falsy values always were
+    return (
+        func.count().label("trades"),
+        func.count().filter(Trade.profit > 0).label("wins"),
+        func.count().filter(Trade.profit < 0).label("losses"),
+        func.sum(Trade.profit).label("profit"),
+        func.sum(Trade.profit).filter(Trade.profit > 0).label("win_profit"),
+        func.sum(Trade.profit).filter(Trade.profit < 0).label("loss_profit"),
+        func.sum(Trade.pips).label("pips"),
+        func.sum(Trade.duration_minutes).label("duration_minutes"),
+        func.count().filter(Trade.duration_minutes != 0).label("timed_trades"),
+        func.max(Trade.profit).filter(Trade.profit != 0).label("best_trade"),
+        func.min(Trade.profit).filter(Trade.profit != 0).label("worst_trade")
+    )
+
+
+def _rollup_columns():
+    return (
+        *(func.sum(getattr(TradeRollup, field)).label(field) for field in SUM_FIELDS),
+        func.max(TradeRollup.best_trade).label("best_trade"),
+        func.min(TradeRollup.worst_trade).label("worst_trade")
+    )
+
+
+def _totals(
+    db: Session,
+    group: Optional[str] = None,
+    cutoff: Optional[datetime] = None,
+    pair: Optional[str] = None,
+    strategy: Optional[str] = None
+) -> Dict[Any, Dict[str, Any]]:
+    """Trade totals since ``cutoff``, keyed by ``group`` value (None when ungrouped).
+
+    Whole days come from the rollup table; only the day the window starts
+    in is partial and is aggregated from raw trades.
+    """
+    sources = [(TradeRollup, _rollup_columns())]
+    rollup_filters = []
+    raw_filters = []
+    if cutoff is not None:
+        first_full_day = cutoff.date() + timedelta(days=1)
+        rollup_filters.append(TradeRollup.day >= first_full_day)
+        raw_filters += [Trade.created_at >= cutoff, Trade.created_at < day_start(first_full_day)]
+        sources.append((Trade, _raw_columns()))
+
+    totals: Dict[Any, Dict[str, Any]] = {}
+    for model, columns in sources:
+        filters = rollup_filters if model is TradeRollup else raw_filters
+        if pair:
+            filters = [*filters, model.pair == pair]
+        if strategy:
+            filters = [*filters, model.strategy == strategy]
+        if group:
+            column = getattr(model, group)
+            rows = db.query(column.label("key"), *columns).filter(*filters).group_by(column).all()
+        else:
+            rows = db.query(*columns).filter(*filters).all()
+
+        for row in rows:
+            if not row.trades:
+                continue
+            key = row.key if group else None
+            entry = totals.setdefault(key, {**{field: 0 for field in SUM_FIELDS}, "best_trade": None, "worst_trade": None})
+            for field in SUM_FIELDS:
+                entry[field] += getattr(row, field) or 0
+            if row.best_trade is not None and (entry["best_trade"] is None or row.best_trade > entry["best_trade"]):
+                entry["best_trade"] = row.best_trade
+            if row.worst_trade is not None and (entry["worst_trade"] is None or row.worst_trade < entry["worst_trade"]):
+                entry["worst_trade"] = row.worst_trade
+    return totals
+
+
+def trade_summary(
+    db: Session,
+    cutoff: Optional[datetime] = None,
+    pair: Optional[str] = None,
+    strategy: Optional[str] = None
+) -> Dict[str, Any]:
+    """Win/loss, profit and duration totals for matching trades"""
+    totals = _totals(db, cutoff=cutoff, pair=pair, strategy=strategy).get(None)
+    if not totals:
+        return {
+            "total_trades": 0,
+            "winning_trades": 0,
+            "losing_trades": 0,
+            "win_rate": 0,
+            "total_profit": 0,
+            "total_pips": 0,
+            "avg_profit": 0,
+            "avg_win": 0,
+            "avg_loss": 0,
+            "profit_factor": 0,
+            "best_trade": 0,
+            "worst_trade": 0,
+            "avg_duration": 0
+        }
+
+    total_trades = totals["trades"]
+    total_profit = totals["profit"] or 0
+    win_rate = totals["wins"] / total_trades * 100
+    avg_profit = total_profit / total_trades
+    avg_win = totals["win_profit"] / totals["wins"] if totals["wins"] else 0
+    avg_loss = totals["loss_profit"] / totals["losses"] if totals["losses"] else 0
+    profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else 0
+    avg_duration = totals["duration_minutes"] / totals["timed_trades"] if totals["timed_trades"] else 0
+
+    return {
+        "total_trades": total_trades,
+        "winning_trades": totals["wins"],
+        "losing_trades": totals["losses"],
+        "win_rate": round(win_rate, 1),
+        "total_profit": round(total_profit, 2),
+        "total_pips": round(totals["pips"] or 0, 1),
+        "avg_profit": round(avg_profit, 2),
+        "avg_win": round(avg_win, 2),
+        "avg_loss": round(avg_loss, 2),
+        "profit_factor": round(profit_factor, 2),
+        "best_trade": round(totals["best_trade"] or 0, 2),
+        "worst_trade": round(totals["worst_trade"] or 0, 2),
+        "avg_duration": round(avg_duration, 0)
+    }
+
+
+def performance_by(db: Session, group: str, cutoff: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Per-strategy or per-pair trade count, win rate, profit and pips, best total profit first"""
+    if group not in ("strategy", "pair"):
+        raise ValueError(f"Unsupported group: {group}")
+
+    result = []
+    for key, totals in sorted(_totals(db, group, cutoff).items()):
+        profit = totals["profit"] or 0
+        result.append({
+            group: key,
+            "trades": totals["trades"],
+            "win_rate": round(totals["wins"] / totals["trades"] * 100, 1),
+            "total_profit": round(profit, 2),
+            "avg_profit": round(profit / totals["trades"], 2),
+            "total_pips": round(totals["pips"] or 0, 1)
+        })
+
+    result.sort(key=lambda x: x["total_profit"], reverse=True)
+    return result
+
+
+def signal_performance(db: Session, cutoff: datetime) -> Dict[str, Any]:
+    """Signal counts by status, mean confidence and per-strategy execution counts since ``cutoff``"""
+    rows = db.query(
+        TradingSignal.strategy,
+        TradingSignal.status,
+        func.count().label("signals"),
+        func.sum(TradingSignal.confidence).label("confidence")
+    ).filter(
+        TradingSignal.created_at >= cutoff
+    ).group_by(
+        TradingSignal.strategy, TradingSignal.status
+    ).order_by(
+        TradingSignal.strategy, TradingSignal.status
+    ).all()
+
+    total_signals = 0
+    total_confidence = 0
+    by_status: Dict[str, int] = {}
+    strategy_performance: Dict[str, Dict[str, int]] = {}
+    for row in rows:
+        total_signals += row.signals
+        total_confidence += row.confidence
+        by_status[row.status] = by_status.get(row.status, 0) + row.signals
+        stats = strategy_performance.setdefault(row.strategy, {"total": 0, "executed": 0})
+        stats["total"] += row.signals
+        if row.status == "executed":
+            stats["executed"] += row.signals
+
+    return {
+        "total_signals": total_signals,
+        "executed_signals": by_status.get("executed", 0),
+        "expired_signals": by_status.get("expired", 0),
+        "active_signals": by_status.get("active", 0),
+        "average_confidence": total_confidence / total_signals if total_signals > 0 else 0,
+        "strategy_performance": strategy_performance
+    }
@@ -0,0 +1,181 @@
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Tuple, Union
+import logging
+
+from app.core.config import settings
+from app.core.database import Trade
+from app.schemas.trading_schemas import TradeCreate
+from app.services.trade_rollups import add_trades
+
+logger = logging.getLogger(__name__)
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+INGEST_COLUMNS = [column.name for column in Trade.__table__.columns]
+
+
+def trade_values(trade_data: TradeCreate) -> Dict[str, Any]:
+    """Trade column values for a new trade, flattening its market, ML and MCTS sections"""
+    market_conditions = trade_data.market_conditions
+    ml_features = trade_data.ml_features
+    mcts_data = trade_data.mcts_data
+    return {
+        "pair": trade_data.pair,
+        "type": trade_data.type,
+        "entry_price": trade_data.entry_price,
+        "lot_size": trade_data.lot_size,
+        "strategy": trade_data.strategy,
+        "confidence": trade_data.confidence,
+        "source": trade_data.source,
+        "volatility": market_conditions.volatility if market_conditions else None,
+        "trend": market_conditions.trend if market_conditions else None,
+        "volume": market_conditions.volume if market_conditions else None,
+        "news_impact": market_conditions.news_impact if market_conditions else None,
+        "rsi_entry": ml_features.rsi_entry if ml_features else None,
+        "macd_entry": ml_features.macd_entry if ml_features else None,
+        "ema_alignment": ml_features.ema_alignment if ml_features else None,
+        "smart_money_confirmation": ml_features.smart_money_confirmation if ml_features else None,
+        "liquidity_level": ml_features.liquidity_level if ml_features else None,
+        "mcts_simulations": mcts_data.simulations if mcts_data else None,
+        "policy_confidence": mcts_data.policy_confidence if mcts_data else None,
+        "value_estimate": mcts_data.value_estimate if mcts_data else None
+    }
+
+
+async def ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Non-empty lines of a streamed body, without buffering more than one chunk"""
+    buffered = b""
+    async for chunk in chunks:
+        *lines, buffered = (buffered + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffered.strip():
+        yield buffered
+
+
+async def _records(records: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
+
+
+def _validate(record: Any) -> TradeCreate:
+    if isinstance(record, (str, bytes)):
+        return TradeCreate.model_validate_json(record)
+    return TradeCreate.model_validate(record)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, detail['loc'])) or 'record'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _row(trade_data: TradeCreate) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    row = dict.fromkeys(INGEST_COLUMNS)
+    row.update(trade_values(trade_data), id=uuid.uuid4(), status="open", created_at=now, updated_at=now)
+    return row
+
+
+async def _write_chunk(db: AsyncSession, rows: List[Dict[str, Any]]) -> str:
+    """Insert one chunk and its rollup counts in a single transaction; returns the method used"""
+    connection = await db.connection()
+    # The rollup upserts run first, which also opens the transaction COPY joins
+    await db.run_sync(add_trades, [Trade(**row) for row in rows])
+    if connection.dialect.name == "postgresql":
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Trade.__tablename__,
+            columns=INGEST_COLUMNS,
+            records=[tuple(row[column] for column in INGEST_COLUMNS) for row in rows]
+        )
+        method = "copy"
+    else:
+        await db.execute(insert(Trade), rows)
+        method = "insert"
+    await db.commit()
+    return method
+
+
+async def ingest_trades(
+    db: AsyncSession,
+    records: Union[Iterable[Any], AsyncIterable[Any]],
+    chunk_size: int = settings.TRADE_INGEST_CHUNK_SIZE,
+    max_rows: int = settings.TRADE_INGEST_MAX_ROWS
+) -> Dict[str, Any]:
+    """Validate and bulk-insert trade records, ``chunk_size`` rows per transaction.
+
+    Records are TradeCreate-shaped dicts or raw JSON lines. Invalid records
+    are reported and skipped; if a chunk fails to write, only its rows are
+    marked failed and later chunks still go in. Reading stops after
+    ``max_rows`` records, with ``truncated`` set.
+    """
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    counts = {"inserted": 0, "invalid": 0, "failed": 0}
+    methods = set()
+    chunks = 0
+    received = 0
+    truncated = False
+
+    async def flush():
+        nonlocal chunks
+        chunks += 1
+        rows = [row for _, row in chunk]
+        try:
+            methods.add(await _write_chunk(db, rows))
+        except Exception as e:
+            logger.error(f"Error ingesting trade chunk {chunks}: {e}")
+            await db.rollback()
+            counts["failed"] += len(chunk)
+            results.extend({"index": index, "status": "failed", "error": str(e)} for index, _ in chunk)
+        else:
+            counts["inserted"] += len(chunk)
+            results.extend({"index": index, "status": "inserted", "id": str(row["id"])} for index, row in chunk)
+        chunk.clear()
+
+    async for record in _records(records):
+        if received >= max_rows:
+            truncated = True
+            break
+        index = received
+        received += 1
+        try:
+            chunk.append((index, _row(_validate(record))))
+        except ValidationError as e:
+            counts["invalid"] += 1
+            results.append({"index": index, "status": "invalid", "error": _validation_message(e)})
+            continue
+        if len(chunk) >= chunk_size:
+            await flush()
+    if chunk:
+        await flush()
+
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda result: result["index"])
+    logger.info(
+        f"Ingested {counts['inserted']} of {received} trades in {elapsed:.2f}s "
+        f"({counts['inserted'] / elapsed if elapsed else 0:.0f} rows/s)"
+    )
+    return {
+        "received": received,
+        **counts,
+        "truncated": truncated,
+        "chunks": chunks,
+        "method": "/".join(sorted(methods)) or "none",
+        "elapsed_seconds": elapsed,
+        "rows_per_second": counts["inserted"] / elapsed if elapsed else 0.0,
+        "rows": results
+    }
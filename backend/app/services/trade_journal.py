@@ -0,0 +1,119 @@
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+import base64
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple
+import logging
+
+from app.core.database import AsyncSessionLocal, Trade
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+EXPORT_COLUMNS = [column.name for column in Trade.__table__.columns]
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Opaque position after a row in newest-first (created_at, id) order"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of ``encode_cursor``; raises ValueError for anything it did not produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def keyset_page(
+    db: AsyncSession,
+    statement: Select,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """Newest-first page of the trades ``statement`` selects after ``cursor``, and the next cursor.
+
+    Seeks on (created_at, id) instead of skipping rows, so every page costs
+    the same index range scan however deep it is. The next cursor is None
+    on the last page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Trade.created_at, Trade.id) < tuple_(created_at, row_id))
+    statement = statement.order_by(Trade.created_at.desc(), Trade.id.desc()).limit(limit + 1)
+    rows = (await db.execute(statement)).scalars().all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+async def export_trades(
+    export_format: str,
+    pair: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> AsyncIterator[str]:
+    """Stream the trade journal oldest first as NDJSON lines or CSV.
+
+    Rows come through a server-side cursor ``EXPORT_BATCH_SIZE`` at a time
+    as plain tuples, so memory stays flat however many trades are
+    exported. Runs on its own session because the response outlives the
+    request's dependencies.
+    """
+    statement = select(*(Trade.__table__.c[name] for name in EXPORT_COLUMNS))
+    if pair:
+        statement = statement.where(Trade.pair == pair)
+    if status:
+        statement = statement.where(Trade.status == status)
+    if since:
+        statement = statement.where(Trade.created_at >= since)
+    if until:
+        statement = statement.where(Trade.created_at < until)
+    statement = statement.order_by(Trade.created_at, Trade.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.stream(statement)
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_COLUMNS)
+                async for batch in result.partitions():
+                    writer.writerows([_export_value(value) for value in row] for row in batch)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                yield buffer.getvalue()
+            else:
+                async for batch in result.partitions():
+                    yield "".join(
+                        json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row)))) + "\n"
+                        for row in batch
+                    )
+        except Exception as e:
+            logger.error(f"Error exporting trades: {e}")
+            raise
@@ -0,0 +1,195 @@
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+
+from app.core.database import SessionLocal, Trade, TradeRollup
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE = "manual"
+
+COUNTER_FIELDS = (
+    "trades", "wins", "losses", "profit", "win_profit", "loss_profit",
+    "pips", "duration_minutes", "timed_trades"
+)
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _key(trade: Trade) -> Dict[str, Any]:
+    return {
+        "day": trade.created_at.date(),
+        "pair": trade.pair,
+        "strategy": trade.strategy,
+        "source": trade.source or DEFAULT_SOURCE
+    }
+
+
+def _counters(trade: Trade, sign: int) -> Dict[str, Any]:
+    """What one trade adds to (sign=1) or takes from (sign=-1) its rollup row"""
+    profit = trade.profit or 0
+    return {
+        "trades": sign,
+        "wins": sign if profit > 0 else 0,
+        "losses": sign if profit < 0 else 0,
+        "profit": sign * profit,
+        "win_profit": sign * profit if profit > 0 else 0,
+        "loss_profit": sign * profit if profit < 0 else 0,
+        "pips": sign * (trade.pips or 0),
+        "duration_minutes": sign * (trade.duration_minutes or 0),
+        "timed_trades": sign if trade.duration_minutes else 0
+    }
+
+
+def _increment(db: Session, key: Dict[str, Any], counters: Dict[str, Any], extremes: Dict[Any, Any]) -> int:
+    values = {getattr(TradeRollup, field): getattr(TradeRollup, field) + delta for field, delta in counters.items()}
+    values.update(extremes)
+    return db.query(TradeRollup).filter_by(**key).update(values, synchronize_session=False)
+
+
+def add_trade(db: Session, trade: Trade):
+    """Count a new or just-updated trade; call before the commit that stores it"""
+    add_trades(db, [trade])
+
+
+def add_trades(db: Session, trades: Iterable[Trade]):
+    """Count a batch of new trades with one upsert per rollup row they touch"""
+    merged: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for trade in trades:
+        key = _key(trade)
+        entry = merged.setdefault(tuple(key.values()), {
+            "key": key,
+            "counters": dict.fromkeys(COUNTER_FIELDS, 0),
+            "best": None,
+            "worst": None
+        })
+        for field, delta in _counters(trade, 1).items():
+            entry["counters"][field] += delta
+        profit = trade.profit or None
+        if profit is not None:
+            entry["best"] = profit if entry["best"] is None else max(entry["best"], profit)
+            entry["worst"] = profit if entry["worst"] is None else min(entry["worst"], profit)
+
+    for entry in merged.values():
+        _add(db, entry["key"], entry["counters"], entry["best"], entry["worst"])
+
+
+def _add(db: Session, key: Dict[str, Any], counters: Dict[str, Any], best: Optional[float], worst: Optional[float]):
+    extremes = {}
+    if best is not None:
+        extremes = {
+            TradeRollup.best_trade: case(
+                (TradeRollup.best_trade.is_(None) | (TradeRollup.best_trade < best), best),
+                else_=TradeRollup.best_trade
+            ),
+            TradeRollup.worst_trade: case(
+                (TradeRollup.worst_trade.is_(None) | (TradeRollup.worst_trade > worst), worst),
+                else_=TradeRollup.worst_trade
+            )
+        }
+
+    if _increment(db, key, counters, extremes):
+        return
+    try:
+        # Savepoint so losing an insert race to another worker only retries the update
+        with db.begin_nested():
+            db.add(TradeRollup(**key, **counters, best_trade=best, worst_trade=worst))
+    except IntegrityError:
+        _increment(db, key, counters, extremes)
+
+
+def remove_trade(db: Session, trade: Trade):
+    """Uncount a trade before it is deleted or its result fields change"""
+    key = _key(trade)
+    _increment(db, key, _counters(trade, -1), {})
+
+    row = db.query(TradeRollup.trades, TradeRollup.best_trade, TradeRollup.worst_trade).filter_by(**key).one_or_none()
+    if row is None:
+        logger.warning(f"No rollup row for trade {trade.id}; run the rollup rebuild")
+        return
+    if row.trades <= 0:
+        db.query(TradeRollup).filter_by(**key).delete(synchronize_session=False)
+        return
+
+    profit = trade.profit
+    if profit and profit in (row.best_trade, row.worst_trade):
+        # Extremes cannot be decremented; rescan the rest of this key's day
+        extremes = db.query(
+            func.max(Trade.profit).filter(Trade.profit != 0),
+            func.min(Trade.profit).filter(Trade.profit != 0)
+        ).filter(
+            Trade.created_at >= day_start(key["day"]),
+            Trade.created_at < day_start(key["day"] + timedelta(days=1)),
+            Trade.pair == key["pair"],
+            Trade.strategy == key["strategy"],
+            func.coalesce(Trade.source, DEFAULT_SOURCE) == key["source"],
+            Trade.id != trade.id
+        ).one()
+        db.query(TradeRollup).filter_by(**key).update(
+            {TradeRollup.best_trade: extremes[0], TradeRollup.worst_trade: extremes[1]},
+            synchronize_session=False
+        )
+
+
+def rebuild_statement():
+    """INSERT ... SELECT of every rollup row from the trades table; also run by the migration that creates the table"""
+    profit = func.coalesce(Trade.profit, 0)
+    source = func.coalesce(Trade.source, DEFAULT_SOURCE)
+    day = func.date(Trade.created_at)
+    totals = select(
+        day,
+        Trade.pair,
+        Trade.strategy,
+        source,
+        func.count(),
+        func.count().filter(Trade.profit > 0),
+        func.count().filter(Trade.profit < 0),
+        func.sum(profit),
+        func.coalesce(func.sum(Trade.profit).filter(Trade.profit > 0), 0),
+        func.coalesce(func.sum(Trade.profit).filter(Trade.profit < 0), 0),
+        func.sum(func.coalesce(Trade.pips, 0)),
+        func.sum(func.coalesce(Trade.duration_minutes, 0)),
+        func.count().filter(Trade.duration_minutes != 0),
+        func.max(Trade.profit).filter(Trade.profit != 0),
+        func.min(Trade.profit).filter(Trade.profit != 0),
+        func.now()
+    ).where(
+        Trade.created_at.isnot(None)
+    ).group_by(day, Trade.pair, Trade.strategy, source)
+
+    columns = ["day", "pair", "strategy", "source", *COUNTER_FIELDS, "best_trade", "worst_trade", "updated_at"]
+    return insert(TradeRollup).from_select(columns, totals)
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Replace every rollup row with totals regenerated from the trades table"""
+    try:
+        db.query(TradeRollup).delete(synchronize_session=False)
+        result = db.execute(rebuild_statement())
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result.rowcount
+
+
+def ensure_rollups(db: Session) -> Optional[int]:
+    """Rebuild the rollups when the table is empty but trades exist; returns the rows written, if any"""
+    if db.query(TradeRollup.day).first() is not None or db.query(Trade.id).first() is None:
+        return None
+    logger.warning("trade_rollups is empty but trades exist; rebuilding it from the trades table")
+    return rebuild_rollups(db)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        logger.info(f"Rebuilt {rebuild_rollups(session)} trade rollup rows")
+    finally:
+        session.close()
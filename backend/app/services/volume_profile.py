@@ -0,0 +1,271 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Any
+import logging
+
+from app.services.bar_store import to_epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class VolumeProfileIndex:
+    """Price-bucketed volume histogram for one pair, queryable by time range.
+
+    Volume is accumulated into one histogram per ``bucket_seconds`` time
+    bucket, and completed buckets are stored as running prefix sums: row
+    ``k`` of ``_cum`` holds the total histogram of buckets ``[0, k)``. The
+    profile of any window is therefore a single row subtraction, O(bins)
+    regardless of how much history the window covers. Signed (tick-rule)
+    volume is kept the same way for order-flow delta.
+    """
+
+    def __init__(
+        self,
+        price_step: float,
+        bucket_seconds: int = 300,
+        max_buckets: int = 2016,
+        margin_bins: int = 16
+    ):
+        self.price_step = price_step
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.margin_bins = margin_bins
+
+        self.first_bin: Optional[int] = None  # absolute price-bin index of column 0
+        self.rows = 0
+        self._times = np.zeros(max_buckets + 1, dtype=np.int64)
+        self._cum: Optional[np.ndarray] = None
+        self._cum_delta = np.zeros(max_buckets + 2, dtype=np.float64)
+
+        self._current: Optional[np.ndarray] = None
+        self._current_bucket: Optional[int] = None
+        self._current_delta = 0.0
+        self._last_price: Optional[float] = None
+        self._last_sign = 1.0
+
+    @property
+    def bins(self) -> int:
+        return 0 if self._cum is None else self._cum.shape[1]
+
+    def _bin_of(self, price: float) -> int:
+        return int(np.floor(price / self.price_step))
+
+    def _ensure_bins(self, low_bin: int, high_bin: int):
+        """Widen the price grid so [low_bin, high_bin] are covered"""
+        if self._cum is None:
+            self.first_bin = low_bin - self.margin_bins
+            width = high_bin - low_bin + 1 + 2 * self.margin_bins
+            self._cum = np.zeros((self.max_buckets + 2, width), dtype=np.float64)
+            self._current = np.zeros(width, dtype=np.float64)
+            return
+
+        last_bin = self.first_bin + self.bins - 1
+        if low_bin >= self.first_bin and high_bin <= last_bin:
+            return
+        pad_left = max(0, self.first_bin - low_bin + self.margin_bins) if low_bin < self.first_bin else 0
+        pad_right = max(0, high_bin - last_bin + self.margin_bins) if high_bin > last_bin else 0
+        self._cum = np.pad(self._cum, ((0, 0), (pad_left, pad_right)))
+        self._current = np.pad(self._current, (pad_left, pad_right))
+        self.first_bin -= pad_left
+
+    def add(self, timestamp: datetime, price: float, volume: float):
+        """Record a tick; O(1) except when a time bucket completes"""
+        bucket = int(to_epoch_seconds(timestamp)) // self.bucket_seconds * self.bucket_seconds
+        price_bin = self._bin_of(price)
+        self._ensure_bins(price_bin, price_bin)
+
+        if self._current_bucket is None:
+            self._current_bucket = bucket
+        elif bucket > self._current_bucket:
+            self._close_bucket()
+            self._current_bucket = bucket
+
+        # Tick rule: upticks are buyer-initiated, downticks seller-initiated
+        if self._last_price is not None and price != self._last_price:
+            self._last_sign = 1.0 if price > self._last_price else -1.0
+        self._last_price = price
+
+        self._current[price_bin - self.first_bin] += volume
+        self._current_delta += self._last_sign * volume
+
+    def add_bars(self, times: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                 closes: np.ndarray, volumes: np.ndarray):
+        """Bulk-load closed bars, placing each bar's volume at its typical price"""
+        if not len(times):
+            return
+        typical = (highs + lows + closes) / 3
+        price_bins = np.floor(typical / self.price_step).astype(np.int64)
+        self._ensure_bins(int(price_bins.min()), int(price_bins.max()))
+
+        buckets = times // self.bucket_seconds * self.bucket_seconds
+        if self._current_bucket is not None:
+            if buckets[0] <= self._current_bucket:
+                raise ValueError("add_bars must be called with bars newer than the index")
+            self._close_bucket()
+
+        starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        row_of_bar = np.cumsum(np.diff(buckets, prepend=buckets[0]) != 0)
+        histograms = np.zeros((len(starts), self.bins), dtype=np.float64)
+        np.add.at(histograms, (row_of_bar, price_bins - self.first_bin), volumes)
+
+        signs = np.sign(np.diff(closes, prepend=closes[0]))
+        deltas = np.add.reduceat(signs * volumes, starts)
+        bucket_times = buckets[starts]
+
+        # The last bucket stays open so live ticks can continue it
+        for row in range(len(starts) - 1):
+            self._current = histograms[row]
+            self._current_delta = float(deltas[row])
+            self._current_bucket = int(bucket_times[row])
+            self._close_bucket()
+        self._current = histograms[-1].copy()
+        self._current_delta = float(deltas[-1])
+        self._current_bucket = int(bucket_times[-1])
+        self._last_price = float(closes[-1])
+
+    def _close_bucket(self):
+        if self.rows == self.max_buckets:
+            self._compact()
+        self._times[self.rows] = self._current_bucket
+        self._cum[self.rows + 1] = self._cum[self.rows] + self._current
+        self._cum_delta[self.rows + 1] = self._cum_delta[self.rows] + self._current_delta
+        self.rows += 1
+        self._current = np.zeros(self.bins, dtype=np.float64)
+        self._current_delta = 0.0
+
+    def _compact(self):
+        """Drop the oldest half of the buckets, rebasing the prefix sums"""
+        drop = self.max_buckets // 2
+        keep = self.rows - drop
+        self._times[:keep] = self._times[drop:self.rows]
+        self._cum[:keep + 1] = self._cum[drop:self.rows + 1] - self._cum[drop]
+        self._cum_delta[:keep + 1] = self._cum_delta[drop:self.rows + 1] - self._cum_delta[drop]
+        self.rows = keep
+
+    def _row_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int, bool]:
+        """Completed-bucket rows for [start, end) and whether the open bucket is included"""
+        times = self._times[:self.rows]
+        first = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        last = self.rows if end is None else int(np.searchsorted(times, end, side="left"))
+        include_current = (
+            self._current_bucket is not None
+            and (end is None or self._current_bucket < end)
+            and (start is None or self._current_bucket >= start)
+        )
+        return first, last, include_current
+
+    def profile(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Bin lower-edge prices and volumes for buckets starting in [start, end)"""
+        if self._cum is None:
+            return np.empty(0), np.empty(0)
+        first, last, include_current = self._row_range(start, end)
+        volumes = self._cum[last] - self._cum[first]
+        if include_current:
+            volumes = volumes + self._current
+        prices = (self.first_bin + np.arange(self.bins)) * self.price_step
+        return prices, volumes
+
+    def delta(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[float, float]:
+        """Signed and total volume over the window"""
+        if self._cum is None:
+            return 0.0, 0.0
+        first, last, include_current = self._row_range(start, end)
+        signed = self._cum_delta[last] - self._cum_delta[first]
+        total = float(self._cum[last].sum() - self._cum[first].sum())
+        if include_current:
+            signed += self._current_delta
+            total += float(self._current.sum())
+        return float(signed), total
+
+    def flow(self, start: Optional[float] = None, end: Optional[float] = None) -> float:
+        """Net buying pressure as a percentage of traded volume (-100..100)"""
+        signed, total = self.delta(start, end)
+        return 100.0 * signed / total if total > 0 else 0.0
+
+    def point_of_control(self, start: Optional[float] = None, end: Optional[float] = None) -> Optional[float]:
+        prices, volumes = self.profile(start, end)
+        if not len(volumes) or volumes.max() <= 0:
+            return None
+        return float(prices[int(volumes.argmax())] + self.price_step / 2)
+
+    def value_area(self, start: Optional[float] = None, end: Optional[float] = None,
+                   percentage: float = 0.7) -> Optional[Dict[str, float]]:
+        """Contiguous price range around the POC holding ``percentage`` of volume"""
+        prices, volumes = self.profile(start, end)
+        total = volumes.sum() if len(volumes) else 0.0
+        if total <= 0:
+            return None
+
+        poc = int(volumes.argmax())
+        low, high = poc, poc
+        area = volumes[poc]
+        target = total * percentage
+        while area < target:
+            below = volumes[low - 1] if low > 0 else -1.0
+            above = volumes[high + 1] if high < len(volumes) - 1 else -1.0
+            if above >= below:
+                high += 1
+                area += above
+            else:
+                low -= 1
+                area += below
+
+        return {
+            "poc": float(prices[poc] + self.price_step / 2),
+            "value_area_high": float(prices[high] + self.price_step),
+            "value_area_low": float(prices[low]),
+            "volume": float(total)
+        }
+
+    def volume_nodes(self, start: Optional[float] = None, end: Optional[float] = None,
+                     smoothing: int = 3, limit: int = 5) -> Dict[str, List[Dict[str, float]]]:
+        """High- and low-volume nodes: local peaks and troughs of the profile"""
+        prices, volumes = self.profile(start, end)
+        traded = np.flatnonzero(volumes > 0)
+        if len(traded) < 3:
+            return {"high_volume_nodes": [], "low_volume_nodes": []}
+
+        # Only consider the traded range; empty margin bins are not troughs
+        prices = prices[traded[0]:traded[-1] + 1]
+        volumes = volumes[traded[0]:traded[-1] + 1]
+        kernel = np.ones(smoothing) / smoothing
+        smooth = np.convolve(volumes, kernel, mode="same")
+        inner = np.arange(1, len(smooth) - 1)
+        peaks = inner[(smooth[inner] > smooth[inner - 1]) & (smooth[inner] >= smooth[inner + 1])]
+        troughs = inner[(smooth[inner] < smooth[inner - 1]) & (smooth[inner] <= smooth[inner + 1])]
+        mean = smooth.mean()
+
+        def nodes(indices, keep, reverse):
+            indices = indices[keep(smooth[indices])]
+            indices = indices[np.argsort(smooth[indices])]
+            if reverse:
+                indices = indices[::-1]
+            return [
+                {"price": float(prices[i] + self.price_step / 2), "volume": float(smooth[i])}
+                for i in indices[:limit]
+            ]
+
+        return {
+            "high_volume_nodes": nodes(peaks, lambda v: v > mean, True),
+            "low_volume_nodes": nodes(troughs, lambda v: v < mean, False)
+        }
+
+    def volume_rank(self, prices: List[float], start: Optional[float] = None,
+                    end: Optional[float] = None) -> np.ndarray:
+        """Percentile rank (0..1) of the volume traded at each price among traded bins"""
+        bin_prices, volumes = self.profile(start, end)
+        if not len(volumes) or not len(prices):
+            return np.zeros(len(prices))
+        traded = np.sort(volumes[volumes > 0])
+        if not len(traded):
+            return np.zeros(len(prices))
+        columns = np.clip(
+            np.floor(np.asarray(prices) / self.price_step).astype(np.int64) - self.first_bin,
+            0, self.bins - 1
+        )
+        return np.searchsorted(traded, volumes[columns], side="right") / len(traded)
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Value area plus volume nodes for one window"""
+        value_area = self.value_area(start, end) or {}
+        return {**value_area, **self.volume_nodes(start, end)}
@@ -1,43 +1,329 @@
 from fastapi import WebSocket
-from typing import List
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+import asyncio
 import json
+import time
+from datetime import datetime
 import logging
 
+from app.core.config import settings
+from app.services.wire_format import WIRE_FORMATS, OutboundMessage
+
 logger = logging.getLogger(__name__)
 
+OVERFLOW_POLICIES = ("drop_oldest", "conflate", "disconnect")
+
+Message = Union[str, OutboundMessage]
+
+
+class SlowConsumerError(Exception):
+    """Raised when a connection's send queue overflows under the disconnect policy"""
+
+
+class SendQueue:
+    """Bounded outbound queue for one socket, drained by its own task.
+
+    Producers only append, so a slow or stalled client never delays anyone
+    else. When the queue is full the overflow policy decides what happens:
+
+    - ``drop_oldest``: discard the oldest queued message
+    - ``conflate``: replace the queued messages for the same topic with
+      the newest one (falls back to dropping the oldest)
+    - ``disconnect``: close the connection
+
+    Dropped stream messages leave a gap in the topic's ``seq``, which
+    clients repair with a ``resync``.
+    """
+
+    def __init__(self, websocket: WebSocket, max_size: int, policy: str, send_timeout: float,
+                 wire_format: str = "json"):
+        self.websocket = websocket
+        self.wire_format = wire_format
+        self.max_size = max_size
+        self.policy = policy
+        self.send_timeout = send_timeout
+        # (topic, message, enqueued_at); topic is None for control messages
+        self._items: Deque[Tuple[Optional[str], Message, float]] = deque()
+        self._ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {
+            "sent": 0,
+            "bytes_sent": 0,
+            "dropped": 0,
+            "conflated": 0,
+            "max_depth": 0,
+            "last_lag_ms": 0.0,
+            "avg_lag_ms": 0.0,
+            "max_lag_ms": 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, message: Message, topic: Optional[str] = None):
+        if len(self._items) >= self.max_size:
+            self._overflow(topic, message)
+        else:
+            self._items.append((topic, message, time.perf_counter()))
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._items))
+        self._ready.set()
+
+    def _overflow(self, topic: Optional[str], message: Message):
+        if self.policy == "disconnect":
+            raise SlowConsumerError(f"send queue full ({self.max_size} messages)")
+
+        if self.policy == "conflate" and topic is not None:
+            pending = [item for item in self._items if item[0] == topic]
+            if pending:
+                # Only the newest message per topic survives; keep the oldest
+                # enqueue time so lag still reflects how stale the topic is
+                self._items = deque(item for item in self._items if item[0] != topic)
+                self._items.append((topic, message, pending[0][2]))
+                self.stats["conflated"] += len(pending)
+                return
+
+        self._items.popleft()
+        self._items.append((topic, message, time.perf_counter()))
+        self.stats["dropped"] += 1
+
+    async def drain(self):
+        """Send queued messages in order until the socket fails or closes"""
+        while True:
+            if not self._items:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            _, message, enqueued_at = self._items.popleft()
+            if isinstance(message, str):
+                data = message
+            elif self.wire_format == "binary":
+                data = message.binary
+            else:
+                data = message.text
+            send = self.websocket.send_bytes(data) if isinstance(data, bytes) else self.websocket.send_text(data)
+            await asyncio.wait_for(send, timeout=self.send_timeout)
+
+            lag_ms = (time.perf_counter() - enqueued_at) * 1000
+            stats = self.stats
+            stats["sent"] += 1
+            stats["bytes_sent"] += len(data)
+            stats["last_lag_ms"] = lag_ms
+            stats["avg_lag_ms"] += (lag_ms - stats["avg_lag_ms"]) * 0.1
+            stats["max_lag_ms"] = max(stats["max_lag_ms"], lag_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self._items),
+            "policy": self.policy,
+            "wire_format": self.wire_format,
+            **self.stats
+        }
+
+
+class ConnectionInfo:
+    """Registry entry for one socket: its send queue, topics and metadata"""
+
+    __slots__ = ("id", "websocket", "queue", "topics", "connected_at", "client")
+
+    def __init__(self, connection_id: int, websocket: WebSocket, queue: SendQueue):
+        self.id = connection_id
+        self.websocket = websocket
+        self.queue = queue
+        self.topics: Set[str] = set()
+        self.connected_at = datetime.utcnow()
+        client = websocket.client
+        self.client = f"{client.host}:{client.port}" if client else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "client": self.client,
+            "connected_at": self.connected_at.isoformat(),
+            "connected_seconds": (datetime.utcnow() - self.connected_at).total_seconds(),
+            "topics": sorted(self.topics),
+            **self.queue.get_stats()
+        }
+
+
 class WebSocketManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    """Connection registry and topic fan-out.
+
+    Connections live in a dict keyed by socket and topics map to sets of
+    sockets, so connect, disconnect and subscription changes are O(1) per
+    socket/topic no matter how many clients are attached.
+    """
 
-    async def connect(self, websocket: WebSocket):
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        send_timeout: Optional[float] = None
+    ):
+        self.connections: Dict[WebSocket, ConnectionInfo] = {}
+        self._by_id: Dict[int, WebSocket] = {}
+        # topic -> subscribed sockets; each ConnectionInfo holds the reverse index
+        self.topics: Dict[str, Set[WebSocket]] = {}
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or settings.WS_OVERFLOW_POLICY
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT_SECONDS
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {self.overflow_policy}")
+        self.slow_consumer_disconnects = 0
+        self.total_connections = 0
+        # Strong references to pending slow-consumer closes; the loop only keeps weak ones
+        self._close_tasks: Set[asyncio.Task] = set()
+
+    async def connect(self, websocket: WebSocket, wire_format: str = "json"):
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Unknown wire format: {wire_format}")
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        queue = SendQueue(websocket, self.queue_size, self.overflow_policy, self.send_timeout, wire_format)
+        self.total_connections += 1
+        self.connections[websocket] = ConnectionInfo(self.total_connections, websocket, queue)
+        self._by_id[self.total_connections] = websocket
+        queue.task = asyncio.create_task(self._run_queue(queue))
+        logger.info(f"WebSocket connected. Total connections: {len(self.connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
+        if self._remove(websocket):
+            logger.info(f"WebSocket disconnected. Total connections: {len(self.connections)}")
+
+    def _remove(self, websocket: WebSocket) -> bool:
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return False
+        del self._by_id[connection.id]
+        task = connection.queue.task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        for topic in connection.topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self.topics[topic]
+        connection.topics.clear()
+        return True
+
+    def get_connection(self, connection_id: int) -> Optional[ConnectionInfo]:
+        websocket = self._by_id.get(connection_id)
+        return self.connections.get(websocket) if websocket is not None else None
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
+    async def close_connection(self, websocket: WebSocket, code: int = 1000):
+        self.disconnect(websocket)
+        await self._close(websocket, code)
+
+    async def _run_queue(self, queue: SendQueue):
         try:
-            await websocket.send_text(message)
+            await queue.drain()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"WebSocket send timed out after {queue.send_timeout}s, disconnecting")
+            self.disconnect(queue.websocket)
+            await self._close(queue.websocket, code=1013)
         except Exception as e:
-            logger.error(f"Error sending message to websocket: {e}")
+            logger.error(f"Error sending to websocket: {e}")
+            self.disconnect(queue.websocket)
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _enqueue(self, websocket: WebSocket, message: Message, topic: Optional[str] = None):
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return
+        try:
+            connection.queue.put(message, topic)
+        except SlowConsumerError as e:
+            logger.warning(f"Disconnecting slow consumer: {e}")
+            self.slow_consumer_disconnects += 1
             self.disconnect(websocket)
+            # 1013 "try again later"; closing is left to a task so producers never wait
+            task = asyncio.create_task(self._close(websocket, code=1013))
+            self._close_tasks.add(task)
+            task.add_done_callback(self._close_tasks.discard)
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Add topics for a socket; returns the ones it was not already subscribed to"""
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return []
+        added = []
+        for topic in topics:
+            if topic not in connection.topics:
+                connection.topics.add(topic)
+                self.topics.setdefault(topic, set()).add(websocket)
+                added.append(topic)
+        return added
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return []
+        removed = []
+        for topic in topics:
+            if topic in connection.topics:
+                connection.topics.discard(topic)
+                subscribers = self.topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(websocket)
+                    if not subscribers:
+                        del self.topics[topic]
+                removed.append(topic)
+        return removed
+
+    def get_subscriptions(self, websocket: WebSocket) -> Set[str]:
+        connection = self.connections.get(websocket)
+        return connection.topics if connection is not None else set()
+
+    def has_subscribers(self, topic: str) -> bool:
+        return bool(self.topics.get(topic))
+
+    def wire_format(self, websocket: WebSocket) -> str:
+        connection = self.connections.get(websocket)
+        return connection.queue.wire_format if connection is not None else "json"
+
+    def wire_formats_in_use(self) -> Set[str]:
+        return {connection.queue.wire_format for connection in self.connections.values()}
+
+    async def publish(self, topic: str, message: Message):
+        """Queue an already-built message for the sockets subscribed to a topic"""
+        for websocket in list(self.topics.get(topic, ())):
+            self._enqueue(websocket, message, topic)
+
+    async def send_personal_message(self, message: Message, websocket: WebSocket):
+        self._enqueue(websocket, message)
 
     async def broadcast(self, message: str):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to websocket: {e}")
-                disconnected.append(connection)
-        
-        # Remove disconnected websockets
-        for connection in disconnected:
-            self.disconnect(connection)
+        for websocket in list(self.connections):
+            self._enqueue(websocket, message)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregate queue and lag metrics across connections"""
+        queues = [connection.queue for connection in self.connections.values()]
+        return {
+            "connections": len(queues),
+            "total_connections": self.total_connections,
+            "topics": len(self.topics),
+            "overflow_policy": self.overflow_policy,
+            "queue_size": self.queue_size,
+            "queued_messages": sum(len(queue) for queue in queues),
+            "bytes_sent": sum(queue.stats["bytes_sent"] for queue in queues),
+            "dropped": sum(queue.stats["dropped"] for queue in queues),
+            "conflated": sum(queue.stats["conflated"] for queue in queues),
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "worst_last_lag_ms": max((queue.stats["last_lag_ms"] for queue in queues), default=0.0)
+        }
+
+    def get_connection_stats(self) -> List[Dict[str, Any]]:
+        """Per-connection metadata, queue depth, bytes sent, drops and send lag"""
+        return [connection.get_stats() for connection in self.connections.values()]
 
     async def send_trading_signal(self, signal_data: dict):
         message = json.dumps({
@@ -48,7 +334,7 @@ class WebSocketManager:
 
     async def send_market_update(self, market_data: dict):
         message = json.dumps({
-            "type": "market_update", 
+            "type": "market_update",
             "data": market_data
         })
         await self.broadcast(message)
@@ -58,4 +344,8 @@ class WebSocketManager:
             "type": "trade_execution",
             "data": trade_data
         })
-        await self.broadcast(message)
\ No newline at end of file
+        await self.broadcast(message)
+
+
+# Shared by the stream endpoints and the admin routes
+websocket_manager = WebSocketManager()
@@ -0,0 +1,116 @@
+import json
+import struct
+from functools import lru_cache
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from app.services.bar_store import to_epoch_seconds
+
+# Per-connection stream encodings, chosen with ``?format=`` on connect
+WIRE_FORMATS = ("json", "binary")
+
+WIRE_VERSION = 1
+KIND_SNAPSHOT = 1
+KIND_DELTA = 2
+KINDS = {"snapshot": KIND_SNAPSHOT, "delta": KIND_DELTA}
+
+# Body encodings
+BODY_PRICE = 0  # int32 price scaled by PRICE_SCALE
+BODY_JSON = 1  # compact UTF-8 JSON {"d": data, "r": removed}
+
+PRICE_SCALE = 100000
+
+# version, kind, body encoding, channel id, pair id, seq, timestamp (epoch ms)
+HEADER = struct.Struct("<BBBBHIQ")
+PRICE = struct.Struct("<i")
+
+
+class IdRegistry:
+    """Small integer ids for names sent over the binary format"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.ids: Dict[str, int] = {}
+
+    def id(self, name: str) -> int:
+        value = self.ids.get(name)
+        if value is None:
+            value = len(self.ids)
+            if value >= self.limit:
+                raise ValueError(f"Too many ids registered (limit {self.limit})")
+            self.ids[name] = value
+        return value
+
+
+channel_ids = IdRegistry(limit=256)
+pair_ids = IdRegistry(limit=65536)
+
+
+@lru_cache(maxsize=16)
+def _epoch_ms(timestamp: str) -> int:
+    # Every topic in a broadcast tick shares one timestamp, so parse it once
+    return int(to_epoch_seconds(datetime.fromisoformat(timestamp)) * 1000)
+
+
+def topic_ids(topic: str) -> Dict[str, Any]:
+    """Channel and pair ids a binary client needs to decode a topic"""
+    channel, _, pair = topic.partition(":")
+    return {"channel": channel_ids.id(channel), "pair": pair_ids.id(pair)}
+
+
+class OutboundMessage:
+    """A stream message encoded lazily, at most once per wire format.
+
+    Snapshot and delta messages are built once per topic per tick and then
+    queued for every subscriber; each connection picks the encoding it
+    negotiated, so JSON and binary clients share the same cached bytes.
+    """
+
+    __slots__ = ("payload", "_text", "_binary")
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self._text: Optional[str] = None
+        self._binary: Optional[bytes] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = json.dumps(self.payload)
+        return self._text
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = encode_binary(self.payload)
+        return self._binary
+
+    def encode(self, wire_format: str) -> Union[str, bytes]:
+        return self.binary if wire_format == "binary" else self.text
+
+
+def encode_binary(payload: Dict[str, Any]) -> bytes:
+    """Pack a snapshot/delta message into the compact binary layout.
+
+    A price-only update is a fixed 22-byte frame; anything else carries its
+    fields as compact JSON after the same header.
+    """
+    channel, _, pair = payload["topic"].partition(":")
+    data = payload["data"]
+    removed = payload.get("removed")
+
+    price = data.get("price") if isinstance(data, dict) and len(data) == 1 else None
+    if channel == "prices" and isinstance(price, (int, float)) and not removed:
+        encoding = BODY_PRICE
+        body = PRICE.pack(round(price * PRICE_SCALE))
+    else:
+        encoding = BODY_JSON
+        fields = {"d": data, "r": removed} if removed else {"d": data}
+        body = json.dumps(fields, separators=(",", ":")).encode()
+
+    header = HEADER.pack(
+        WIRE_VERSION, KINDS[payload["type"]], encoding,
+        channel_ids.id(channel), pair_ids.id(pair),
+        payload["seq"] & 0xFFFFFFFF, _epoch_ms(payload["timestamp"])
+    )
+    return header + body
@@ -0,0 +1,223 @@
+"""Request concurrency benchmark for the database-backed HTTP routes.
+
+Drives the trade, analytics and signal read routes of a running server
+with increasing numbers of concurrent clients and reports throughput,
+latency percentiles, errors and the server's event-loop responsiveness
+per level as JSON. Run it once against a build with the blocking ORM
+calls and once against the async engine, then pass the first report as
+--baseline to get the throughput ratio per level.
+
+    cd backend
+    python benchmarks/db_concurrency_benchmark.py --spawn-server --concurrency 1,16,64,256 --report async.json
+    python benchmarks/db_concurrency_benchmark.py --url http://localhost:8000 --baseline sync.json
+
+Seed the database first (e.g. with db_query_benchmark.py) so the routes
+do real work; the pool settings under test come from the server's
+DB_* environment variables.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = [
+    "/api/v1/trading/trades?limit=100",
+    "/api/v1/trading/trades?limit=100&pair=EUR/USD",
+    "/api/v1/trading/open-trades",
+    "/api/v1/analytics/trade-summary?timeframe=7d",
+    "/api/v1/analytics/strategy-performance?timeframe=30d",
+    "/api/v1/analytics/recent-trades",
+    "/api/v1/signals/active",
+    "/api/v1/signals/performance?timeframe=7d"
+]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    values = np.asarray(samples)
+    return {
+        "count": len(samples),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max())
+    }
+
+
+async def wait_for_server(url: str, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=5) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not become healthy within {timeout}s")
+
+
+async def probe_server(url: str, samples: List[float], stop: asyncio.Event, interval: float = 0.25):
+    """Round-trip time of /health, which does no I/O: it only grows when queries block the loop"""
+    async with httpx.AsyncClient(timeout=60) as client:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                await client.get(f"{url}/health")
+                samples.append((time.perf_counter() - started) * 1000)
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(interval)
+
+
+async def fetch_loop_lag(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            return (await client.get(f"{url}/health")).json().get("event_loop_lag_ms")
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+async def run_worker(
+    client: httpx.AsyncClient,
+    offset: int,
+    deadline: float,
+    latencies: List[float],
+    errors: Dict[str, int]
+):
+    """Cycle through ROUTES back to back until the deadline, starting at ``offset``"""
+    index = offset
+    while time.perf_counter() < deadline:
+        route = ROUTES[index % len(ROUTES)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(route)
+            if response.status_code != 200:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run_level(url: str, concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        # Open the connections and warm the server's pool before measuring
+        await asyncio.gather(*(
+            run_worker(client, worker, time.perf_counter() + warmup, [], {})
+            for worker in range(concurrency)
+        ))
+
+        latencies: List[float] = []
+        errors: Dict[str, int] = {}
+        health_rtt: List[float] = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_server(url, health_rtt, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_worker(client, worker, started + duration, latencies, errors)
+            for worker in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    result = {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": len(latencies) / elapsed,
+        "latency_ms": percentiles(latencies),
+        "health_rtt_ms": percentiles(health_rtt),
+        "server_loop_lag_ms": await fetch_loop_lag(url)
+    }
+    print(
+        f"concurrency {concurrency}: {result['requests_per_sec']:.1f} req/s, "
+        f"p50 {result['latency_ms'].get('p50', 0):.1f} ms, health p99 {result['health_rtt_ms'].get('p99', 0):.1f} ms",
+        file=sys.stderr
+    )
+    return result
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = None
+    if args.spawn_server:
+        port = args.url.rsplit(":", 1)[-1]
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", port, "--log-level", "warning"],
+            cwd=BACKEND_DIR
+        )
+
+    try:
+        await wait_for_server(args.url)
+        levels = [
+            await run_level(args.url, concurrency, args.duration, args.warmup)
+            for concurrency in args.concurrency
+        ]
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "config": {
+            "url": args.url,
+            "label": args.label,
+            "routes": ROUTES,
+            "duration_seconds": args.duration,
+            "pool": {key: os.environ[key] for key in sorted(os.environ) if key.startswith("DB_")}
+        },
+        "levels": levels
+    }
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = {level["concurrency"]: level for level in json.load(baseline_file)["levels"]}
+        report["throughput_ratio"] = {
+            str(level["concurrency"]): level["requests_per_sec"] / baseline[level["concurrency"]]["requests_per_sec"]
+            for level in levels
+            if baseline.get(level["concurrency"], {}).get("requests_per_sec")
+        }
+    return report
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000", help="Server base URL")
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[1, 8, 32, 128], help="Comma-separated concurrent client counts")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measurement window per level in seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each level")
+    parser.add_argument("--spawn-server", action="store_true", help="Start uvicorn app.main:app for the run")
+    parser.add_argument("--label", default="", help="Free-form name stored in the report, e.g. the git revision")
+    parser.add_argument("--baseline", help="Earlier report to compute throughput ratios against")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as output:
+            output.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
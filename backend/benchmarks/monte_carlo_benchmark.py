@@ -0,0 +1,142 @@
+"""Monte Carlo risk simulation throughput: per-path Python loop vs the vectorized engine.
+
+Builds a synthetic closed-trade history, simulates a sample of paths with
+a plain loop over trades and the same paths with
+app.services.monte_carlo, checks both agree, then times the full run
+in-process and sharded over each process-pool size. Reports paths per
+second and speedups as JSON.
+
+    cd backend
+    python benchmarks/monte_carlo_benchmark.py
+    python benchmarks/monte_carlo_benchmark.py --paths 100000 --horizon 500 --workers 2,4,8
+
+No database is needed. Pool timings exclude starting the pool.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def synthetic_profits(rng: np.random.Generator, count: int) -> np.ndarray:
+    """45% winners averaging 1.5x the average loser"""
+    wins = rng.random(count) < 0.45
+    return np.where(wins, rng.normal(150, 40, count), -np.abs(rng.normal(100, 20, count)))
+
+
+def loop_paths(returns: List[float], risk_fraction: float, draws: np.ndarray) -> List[float]:
+    """Worst drawdown per path, compounding one trade at a time"""
+    worst = []
+    for path in draws.T.tolist():
+        equity = peak = 1.0
+        deepest = 0.0
+        for index in path:
+            equity *= max(1.0 + risk_fraction * returns[index], 1e-12)
+            peak = max(peak, equity)
+            deepest = max(deepest, 1.0 - equity / peak)
+        worst.append(deepest)
+    return worst
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.services import monte_carlo
+
+    profit = synthetic_profits(np.random.default_rng(args.seed), args.trades)
+    returns, _ = monte_carlo.r_multiples(profit)
+    risk_fraction = np.asarray([args.risk_percentage / 100])
+
+    # The loop replays the first chunk's draws, so both must find the same drawdowns
+    count, chunk_seed = monte_carlo._chunks(args.paths, args.horizon, args.seed)[0]
+    sample = min(args.loop_paths, count)
+    draws = np.random.default_rng(chunk_seed).integers(len(returns), size=(args.horizon, count), dtype=np.int32)
+    started = time.perf_counter()
+    loop_worst = loop_paths(returns.tolist(), float(risk_fraction[0]), draws[:, :sample])
+    loop_seconds = time.perf_counter() - started
+    engine_worst = -np.expm1(-monte_carlo._simulate_chunk(returns, risk_fraction, count, args.horizon, chunk_seed)[0][0, :sample])
+    agrees = bool(np.allclose(engine_worst, loop_worst, atol=1e-4))
+
+    results: Dict[str, Any] = {
+        "python_loop": {
+            "paths": sample,
+            "seconds": loop_seconds,
+            "paths_per_second": sample / loop_seconds
+        }
+    }
+    for workers in [0, *args.workers]:
+        if workers:
+            # Start the pool outside the timing
+            asyncio.run(monte_carlo.run_simulation(profit, args.risk_percentage, 100, args.horizon, seed=args.seed, workers=workers))
+        started = time.perf_counter()
+        report = asyncio.run(monte_carlo.run_simulation(
+            profit, args.risk_percentage, args.paths, args.horizon, seed=args.seed, workers=workers
+        ))
+        seconds = time.perf_counter() - started
+        monte_carlo.shutdown_process_pool()
+        name = f"pool_{workers}" if workers else "in_process"
+        results[name] = {
+            "paths": args.paths,
+            "risk_levels": len(report["sensitivity"]),
+            "seconds": seconds,
+            "paths_per_second": args.paths / seconds,
+            "risk_of_ruin": report["result"]["risk_of_ruin"],
+            "median_max_drawdown_pct": report["result"]["max_drawdown_pct"]["p50"]
+        }
+        print(f"{name}: {seconds:.2f}s ({args.paths / seconds:.0f} paths/s)", file=sys.stderr)
+
+    # The loop simulates one risk level; the engine simulates every sensitivity level
+    baseline = results["python_loop"]["paths_per_second"] / results["in_process"]["risk_levels"]
+    return {
+        "config": {
+            "trades": args.trades,
+            "paths": args.paths,
+            "horizon": args.horizon,
+            "risk_percentage": args.risk_percentage,
+            "workers": args.workers,
+            "cpus": os.cpu_count()
+        },
+        "results": results,
+        "loop_agrees": agrees,
+        "speedup_vs_loop": {
+            name: result["paths_per_second"] / baseline
+            for name, result in results.items()
+            if name != "python_loop"
+        }
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--trades", type=int, default=500, help="Closed trades in the synthetic history")
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--horizon", type=int, default=250, help="Trades per path")
+    parser.add_argument("--risk-percentage", type=float, default=2.0)
+    parser.add_argument("--loop-paths", type=int, default=2000, help="Paths simulated by the Python loop")
+    parser.add_argument("--workers", type=lambda value: [int(size) for size in value.split(",") if size],
+                        default=[2, 4], help="Comma-separated process-pool sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    sys.path.insert(0, BACKEND_DIR)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as output:
+            output.write(text)
+    print(text)
+    if not report["loop_agrees"]:
+        sys.exit("Engine and loop disagree on the sampled paths")
+
+
+if __name__ == "__main__":
+    main()
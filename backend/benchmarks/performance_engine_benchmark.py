@@ -0,0 +1,176 @@
+"""Performance analytics timing: per-trade Python loop vs the vectorized engine.
+
+Builds synthetic closed-trade histories and computes the equity curve,
+drawdowns, daily Sharpe/Sortino, streaks and rolling metrics with a plain
+loop over trades (how per-object analytics would do it) and with
+app.services.performance_engine, checks both agree on the headline
+figures, and reports seconds and speedup per size as JSON.
+
+    cd backend
+    python benchmarks/performance_engine_benchmark.py
+    python benchmarks/performance_engine_benchmark.py --trades 10000,100000,500000 --bucket 1w --window 100
+
+No database is needed; only the compute step is timed.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+START_EPOCH = 1_672_531_200  # 2023-01-01
+
+
+def synthetic_trades(rng: np.random.Generator, count: int) -> Dict[str, np.ndarray]:
+    """Trades closing every ~3 minutes on average with a slight positive edge"""
+    gaps = rng.exponential(180, count).astype(np.int64)
+    profit = rng.normal(1.5, 40.0, count)
+    return {"time": START_EPOCH + np.cumsum(gaps), "profit": profit, "pips": profit / 10}
+
+
+def loop_metrics(trades: Dict[str, np.ndarray], initial_balance: float, window: int) -> Dict[str, Any]:
+    """The same headline figures from one Python iteration per trade"""
+    times = trades["time"].tolist()
+    profits = trades["profit"].tolist()
+    equity = peak = initial_balance
+    max_drawdown = 0.0
+    wins = losses = streak = max_win_streak = max_loss_streak = 0
+    gross_win = gross_loss = 0.0
+    daily: Dict[int, float] = {}
+    recent: List[float] = []
+    rolling_expectancy = []
+    for close_time, profit in zip(times, profits):
+        equity += profit
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, peak - equity)
+        if profit > 0:
+            wins += 1
+            gross_win += profit
+            streak = streak + 1 if streak > 0 else 1
+            max_win_streak = max(max_win_streak, streak)
+        elif profit < 0:
+            losses += 1
+            gross_loss += profit
+            streak = streak - 1 if streak < 0 else -1
+            max_loss_streak = max(max_loss_streak, -streak)
+        else:
+            streak = 0
+        day = close_time // 86400
+        daily[day] = daily.get(day, 0.0) + profit
+        recent.append(profit)
+        if len(recent) > window:
+            recent.pop(0)
+        rolling_expectancy.append(sum(recent) / len(recent))
+
+    returns = []
+    balance = initial_balance
+    for day in range(min(daily), max(daily) + 1):
+        pnl = daily.get(day, 0.0)
+        if (day - 4) % 7 < 5 or pnl != 0:
+            returns.append(pnl / balance)
+        balance += pnl
+    mean = sum(returns) / len(returns)
+    std = math.sqrt(sum((value - mean) ** 2 for value in returns) / (len(returns) - 1))
+    return {
+        "final_equity": equity,
+        "max_drawdown": max_drawdown,
+        "profit_factor": gross_win / -gross_loss,
+        "max_win_streak": max_win_streak,
+        "max_loss_streak": max_loss_streak,
+        "sharpe_ratio": mean / std * math.sqrt(252),
+        "rolling_expectancy": rolling_expectancy[-1]
+    }
+
+
+def timed(call, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.services.performance_engine import compute_performance
+
+    rng = np.random.default_rng(args.seed)
+    results: Dict[str, Any] = {}
+    for count in args.trades:
+        trades = synthetic_trades(rng, count)
+        engine = compute_performance(trades, args.initial_balance, args.bucket, args.window)
+        loop = loop_metrics(trades, args.initial_balance, args.window)
+        checks = {
+            "final_equity": (engine["summary"]["final_equity"], loop["final_equity"]),
+            "max_drawdown": (engine["drawdown"]["max_drawdown"], loop["max_drawdown"]),
+            "profit_factor": (engine["summary"]["profit_factor"], loop["profit_factor"]),
+            "max_win_streak": (engine["streaks"]["max_win_streak"], loop["max_win_streak"]),
+            "max_loss_streak": (engine["streaks"]["max_loss_streak"], loop["max_loss_streak"]),
+            "sharpe_ratio": (engine["risk"]["sharpe_ratio"], loop["sharpe_ratio"]),
+            "rolling_expectancy": (engine["series"]["rolling_expectancy"][-1], loop["rolling_expectancy"])
+        }
+        # Engine figures are rounded for the API
+        mismatches = [name for name, (left, right) in checks.items() if not math.isclose(left, right, rel_tol=1e-3, abs_tol=0.01)]
+
+        loop_seconds = timed(lambda: loop_metrics(trades, args.initial_balance, args.window), args.repeat)
+        engine_seconds = timed(lambda: compute_performance(trades, args.initial_balance, args.bucket, args.window), args.repeat)
+        results[str(count)] = {
+            "trades": count,
+            "buckets": engine["series"]["count"],
+            "loop_seconds": loop_seconds,
+            "engine_seconds": engine_seconds,
+            "speedup": loop_seconds / engine_seconds,
+            "mismatches": mismatches
+        }
+        print(f"{count} trades: loop {loop_seconds:.3f}s, engine {engine_seconds:.3f}s "
+              f"({loop_seconds / engine_seconds:.1f}x)", file=sys.stderr)
+
+    return {
+        "config": {
+            "trades": args.trades,
+            "bucket": args.bucket,
+            "window": args.window,
+            "initial_balance": args.initial_balance,
+            "repeat": args.repeat
+        },
+        "results": results,
+        "mismatches": {size: result["mismatches"] for size, result in results.items() if result["mismatches"]}
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--trades", type=lambda value: [int(size) for size in value.split(",")],
+                        default=[10_000, 100_000, 500_000], help="Comma-separated history sizes")
+    parser.add_argument("--bucket", default="1d")
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--initial-balance", type=float, default=100_000.0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    # The engine module imports the models, which build an engine at import time; nothing connects
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    sys.path.insert(0, BACKEND_DIR)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as output:
+            output.write(text)
+    print(text)
+    if report["mismatches"]:
+        sys.exit(f"Engine and loop disagree: {report['mismatches']}")
+
+
+if __name__ == "__main__":
+    main()
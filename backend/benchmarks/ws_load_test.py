@@ -0,0 +1,303 @@
+"""Load generator for the /ws/market-data and /ws/trading-signals streams.
+
+Opens thousands of concurrent WebSocket clients against one worker and
+reports delivery latency percentiles, messages/sec, server memory per
+connection and event-loop lag as JSON, so changes to WebSocketManager and
+the broadcast path can be compared run to run.
+
+    cd backend
+    python benchmarks/ws_load_test.py --spawn-server --clients 2000 --duration 60
+    python benchmarks/ws_load_test.py --url ws://localhost:8000 --server-pid 1234 --format binary
+
+Latency is measured from the server timestamp in each delta to its
+arrival, so client and server must share a clock (run both on one host).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import struct
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+import httpx
+import numpy as np
+import websockets
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Binary frames: kind byte at offset 1, epoch-ms timestamp at offset 10
+BINARY_KIND_DELTA = 2
+BINARY_TIMESTAMP = struct.Struct("<Q")
+
+
+class LoadStats:
+    """Counters shared by all simulated clients"""
+
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.closed_by_server = 0
+        self.measuring = False
+        self.messages = 0
+        self.bytes = 0
+        self.latencies_ms: List[float] = []
+
+    def record(self, message: Any, received_at: float):
+        if not self.measuring:
+            return
+        self.messages += 1
+        self.bytes += len(message)
+        latency = delivery_latency_ms(message, received_at)
+        if latency is not None:
+            self.latencies_ms.append(latency)
+
+
+def delivery_latency_ms(message: Any, received_at: float) -> Optional[float]:
+    """Server-to-client delay of a delta; snapshots replay old state and are skipped"""
+    if isinstance(message, bytes):
+        if message[1] != BINARY_KIND_DELTA:
+            return None
+        sent_at = BINARY_TIMESTAMP.unpack_from(message, 10)[0] / 1000
+    else:
+        payload = json.loads(message)
+        if payload.get("type") != "delta":
+            return None
+        sent_at = datetime.fromisoformat(payload["timestamp"]).replace(tzinfo=timezone.utc).timestamp()
+    return (received_at - sent_at) * 1000
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    values = np.asarray(samples)
+    return {
+        "count": len(values),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "p999": float(np.percentile(values, 99.9)),
+        "max": float(values.max())
+    }
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def raise_file_limit(required: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < required:
+        target = hard if hard == resource.RLIM_INFINITY else min(hard, max(required, soft))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+async def run_client(url: str, stats: LoadStats):
+    """One simulated dashboard; runs until cancelled or closed by the server"""
+    try:
+        async with websockets.connect(url, max_size=None, open_timeout=60, ping_interval=None) as ws:
+            stats.connected += 1
+            async for message in ws:
+                stats.record(message, time.time())
+        stats.closed_by_server += 1
+    except websockets.ConnectionClosed:
+        stats.closed_by_server += 1
+    except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake):
+        stats.failed += 1
+
+
+async def monitor_loop_lag(samples: List[float], stop: asyncio.Event, interval: float = 0.05):
+    """Harness-side loop lag, to tell a saturated client from a slow server"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def probe_server(http_url: str, samples: List[float], stop: asyncio.Event, interval: float = 0.5):
+    """Round-trip time of /health; grows with the server's event-loop lag"""
+    async with httpx.AsyncClient(timeout=30) as client:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                await client.get(f"{http_url}/health")
+                samples.append((time.perf_counter() - started) * 1000)
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(interval)
+
+
+async def fetch_server_stats(http_url: str) -> Dict[str, Any]:
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            health = (await client.get(f"{http_url}/health")).json()
+        return {key: health.get(key) for key in ("websockets", "broadcasters", "event_loop_lag_ms")}
+    except (httpx.HTTPError, ValueError):
+        return {}
+
+
+async def wait_for_server(http_url: str, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=5) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{http_url}/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {http_url} did not become healthy within {timeout}s")
+
+
+def client_url(args: argparse.Namespace, rng: random.Random) -> str:
+    endpoint = "trading-signals" if rng.random() < args.signals_ratio else "market-data"
+    params = {"format": args.format}
+    if args.pairs:
+        params["pairs"] = args.pairs
+    if args.channels and endpoint == "market-data":
+        params["channels"] = args.channels
+    return f"{args.url}/ws/{endpoint}?{urlencode(params)}"
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    http_url = args.url.replace("ws://", "http://").replace("wss://", "https://")
+    server_pid = args.server_pid
+    server = None
+    if args.spawn_server:
+        port = args.url.rsplit(":", 1)[-1]
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", port, "--log-level", "warning"],
+            cwd=BACKEND_DIR
+        )
+        server_pid = server.pid
+
+    try:
+        await wait_for_server(http_url)
+        rss_before = rss_bytes(server_pid) if server_pid else None
+
+        stats = LoadStats()
+        stop = asyncio.Event()
+        client_lag: List[float] = []
+        health_rtt: List[float] = []
+        rng = random.Random(args.seed)
+        background = [
+            asyncio.create_task(monitor_loop_lag(client_lag, stop)),
+            asyncio.create_task(probe_server(http_url, health_rtt, stop))
+        ]
+
+        # Ramp up at a fixed connection rate so handshakes do not stampede
+        clients = []
+        ramp_started = time.perf_counter()
+        for index in range(args.clients):
+            clients.append(asyncio.create_task(run_client(client_url(args, rng), stats)))
+            await asyncio.sleep(max(0.0, ramp_started + (index + 1) / args.ramp_rate - time.perf_counter()))
+        ramp_seconds = time.perf_counter() - ramp_started
+
+        await asyncio.sleep(args.warmup)
+        rss_connected = rss_bytes(server_pid) if server_pid else None
+        client_lag.clear()
+        health_rtt.clear()
+        stats.measuring = True
+        measure_started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stats.measuring = False
+        elapsed = time.perf_counter() - measure_started
+
+        server_stats = await fetch_server_stats(http_url)
+        stop.set()
+        for client in clients:
+            client.cancel()
+        await asyncio.gather(*clients, *background, return_exceptions=True)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    per_connection = None
+    if rss_before is not None and rss_connected is not None and stats.connected:
+        per_connection = (rss_connected - rss_before) / stats.connected / 1024
+
+    return {
+        "config": {
+            "url": args.url,
+            "clients": args.clients,
+            "signals_ratio": args.signals_ratio,
+            "format": args.format,
+            "pairs": args.pairs,
+            "channels": args.channels,
+            "duration_seconds": args.duration
+        },
+        "connections": {
+            "connected": stats.connected,
+            "failed": stats.failed,
+            "closed_by_server": stats.closed_by_server,
+            "ramp_seconds": ramp_seconds
+        },
+        "throughput": {
+            "messages": stats.messages,
+            "messages_per_sec": stats.messages / elapsed,
+            "bytes_per_sec": stats.bytes / elapsed
+        },
+        "latency_ms": percentiles(stats.latencies_ms),
+        "memory": {
+            "server_rss_before_mb": rss_before / 2 ** 20 if rss_before else None,
+            "server_rss_connected_mb": rss_connected / 2 ** 20 if rss_connected else None,
+            "server_kb_per_connection": per_connection,
+            "client_max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        },
+        "loop_lag_ms": {
+            "client": percentiles(client_lag),
+            "server_health_rtt": percentiles(health_rtt)
+        },
+        "server": server_stats
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", default="ws://localhost:8000", help="Server base URL")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--signals-ratio", type=float, default=0.2,
+                        help="Fraction of clients on /ws/trading-signals")
+    parser.add_argument("--format", choices=("json", "binary"), default="json")
+    parser.add_argument("--pairs", default="", help="Comma-separated pairs (default: all)")
+    parser.add_argument("--channels", default="prices,indicators",
+                        help="Market-data channels per client")
+    parser.add_argument("--ramp-rate", type=float, default=500.0, help="New connections per second")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds between ramp-up and measuring")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measurement window in seconds")
+    parser.add_argument("--spawn-server", action="store_true", help="Start uvicorn app.main:app for the run")
+    parser.add_argument("--server-pid", type=int, help="PID of an already running server, for memory stats")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    raise_file_limit(args.clients + 256)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as output:
+            output.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Trade and signal indexes, trade_rollups table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases created by ``Base.metadata.create_all`` before this revision
+have no secondary indexes and possibly no trade_rollups table; fresh ones
+already have both, so every step skips what exists. A newly created rollup
+table is filled from the existing trades in the same step.
+
+The trade history indexes end in id because listings page on
+(created_at, id); every page is then a single index range scan, including
+among equal timestamps.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.trade_rollups import rebuild_statement
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SIGNAL_ACTIVE_INCLUDE = [
+    "id", "type", "entry_price", "stop_loss", "take_profit", "confidence", "strategy",
+    "reasoning", "status", "mcts_simulations", "policy_score", "value_score",
+    "exploration_rate", "created_at"
+]
+
+# (name, table, columns, dialect options)
+INDEXES = [
+    ("ix_trades_created_at_id", "trades", ["created_at", "id"], {}),
+    ("ix_trades_pair_created_at_id", "trades", ["pair", "created_at", "id"], {}),
+    ("ix_trades_strategy_created_at", "trades", ["strategy", "created_at"], {}),
+    ("ix_trades_status_created_at_id", "trades", ["status", "created_at", "id"], {}),
+    ("ix_trades_open", "trades", ["created_at"], {
+        "postgresql_include": ["id", "pair", "type", "entry_price", "lot_size", "strategy"],
+        "postgresql_where": sa.text("status = 'open'"),
+        "sqlite_where": sa.text("status = 'open'")
+    }),
+    ("ix_trading_signals_created_at", "trading_signals", ["created_at"], {}),
+    ("ix_trading_signals_status_expires_at", "trading_signals", ["status", "expires_at"], {}),
+    ("ix_trading_signals_active", "trading_signals", ["pair", "expires_at"], {
+        "postgresql_include": SIGNAL_ACTIVE_INCLUDE,
+        "postgresql_where": sa.text("status = 'active'"),
+        "sqlite_where": sa.text("status = 'active'")
+    }),
+]
+
+
+def _existing_indexes(inspector, table):
+    if not inspector.has_table(table):
+        return None
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("trade_rollups"):
+        op.create_table(
+            "trade_rollups",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("pair", sa.String(), primary_key=True),
+            sa.Column("strategy", sa.String(), primary_key=True),
+            sa.Column("source", sa.String(), primary_key=True),
+            sa.Column("trades", sa.Integer(), nullable=False),
+            sa.Column("wins", sa.Integer(), nullable=False),
+            sa.Column("losses", sa.Integer(), nullable=False),
+            sa.Column("profit", sa.Float(), nullable=False),
+            sa.Column("win_profit", sa.Float(), nullable=False),
+            sa.Column("loss_profit", sa.Float(), nullable=False),
+            sa.Column("pips", sa.Float(), nullable=False),
+            sa.Column("duration_minutes", sa.Integer(), nullable=False),
+            sa.Column("timed_trades", sa.Integer(), nullable=False),
+            sa.Column("best_trade", sa.Float()),
+            sa.Column("worst_trade", sa.Float()),
+            sa.Column("updated_at", sa.DateTime())
+        )
+        if inspector.has_table("trades"):
+            # Analytics read whole days from the rollups only, so history must be counted now
+            op.execute(rebuild_statement())
+
+    existing = {table: _existing_indexes(inspector, table) for table in ("trades", "trading_signals")}
+    # CONCURRENTLY keeps trades writable while large tables are indexed,
+    # but Postgres refuses to run it inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            if existing[table] is None or name in existing[table]:
+                continue
+            op.create_index(name, table, columns, postgresql_concurrently=True, **options)
+
+
+def downgrade():
+    # trade_rollups is left in place; older code simply ignores it
+    inspector = sa.inspect(op.get_bind())
+    existing = {table: _existing_indexes(inspector, table) for table in ("trades", "trading_signals")}
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            if existing[table] and name in existing[table]:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -40,6 +40,14 @@ class ApiService {
     });
   }
 
+  // Import many trades in one request; each record comes back with its own status
+  async ingestTrades(trades: TradeData[]): Promise<TradeIngestResult> {
+    return this.request('/trading/trades/bulk', {
+      method: 'POST',
+      body: JSON.stringify(trades),
+    });
+  }
+
   async closeTrade(tradeId: string, exitPrice: number) {
     return this.request(`/trading/close-trade/${tradeId}`, {
       method: 'PUT',
@@ -52,6 +60,63 @@ class ApiService {
     return this.request(`/trading/trades?${queryString}`);
   }
 
+  // One page of trade history, newest first; pass nextCursor back in to continue
+  async getTradesPage(params: TradeFilters = {}, cursor?: string | null): Promise<TradePage> {
+    const queryString = new URLSearchParams({
+      ...this.toQuery(params),
+      ...(cursor ? { cursor } : {}),
+    }).toString();
+    const response = await fetch(`${this.baseUrl}/trading/trades?${queryString}`);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return { trades: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
+  }
+
+  // Every page of trade history in turn, e.g. for infinite scrolling
+  async *iterateTrades(params: TradeFilters = {}): AsyncGenerator<any[]> {
+    let cursor: string | null = null;
+    do {
+      const page: TradePage = await this.getTradesPage(params, cursor);
+      yield page.trades;
+      cursor = page.nextCursor;
+    } while (cursor);
+  }
+
+  // Download link for the full journal; the server streams it in constant memory
+  getTradeExportUrl(format: 'ndjson' | 'csv' = 'csv', params: TradeFilters & { since?: string; until?: string } = {}) {
+    const queryString = new URLSearchParams({ format, ...this.toQuery(params) }).toString();
+    return `${this.baseUrl}/trading/trades/export?${queryString}`;
+  }
+
+  // Read the NDJSON export row by row without holding the whole journal
+  async streamTrades(onTrade: (trade: any) => void, params: TradeFilters & { since?: string; until?: string } = {}) {
+    const response = await fetch(this.getTradeExportUrl('ndjson', params));
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffered = '';
+    let count = 0;
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      const lines = (buffered + value).split('\n');
+      buffered = lines.pop() ?? '';
+      for (const line of lines) {
+        if (line) {
+          onTrade(JSON.parse(line));
+          count += 1;
+        }
+      }
+    }
+    if (buffered) {
+      onTrade(JSON.parse(buffered));
+      count += 1;
+    }
+    return count;
+  }
+
   async getOpenTrades() {
     return this.request('/trading/open-trades');
   }
@@ -102,6 +167,21 @@ class ApiService {
     return this.request(`/analytics/pair-performance?timeframe=${timeframe}`);
   }
 
+  async getPerformanceMetrics(params: { timeframe?: string; pair?: string; strategy?: string; initial_balance?: number; window?: number } = {}) {
+    const queryString = new URLSearchParams(this.toQuery(params)).toString();
+    return this.request(`/analytics/performance-metrics?${queryString}`);
+  }
+
+  async getEquityCurve(bucket: string = '1d', params: { timeframe?: string; pair?: string; strategy?: string; initial_balance?: number; window?: number } = {}) {
+    const queryString = new URLSearchParams({ bucket, ...this.toQuery(params) }).toString();
+    return this.request<EquityCurve>(`/analytics/equity-curve?${queryString}`);
+  }
+
+  async getMonteCarlo(params: { timeframe?: string; pair?: string; strategy?: string; risk_percentage?: number; paths?: number; horizon?: number; initial_balance?: number; ruin_pct?: number; seed?: number } = {}) {
+    const queryString = new URLSearchParams(this.toQuery(params)).toString();
+    return this.request<MonteCarloResult>(`/analytics/monte-carlo?${queryString}`);
+  }
+
   async getRecentTrades(limit: number = 20) {
     return this.request(`/analytics/recent-trades?limit=${limit}`);
   }
@@ -123,20 +203,94 @@ class ApiService {
     return this.request(`/signals/performance?timeframe=${timeframe}`);
   }
 
+  // Market data endpoints
+  async getBars(pair: string, timeframe: string = '1h', params: { start?: number; end?: number; limit?: number } = {}) {
+    const queryString = new URLSearchParams({ pair, timeframe, ...this.toQuery(params) }).toString();
+    return this.request<BarSeries>(`/market-data/bars?${queryString}`);
+  }
+
+  async getBarsSince(pair: string, timeframe: string, since: number) {
+    const queryString = new URLSearchParams({ pair, timeframe, since: String(since) }).toString();
+    return this.request<BarSeries>(`/market-data/bars/since?${queryString}`);
+  }
+
+  async getChartSeries(
+    pair: string,
+    timeframe: string = '1m',
+    width: number = 1000,
+    method: 'lttb' | 'ohlc' = 'lttb',
+    params: { start?: number; end?: number } = {}
+  ) {
+    const queryString = new URLSearchParams({
+      pair,
+      timeframe,
+      width: String(width),
+      method,
+      ...this.toQuery(params),
+    }).toString();
+    return this.request<DownsampledSeries>(`/market-data/downsample?${queryString}`);
+  }
+
+  private toQuery(params: Record<string, string | number | undefined>): Record<string, string> {
+    const query: Record<string, string> = {};
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined) query[key] = String(value);
+    });
+    return query;
+  }
+
   // WebSocket connections
-  createWebSocket(endpoint: string): WebSocket {
-    const wsUrl = `ws://localhost:8000/ws/${endpoint}`;
-    return new WebSocket(wsUrl);
+  createWebSocket(endpoint: string, subscription: StreamSubscription = {}): WebSocket {
+    const params = new URLSearchParams();
+    if (subscription.pairs?.length) params.set('pairs', subscription.pairs.join(','));
+    if (subscription.channels?.length) params.set('channels', subscription.channels.join(','));
+    if (subscription.format) params.set('format', subscription.format);
+    const query = params.toString();
+    const wsUrl = `ws://localhost:8000/ws/${endpoint}${query ? `?${query}` : ''}`;
+    const ws = new WebSocket(wsUrl);
+    ws.binaryType = 'arraybuffer';
+    return ws;
   }
 
-  // Market data WebSocket
-  connectToMarketData(onMessage: (data: any) => void, onError?: (error: Event) => void) {
-    const ws = this.createWebSocket('market-data');
-    
+  // Change a stream socket's topics after connecting
+  subscribe(ws: WebSocket, subscription: StreamSubscription) {
+    ws.send(JSON.stringify({ action: 'subscribe', ...subscription }));
+  }
+
+  unsubscribe(ws: WebSocket, subscription: StreamSubscription) {
+    ws.send(JSON.stringify({ action: 'unsubscribe', ...subscription }));
+  }
+
+  // Ask the server for fresh snapshots, e.g. after a sequence gap
+  resync(ws: WebSocket, topics?: string[]) {
+    ws.send(JSON.stringify({ action: 'resync', topics }));
+  }
+
+  // Stream sockets send a snapshot per topic followed by deltas; the
+  // store merges them so onMessage always receives the full topic state
+  private connectStream(
+    endpoint: string,
+    onMessage: (data: any) => void,
+    onError?: (error: Event) => void,
+    subscription: StreamSubscription = {}
+  ) {
+    const ws = this.createWebSocket(endpoint, subscription);
+    const store = new TopicStore((topics) => this.resync(ws, topics));
+    const decoder = new BinaryDecoder();
+
     ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
-        onMessage(data);
+        // Binary frames are stream messages; control replies are always JSON text
+        const data = event.data instanceof ArrayBuffer
+          ? decoder.decode(event.data)
+          : JSON.parse(event.data);
+        if (data.type === 'subscribed' && data.ids) decoder.register(data.ids);
+        if (data.type === 'snapshot' || data.type === 'delta') {
+          const update = store.apply(data);
+          if (update) onMessage(update);
+        } else {
+          onMessage(data);
+        }
       } catch (error) {
         console.error('Error parsing WebSocket message:', error);
       }
@@ -150,25 +304,106 @@ class ApiService {
     return ws;
   }
 
+  // Market data WebSocket
+  connectToMarketData(
+    onMessage: (data: any) => void,
+    onError?: (error: Event) => void,
+    subscription: StreamSubscription = {}
+  ) {
+    return this.connectStream('market-data', onMessage, onError, subscription);
+  }
+
   // Trading signals WebSocket
-  connectToTradingSignals(onMessage: (data: any) => void, onError?: (error: Event) => void) {
-    const ws = this.createWebSocket('trading-signals');
-    
-    ws.onmessage = (event) => {
-      try {
-        const data = JSON.parse(event.data);
-        onMessage(data);
-      } catch (error) {
-        console.error('Error parsing WebSocket message:', error);
+  connectToTradingSignals(
+    onMessage: (data: any) => void,
+    onError?: (error: Event) => void,
+    subscription: StreamSubscription = {}
+  ) {
+    return this.connectStream('trading-signals', onMessage, onError, subscription);
+  }
+}
+
+// Rebuilds full topic state from snapshot and delta stream messages
+export class TopicStore {
+  private topics = new Map<string, { seq: number; data: any }>();
+  private resyncing = new Set<string>();
+
+  constructor(private onGap: (topics: string[]) => void) {}
+
+  apply(message: StreamMessage): StreamUpdate | null {
+    const { topic, seq, timestamp } = message;
+
+    if (message.type === 'snapshot') {
+      this.topics.set(topic, { seq, data: message.data });
+      this.resyncing.delete(topic);
+      return { type: 'update', topic, seq, timestamp, data: message.data };
+    }
+
+    const current = this.topics.get(topic);
+    if (!current || seq !== current.seq + 1) {
+      // Missed a message; drop deltas until the snapshot arrives
+      if (!this.resyncing.has(topic)) {
+        this.resyncing.add(topic);
+        this.onGap([topic]);
       }
-    };
+      return null;
+    }
 
-    ws.onerror = (error) => {
-      console.error('WebSocket error:', error);
-      if (onError) onError(error);
-    };
+    const data = { ...current.data, ...message.data };
+    message.removed?.forEach((key) => delete data[key]);
+    this.topics.set(topic, { seq, data });
+    return { type: 'update', topic, seq, timestamp, data };
+  }
 
-    return ws;
+  get(topic: string) {
+    return this.topics.get(topic)?.data;
+  }
+}
+
+// Decodes the binary stream format: an 18-byte little-endian header
+// (version, kind, body encoding, channel id, pair id, seq, epoch ms)
+// followed by an int32 price scaled by 1e5 or a compact JSON body
+export class BinaryDecoder {
+  private static readonly HEADER_BYTES = 18;
+  private static readonly PRICE_SCALE = 100000;
+  private channels = new Map<number, string>();
+  private pairs = new Map<number, string>();
+
+  register(ids: Record<string, { channel: number; pair: number }>) {
+    Object.entries(ids).forEach(([topic, { channel, pair }]) => {
+      const [channelName, pairName] = topic.split(/:(.*)/);
+      this.channels.set(channel, channelName);
+      this.pairs.set(pair, pairName);
+    });
+  }
+
+  decode(buffer: ArrayBuffer): StreamMessage {
+    const view = new DataView(buffer);
+    const kind = view.getUint8(1);
+    const encoding = view.getUint8(2);
+    const channel = this.channels.get(view.getUint8(3));
+    const pair = this.pairs.get(view.getUint16(4, true));
+    const seq = view.getUint32(6, true);
+    const timestamp = new Date(Number(view.getBigUint64(10, true))).toISOString();
+
+    let data: any;
+    let removed: string[] | undefined;
+    if (encoding === 0) {
+      data = { price: view.getInt32(BinaryDecoder.HEADER_BYTES, true) / BinaryDecoder.PRICE_SCALE };
+    } else {
+      const body = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, BinaryDecoder.HEADER_BYTES)));
+      data = body.d;
+      removed = body.r;
+    }
+
+    return {
+      type: kind === 1 ? 'snapshot' : 'delta',
+      topic: `${channel}:${pair}`,
+      seq,
+      timestamp,
+      data,
+      removed
+    };
   }
 }
 
@@ -204,6 +439,31 @@ export interface TradeData {
   };
 }
 
+// A type alias rather than an interface so it fits toQuery's Record parameter
+export type TradeFilters = {
+  pair?: string;
+  status?: 'open' | 'closed' | 'cancelled';
+  limit?: number;
+};
+
+export interface TradeIngestResult {
+  received: number;
+  inserted: number;
+  invalid: number;
+  failed: number;
+  truncated: boolean;
+  chunks: number;
+  method: string;
+  elapsed_seconds: number;
+  rows_per_second: number;
+  rows: { index: number; status: 'inserted' | 'invalid' | 'failed'; id?: string; error?: string }[];
+}
+
+export interface TradePage {
+  trades: any[];
+  nextCursor: string | null;
+}
+
 export interface TradingSignal {
   id: string;
   type: 'buy' | 'sell';
@@ -226,4 +486,115 @@ export interface TradingSignal {
   };
 }
 
+export type StreamChannel = 'prices' | 'indicators' | 'smart-money' | 'signals';
+
+export type WireFormat = 'json' | 'binary';
+
+export interface StreamSubscription {
+  pairs?: string[];
+  channels?: StreamChannel[];
+  // Only read when connecting
+  format?: WireFormat;
+}
+
+export interface StreamMessage {
+  type: 'snapshot' | 'delta';
+  topic: string;
+  seq: number;
+  timestamp: string;
+  data: any;
+  removed?: string[];
+}
+
+export interface StreamUpdate {
+  type: 'update';
+  topic: string;
+  seq: number;
+  timestamp: string;
+  data: any;
+}
+
+export interface BarSeries {
+  pair: string;
+  timeframe: string;
+  count: number;
+  time: number[];
+  open: number[];
+  high: number[];
+  low: number[];
+  close: number[];
+  volume: number[];
+  partial: { time: number; open: number; high: number; low: number; close: number; volume: number } | null;
+}
+
+export interface MonteCarloLevel {
+  risk_percentage: number;
+  risk_amount: number;
+  risk_of_ruin: number;
+  probability_of_profit: number;
+  max_drawdown_pct: Record<string, number>;
+  return_pct: Record<string, number>;
+  median_final_equity: number;
+}
+
+export interface MonteCarloResult {
+  model: {
+    trades: number;
+    risk_unit: number;
+    win_rate: number;
+    expectancy_r: number;
+    payoff_ratio: number;
+    kelly_risk_percentage: number;
+    paths: number;
+    horizon: number;
+    initial_balance: number;
+    ruin_pct: number;
+    seed: number;
+    workers: number;
+  };
+  risk_percentage: number;
+  result: MonteCarloLevel;
+  sensitivity: MonteCarloLevel[];
+}
+
+export interface EquityCurve {
+  summary: Record<string, number | null>;
+  drawdown: Record<string, number | boolean | null> | null;
+  series: {
+    bucket: string;
+    window: number;
+    count: number;
+    time?: number[];
+    trades?: number[];
+    profit?: number[];
+    pips?: number[];
+    win_rate?: number[];
+    equity?: number[];
+    equity_high?: number[];
+    equity_low?: number[];
+    drawdown?: number[];
+    drawdown_pct?: (number | null)[];
+    max_drawdown?: number[];
+    rolling_trades?: number[];
+    rolling_expectancy?: number[];
+    rolling_win_rate?: number[];
+    rolling_profit_factor?: (number | null)[];
+    rolling_sharpe?: (number | null)[];
+  };
+}
+
+export interface DownsampledSeries {
+  pair: string;
+  timeframe: string;
+  method: 'lttb' | 'ohlc';
+  source_count: number;
+  count: number;
+  time: number[];
+  close: number[];
+  open?: number[];
+  high?: number[];
+  low?: number[];
+  volume?: number[];
+}
+
 export default apiService;
\ No newline at end of file